@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 from database import get_db, Item, StyleSummary, FileUpload, InventoryAction
+from executors import analytics_executor, offload
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import re
@@ -38,7 +39,8 @@ def parse_date_from_filename(filename: str) -> Optional[datetime]:
 
 
 @router.get("/files/comparison")
-async def compare_files(db: Session = Depends(get_db)):
+@offload(analytics_executor)
+def compare_files(db: Session = Depends(get_db)):
     """Compare each file against all other files collectively."""
     files = db.query(FileUpload).order_by(FileUpload.uploaded_at).all()
     
@@ -154,7 +156,8 @@ async def compare_files(db: Session = Depends(get_db)):
 
 
 @router.get("/files/{filename}/details")
-async def file_details(filename: str, db: Session = Depends(get_db)):
+@offload(analytics_executor)
+def file_details(filename: str, db: Session = Depends(get_db)):
     """Get detailed analytics for a specific file."""
     file = db.query(FileUpload).filter_by(filename=filename).first()
     if not file:
@@ -203,7 +206,8 @@ async def file_details(filename: str, db: Session = Depends(get_db)):
 
 
 @router.get("/trends/timeline")
-async def timeline_trends(db: Session = Depends(get_db)):
+@offload(analytics_executor)
+def timeline_trends(db: Session = Depends(get_db)):
     """Comprehensive trend analysis: growth/decline, new vs returning styles, seasonality."""
     files = db.query(FileUpload).order_by(FileUpload.uploaded_at).all()
     
@@ -327,7 +331,8 @@ async def timeline_trends(db: Session = Depends(get_db)):
 
 
 @router.get("/comparison/overlap")
-async def file_overlap_analysis(db: Session = Depends(get_db)):
+@offload(analytics_executor)
+def file_overlap_analysis(db: Session = Depends(get_db)):
     """Analyze overlap between different files."""
     files = db.query(FileUpload).all()
     
@@ -372,7 +377,8 @@ async def file_overlap_analysis(db: Session = Depends(get_db)):
 
 
 @router.get("/division/trends")
-async def division_trends(db: Session = Depends(get_db)):
+@offload(analytics_executor)
+def division_trends(db: Session = Depends(get_db)):
     """Deep dive into division performance across files with market share changes."""
     files = db.query(FileUpload).order_by(FileUpload.uploaded_at).all()
     
@@ -484,7 +490,8 @@ async def division_trends(db: Session = Depends(get_db)):
 
 
 @router.get("/placement/analytics")
-async def placement_analytics(db: Session = Depends(get_db)):
+@offload(analytics_executor)
+def placement_analytics(db: Session = Depends(get_db)):
     """Analyze placement statistics across files."""
     files = db.query(FileUpload).all()
     
@@ -515,7 +522,8 @@ async def placement_analytics(db: Session = Depends(get_db)):
 
 
 @router.get("/styles/performance")
-async def style_performance_metrics(db: Session = Depends(get_db)):
+@offload(analytics_executor)
+def style_performance_metrics(db: Session = Depends(get_db)):
     """Analyze style performance: frequency across files, one-offs, lifecycle tracking."""
     files = db.query(FileUpload).order_by(FileUpload.uploaded_at).all()
     all_items = db.query(Item).all()
@@ -625,7 +633,8 @@ async def style_performance_metrics(db: Session = Depends(get_db)):
 
 
 @router.get("/style-families")
-async def style_family_analysis(db: Session = Depends(get_db)):
+@offload(analytics_executor)
+def style_family_analysis(db: Session = Depends(get_db)):
     """Analyze style families based on first 3 digits of style numbers."""
     items = db.query(Item).all()
     
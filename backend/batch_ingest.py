@@ -0,0 +1,298 @@
+"""Batch ingest of several workbooks: concurrent parsing, one commit phase."""
+import gc
+import json
+import os
+import shutil
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from database import get_session, FileUpload
+from ingest import apply_batch
+from memory_stats import PeakMemorySampler
+from parse_cache import hash_file
+from upload_storage import MAX_UPLOAD_BYTES
+from file_formats import SUPPORTED_EXTENSIONS, is_excel_file
+from image_index import IMAGES_DIR, image_index
+from item_images import sync_item_image_urls
+
+BATCH_PARSE_PROCESSES = int(os.getenv('BATCH_PARSE_PROCESSES', str(min(4, os.cpu_count() or 1))))
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def write_manifest(batch_dir: str, entries: List[Dict], force: bool = False) -> str:
+    """Write the list of spooled files for a batch job and return the manifest path."""
+    path = os.path.join(batch_dir, MANIFEST_NAME)
+    with open(path, 'w') as f:
+        json.dump({'force': force, 'files': entries}, f)
+    return path
+
+
+def _dedupe_batch(workbooks: List[Dict], files_progress: Dict) -> List[Dict]:
+    """
+    Drop workbooks whose content repeats an earlier workbook of the batch.
+
+    The same workbook can arrive twice, e.g. once on its own and once inside
+    a zip, under the same or a different name. Only two different workbooks
+    sharing a name are an error, since file names identify uploads.
+
+    Raises:
+        ValueError: If two workbooks with different content share a name
+    """
+    seen = {}
+    by_name = {}
+    remaining = []
+    for wb in workbooks:
+        first = seen.get(wb['sha256'])
+        if first is not None:
+            if first != wb['filename']:
+                files_progress[wb['filename']] = {'status': 'duplicate', 'duplicate_of': first}
+            continue
+        seen[wb['sha256']] = wb['filename']
+        by_name.setdefault(wb['filename'], []).append(wb)
+        remaining.append(wb)
+
+    duplicated = sorted(name for name, entries in by_name.items() if len(entries) > 1)
+    if duplicated:
+        raise ValueError(f"Batch contains more than one workbook named: {', '.join(duplicated)}")
+    return remaining
+
+
+def _set_upload_status(filenames: List[str], status: str):
+    """Record FileUpload status for batch workbooks, as run_upload_job does for single files."""
+    session = get_session()
+    try:
+        for filename in filenames:
+            file_upload = session.query(FileUpload).filter_by(filename=filename).first()
+            if not file_upload:
+                file_upload = FileUpload(filename=filename)
+                session.add(file_upload)
+            file_upload.status = status
+            if status == 'processing':
+                file_upload.uploaded_at = datetime.utcnow()
+                # Recorded only once the batch completes so failed runs never count as duplicates
+                file_upload.content_hash = None
+        session.commit()
+    finally:
+        session.close()
+
+
+def _skip_duplicates(workbooks: List[Dict], files_progress: Dict) -> List[Dict]:
+    """Drop workbooks whose content matches a completed upload."""
+    session = get_session()
+    try:
+        remaining = []
+        for wb in workbooks:
+            previous = session.query(FileUpload).filter_by(
+                content_hash=wb['sha256'], status='completed'
+            ).first()
+            if previous:
+                files_progress[wb['filename']] = {'status': 'duplicate', 'duplicate_of': previous.filename}
+            else:
+                remaining.append(wb)
+        return remaining
+    finally:
+        session.close()
+
+
+def expand_archives(batch_dir: str, entries: List[Dict]) -> List[Dict]:
+    """
+    Replace zip entries with the workbooks they contain.
+
+    Args:
+        batch_dir: Spool directory of the batch
+        entries: Spooled uploads ({'filename', 'path', 'sha256'})
+
+    Returns:
+        Workbook entries, in upload order
+    """
+    workbooks = []
+    for entry in entries:
+        if not entry['filename'].lower().endswith('.zip'):
+            workbooks.append(entry)
+            continue
+
+        with zipfile.ZipFile(entry['path']) as archive:
+            for index, info in enumerate(archive.infolist()):
+                name = os.path.basename(info.filename)
+                if info.is_dir() or name.startswith(('.', '~$')) or '__MACOSX' in info.filename:
+                    continue
+                if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    continue
+                if info.file_size > MAX_UPLOAD_BYTES:
+                    raise ValueError(f"{name} in {entry['filename']} exceeds the upload size limit")
+
+                dest = os.path.join(batch_dir, f"zip{index}_{name}")
+                with archive.open(info) as src, open(dest, 'wb') as out:
+                    shutil.copyfileobj(src, out, 1024 * 1024)
+                workbooks.append({'filename': name, 'path': dest, 'sha256': hash_file(dest)})
+
+    return workbooks
+
+
+def parse_workbook_file(filename: str, path: str, content_hash: str, upload_images: bool) -> Dict:
+    """
+    Parse one workbook (and optionally extract its images) in a worker process.
+
+    Returns:
+        Dictionary with the item records and style info needed for the commit phase
+    """
+    from excel_parser import InventoryParser
+
+    parser = InventoryParser(path, content_hash=content_hash)
+    images_uploaded = 0
+    if upload_images and is_excel_file(path):
+        images_uploaded = parser.extract_images_to_folder(IMAGES_DIR).get('extracted', 0)
+
+    return {
+        'filename': filename,
+        'content_hash': content_hash,
+        'records': parser.get_item_records(),
+        'style_info': parser.get_style_info(),
+        'styles_count': parser.get_style_count(),
+        'images_uploaded': images_uploaded,
+        'frame_mb': parser.memory_usage_mb()
+    }
+
+
+def run_batch_job(job, report: Callable[[Dict], None]) -> Dict:
+    """
+    Parse every workbook of a batch concurrently across processes, then merge
+    and commit all of them in a single transaction.
+
+    Args:
+        job: UploadJob whose file_path is the batch spool directory
+        report: Callback receiving progress dictionaries
+
+    Returns:
+        Dictionary with merged statistics and per-file results
+    """
+    with open(os.path.join(job.file_path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    workbooks = expand_archives(job.file_path, manifest['files'])
+    if not workbooks:
+        raise ValueError("No .xlsx, .xls, .csv or .parquet files found in batch")
+
+    names = list(dict.fromkeys(wb['filename'] for wb in workbooks))
+    files_progress = {name: {'status': 'queued'} for name in names}
+    workbooks = _dedupe_batch(workbooks, files_progress)
+    if not manifest.get('force'):
+        workbooks = _skip_duplicates(workbooks, files_progress)
+        if not workbooks:
+            return {
+                'items_saved': 0,
+                'styles_processed': 0,
+                'images_uploaded': 0,
+                'source_file': ', '.join(names),
+                'files': files_progress,
+                'merge': None
+            }
+
+    filenames = [wb['filename'] for wb in workbooks]
+    _set_upload_status(filenames, 'processing')
+    try:
+        return _parse_and_commit(workbooks, names, files_progress, bool(job.upload_images), report)
+    except Exception:
+        _set_upload_status(filenames, 'failed')
+        raise
+
+
+def _parse_and_commit(workbooks: List[Dict], names: List[str], files_progress: Dict,
+                      upload_images: bool, report: Callable[[Dict], None]) -> Dict:
+    """Parse the batch's workbooks across processes and commit them in one transaction."""
+    def publish(message, percentage):
+        report({
+            'status': 'processing',
+            'message': message,
+            'percentage': percentage,
+            'files': files_progress
+        })
+
+    publish(f'Parsing {len(workbooks)} workbooks...', 0)
+
+    parsed = {}
+    context = multiprocessing.get_context('spawn')
+    workers = max(1, min(BATCH_PARSE_PROCESSES, len(workbooks)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(parse_workbook_file, wb['filename'], wb['path'], wb['sha256'], upload_images): wb
+            for wb in workbooks
+        }
+        for future in as_completed(futures):
+            wb = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                files_progress[wb['filename']] = {'status': 'failed', 'error': str(e)}
+                raise Exception(f"Failed to parse {wb['filename']}: {e}")
+            parsed[wb['filename']] = result
+            files_progress[wb['filename']] = {
+                'status': 'parsed',
+                'items': len(result['records']),
+                'styles': result['styles_count'],
+                'images_uploaded': result['images_uploaded'],
+                'frame_mb': result['frame_mb']
+            }
+            publish(f"Parsed {len(parsed)}/{len(workbooks)} workbooks", int(len(parsed) / len(workbooks) * 80))
+
+    # Keep upload order so later workbooks win when rows overlap
+    ordered = [parsed[wb['filename']] for wb in workbooks]
+    style_info = {}
+    for result in ordered:
+        style_info.update(result['style_info'])
+
+    publish('Saving to database...', 90)
+    session = get_session()
+    sampler = PeakMemorySampler()
+    try:
+        with sampler:
+            applied = apply_batch(session, {r['filename']: r['records'] for r in ordered}, style_info)
+            session.flush()
+            # Images were extracted by the worker processes; pick them up before resolving URLs
+            image_index.refresh()
+            sync_item_image_urls(session, {item_id for r in ordered for item_id in r['records']})
+
+        now = datetime.utcnow()
+        for result in ordered:
+            file_upload = session.query(FileUpload).filter_by(filename=result['filename']).first()
+            if not file_upload:
+                file_upload = FileUpload(filename=result['filename'])
+                session.add(file_upload)
+            file_upload.status = 'completed'
+            file_upload.uploaded_at = now
+            file_upload.content_hash = result['content_hash']
+            file_upload.styles_count = result['styles_count']
+            file_upload.items_count = len(result['records'])
+            file_upload.images_uploaded = result['images_uploaded']
+
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    for result in ordered:
+        files_progress[result['filename']] = {
+            **files_progress[result['filename']],
+            'status': 'completed',
+            'diff': applied['files'][result['filename']]
+        }
+    images_uploaded = sum(r['images_uploaded'] for r in ordered)
+
+    # Parsed records are not needed past the DB phase
+    del parsed, ordered
+    gc.collect()
+
+    return {
+        'items_saved': applied['items_merged'],
+        'styles_processed': len(style_info),
+        'images_uploaded': images_uploaded,
+        'source_file': ', '.join(names),
+        'files': files_progress,
+        'merge': {k: v for k, v in applied.items() if k != 'files'},
+        'memory': sampler.report()
+    }
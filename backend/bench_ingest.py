@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Ingestion benchmark on synthetic WOF-style workbooks.
+
+Generates workbooks at the requested sizes, runs each stage of
+InventoryParser (read, group, image extract, save) against a scratch SQLite
+database and writes a JSON report that can be compared across commits.
+
+Usage:
+    python bench_ingest.py                          # 1k, 10k and 100k rows
+    python bench_ingest.py --rows 1000 10000 --images 200
+    python bench_ingest.py --compare ../bench/ingest_<old>.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Scratch locations must be set before the database, parse cache and image
+# modules load, so a run never writes into the real library or its indexes
+SCRATCH_DIR = tempfile.mkdtemp(prefix='bench_ingest_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'bench.db')}"
+os.environ['PARSE_CACHE_DIR'] = os.path.join(SCRATCH_DIR, 'cache')
+os.environ['IMAGES_DIR'] = os.path.join(SCRATCH_DIR, 'images')
+os.environ['THUMBS_DIR'] = os.path.join(SCRATCH_DIR, 'thumbs')
+os.environ['SPRITES_DIR'] = os.path.join(SCRATCH_DIR, 'sprites')
+os.environ['IMAGE_HASH_INDEX'] = os.path.join(SCRATCH_DIR, 'image_hashes.npz')
+os.environ['IMAGE_SIMILARITY_INDEX'] = os.path.join(SCRATCH_DIR, 'image_colors.npz')
+
+import openpyxl
+import pandas as pd
+from openpyxl.drawing.image import Image as SheetImage
+from PIL import Image
+
+from database import ensure_schema
+from excel_parser import InventoryParser
+from image_index import IMAGES_DIR
+from thumbnails import THUMBS_DIR
+from memory_stats import PeakMemorySampler
+
+DEFAULT_ROWS = [1000, 10000, 100000]
+DEFAULT_OUTPUT_DIR = os.path.join('..', 'bench')
+
+# Rough shape of real WOF sheets: a few colors per style, some w/ww widths
+DIVISIONS = [('SPORT', 35), ('USA', 25), ('WORK', 15), ('KIDS', 15), ('BOBS', 10)]
+GENDERS = [('WOMENS', 50), ('MENS', 35), ('BOYS', 8), ('GIRLS', 7)]
+OUTSOLES = ['ARCH FIT', 'MAX CUSHIONING', 'GO WALK', 'SLIP-INS', 'MEMORY FOAM', 'D LITES', 'UNO']
+COLORS = ['BBK', 'BLK', 'NVY', 'WHT', 'GRY', 'CCL', 'TPE', 'NAT', 'BKW', 'WSL', 'LTGY', 'CHAR', 'PKMT', 'BLU']
+VARIANTS = [('', 80), ('w', 15), ('ww', 5)]
+COLORS_PER_STYLE = (1, 8)
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def generate_rows(count: int, seed: int = 0) -> List[Dict]:
+    """Build synthetic sheet rows with style, color, variant and division spread."""
+    rng = random.Random(seed)
+    rows = []
+    style_number = 100000
+    while len(rows) < count:
+        style_number += rng.randint(1, 40)
+        division = _weighted(rng, DIVISIONS)
+        gender = _weighted(rng, GENDERS)
+        outsole = rng.choice(OUTSOLES)
+        for color in rng.sample(COLORS, rng.randint(*COLORS_PER_STYLE)):
+            rows.append({
+                'Style': f"{style_number}{_weighted(rng, VARIANTS)}",
+                'Color': color,
+                'Division': division,
+                'Outsole': outsole,
+                'Gender': gender,
+                # Columns the parser does not read, as in real exports
+                'Description': f"{outsole.title()} {gender.lower()} {color}",
+                'Price': round(rng.uniform(40, 120), 2)
+            })
+            if len(rows) == count:
+                break
+    return rows
+
+
+def _image_bytes(rng: random.Random, size: int = 120) -> bytes:
+    color = tuple(rng.randint(0, 255) for _ in range(3))
+    buffer = io.BytesIO()
+    Image.new('RGB', (size, size), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def write_workbook(path: str, rows: List[Dict], images: int = 0, seed: int = 0):
+    """
+    Write rows to an .xlsx file, embedding images in the first `images` rows.
+
+    Workbooks without images use openpyxl's write-only mode so the 100k case
+    stays quick to generate.
+    """
+    headers = list(rows[0].keys())
+    if not images:
+        wb = openpyxl.Workbook(write_only=True)
+        sheet = wb.create_sheet()
+        sheet.append(headers)
+        for row in rows:
+            sheet.append([row[h] for h in headers])
+        wb.save(path)
+        return
+
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([row[h] for h in headers])
+    for index in range(min(images, len(rows))):
+        image = SheetImage(io.BytesIO(_image_bytes(rng)))
+        # Data row i sits on sheet row i + 2 (header is row 1)
+        sheet.add_image(image, f"H{index + 2}")
+    wb.save(path)
+
+
+def git_commit() -> Optional[str]:
+    """Return the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_workbook(path: str, rows: int, images: int) -> Dict:
+    """
+    Time each parser stage on one workbook against an empty scratch database.
+
+    Returns:
+        Dictionary with per-stage seconds, item/style counts and peak memory
+    """
+    ensure_schema()
+    shutil.rmtree(IMAGES_DIR, ignore_errors=True)
+    shutil.rmtree(THUMBS_DIR, ignore_errors=True)
+
+    with PeakMemorySampler() as memory:
+        parser = InventoryParser(path, use_cache=False)
+
+        started = time.perf_counter()
+        extracted = parser.extract_images_to_folder(IMAGES_DIR).get('extracted', 0) if images else 0
+        extract_seconds = time.perf_counter() - started
+
+        source_filename = os.path.basename(path)
+        started = time.perf_counter()
+        result = parser.save_to_database(source_filename)
+        save_seconds = time.perf_counter() - started
+
+        # Re-saving identical rows exercises the diff path with no writes
+        started = time.perf_counter()
+        parser.save_to_database(source_filename)
+        resave_seconds = time.perf_counter() - started
+
+    return {
+        'rows': rows,
+        'images': images,
+        'workbook_mb': round(os.path.getsize(path) / (1024 * 1024), 2),
+        'items': result['items_saved'],
+        'styles': result['styles_processed'],
+        'images_extracted': extracted,
+        'frame_mb': parser.memory_usage_mb(),
+        'seconds': {
+            'read': round(parser.timings['read'], 4),
+            'group': round(parser.timings['group'], 4),
+            'image_extract': round(extract_seconds, 4),
+            'save': round(save_seconds, 4),
+            'resave_unchanged': round(resave_seconds, 4)
+        },
+        'memory': memory.report()
+    }
+
+
+def compare(report: Dict, baseline_path: str):
+    """Print per-stage timing ratios against a previous report."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(run['rows'], run['images']): run for run in baseline['runs']}
+
+    print(f"\nCompared with {baseline.get('commit') or baseline_path}:")
+    for run in report['runs']:
+        old = previous.get((run['rows'], run['images']))
+        if not old:
+            continue
+        parts = []
+        for stage, seconds in run['seconds'].items():
+            old_seconds = old['seconds'].get(stage)
+            if old_seconds:
+                parts.append(f"{stage} {seconds / old_seconds:.2f}x")
+        print(f"  {run['rows']:>7} rows: " + ', '.join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark workbook ingestion stages.')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help='Workbook sizes to generate (default: 1000 10000 100000)')
+    parser.add_argument('--images', type=int, default=0,
+                        help='Embed an image in the first N rows of each workbook')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data')
+    parser.add_argument('--output', help='Report path (default: ../bench/ingest_<commit>.json)')
+    parser.add_argument('--compare', help='Previous report to compare timings against')
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'openpyxl': openpyxl.__version__,
+        'platform': platform.platform(),
+        'runs': []
+    }
+
+    try:
+        for rows in args.rows:
+            # Fresh database per size so each save starts from an empty table
+            os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH_DIR, f'bench_{rows}.db')}"
+            path = os.path.join(SCRATCH_DIR, f"wof_{rows}.xlsx")
+            print(f"Generating {rows} rows...")
+            write_workbook(path, generate_rows(rows, args.seed), args.images, args.seed)
+
+            run = bench_workbook(path, rows, args.images)
+            report['runs'].append(run)
+            stages = ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in run['seconds'].items())
+            print(f"  {run['items']} items, {run['styles']} styles: {stages}")
+            print(f"  peak RSS {run['memory']['rss_peak_mb']} MB, frame {run['frame_mb']} MB")
+    finally:
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"ingest_{(commit or 'local')[:10]}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
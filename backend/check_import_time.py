@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Cold-start import budget check for the API.
+
+Imports main in fresh interpreters and fails when the best time exceeds the
+budget or when a heavy stack that should load on first use (pandas,
+openpyxl, PIL, OpenCV, Tesseract) is pulled in at startup.
+
+Usage:
+    python check_import_time.py
+    python check_import_time.py --budget 1.5 --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_BUDGET_SECONDS = float(os.getenv('IMPORT_BUDGET_SECONDS', '2.0'))
+
+# Modules that must not be imported by `import main`
+LAZY_MODULES = (
+    'pandas', 'numpy', 'openpyxl', 'PIL', 'cv2', 'pytesseract', 'pyzbar',
+    'excel_parser', 'tag_scanner', 'barcode_scanner',
+)
+
+PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - started\n"
+    "print(json.dumps({{'seconds': elapsed, 'modules': [m for m in {lazy!r} if m in sys.modules]}}))\n"
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module: str) -> dict:
+    """Import a module in a fresh interpreter and return its time and loaded lazy modules."""
+    output = subprocess.check_output(
+        [sys.executable, '-c', PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=BACKEND_DIR,
+        text=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, limit: int = 10) -> list:
+    """Return the top cumulative import times (microseconds, name) from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[1].isdigit():
+            rows.append((int(parts[1]), parts[2]))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check API cold-start import time.')
+    parser.add_argument('--module', default='main', help='Module to import (default: main)')
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_SECONDS,
+                        help='Maximum import time in seconds (default: IMPORT_BUDGET_SECONDS or 2.0)')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters to try; the best run counts')
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best = min(run['seconds'] for run in runs)
+    loaded = sorted({m for run in runs for m in run['modules']})
+
+    print(f"import {args.module}: {best:.2f}s (budget {args.budget:.2f}s, best of {args.runs})")
+    failed = False
+    if loaded:
+        print(f"FAIL: loaded at startup but should load on first use: {', '.join(loaded)}")
+        failed = True
+    if best > args.budget:
+        print(f"FAIL: over budget by {best - args.budget:.2f}s")
+        failed = True
+
+    if failed:
+        print("\nSlowest imports (cumulative):")
+        for micros, name in slowest_imports(args.module):
+            print(f"  {micros / 1e6:6.2f}s  {name}")
+        return 1
+
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
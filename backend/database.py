@@ -1,6 +1,7 @@
 import os
+import threading
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, JSON, Index, UniqueConstraint, ForeignKey
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, DateTime, JSON, Index, UniqueConstraint, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import declarative_base, sessionmaker
 from dotenv import load_dotenv
@@ -77,7 +78,8 @@ class Item(Base):
     division = Column(String(100))
     outsole = Column(String(100))
     gender = Column(String(50))
-    image_url = Column(String(500), nullable=True)
+    image_url = Column(String(500), nullable=True)  # Sheet URL, or the library image resolved by item_images
+    thumbnail_url = Column(String(500), nullable=True)  # Library thumbnail, resolved by item_images
     source_files = Column(JSON, nullable=False)  # Array of Excel filenames
     status = Column(String(50), default='pending')  # pending, placed, showroom, waitlist, dropped
     row_id = Column(Integer, ForeignKey('rows.id'), nullable=True)  # Location in warehouse
@@ -144,11 +146,49 @@ class FileUpload(Base):
     items_count = Column(Integer, default=0)
     images_uploaded = Column(Integer, default=0)
     status = Column(String(50), default='processing')  # processing, completed, failed
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded workbook
     
     def __repr__(self):
         return f"<FileUpload(filename={self.filename}, status={self.status})>"
 
 
+class UploadJob(Base):
+    """Persisted background jobs for Excel uploads, batches and seasonal drops."""
+    __tablename__ = 'upload_jobs'
+    
+    id = Column(String(36), primary_key=True)  # uuid, doubles as the upload_id returned to clients
+    kind = Column(String(50), nullable=True, default='upload')  # upload, batch, seasonal_drop, images
+    filename = Column(String(200), nullable=False)  # Original upload filename
+    file_path = Column(String(500), nullable=False)  # Spooled copy of the workbook (batch: spool directory)
+    upload_images = Column(Integer, default=1)
+    params = Column(JSON, nullable=True)  # Handler-specific options, e.g. season_name
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the spooled workbook
+    status = Column(String(50), default='queued', index=True)  # queued, running, completed, failed
+    attempts = Column(Integer, default=0)
+    progress = Column(JSON, nullable=True)  # Latest progress event, shared across worker processes
+    worker_id = Column(String(100), nullable=True)  # host:pid of the process running the job
+    heartbeat_at = Column(DateTime, nullable=True)  # Refreshed while the job runs
+    result = Column(JSON, nullable=True)
+    error = Column(String(1000))
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<UploadJob(id={self.id}, filename={self.filename}, status={self.status})>"
+
+
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '30'))
+# Seconds a SQLite connection waits on another worker process's write lock
+SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', '30'))
+
+# One engine (and connection pool) per process and URL; keyed by pid so
+# workers forked from a preloaded parent never share pooled connections
+_engines = {}
+_engines_lock = threading.Lock()
+
+
 def get_engine():
     """Get database engine based on DATABASE_URL environment variable."""
     database_url = os.getenv('DATABASE_URL', 'sqlite:///../chukwu_inventory.db')
@@ -156,7 +196,20 @@ def get_engine():
     if database_url.startswith('postgres://'):
         database_url = database_url.replace('postgres://', 'postgresql://', 1)
     
-    return create_engine(database_url, echo=False)
+    key = (database_url, os.getpid())
+    engine = _engines.get(key)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(key)
+            if engine is None:
+                options = {}
+                if database_url.startswith('sqlite'):
+                    options['connect_args'] = {'timeout': SQLITE_BUSY_TIMEOUT}
+                if database_url not in ('sqlite://', 'sqlite:///:memory:'):
+                    # In-memory SQLite uses a per-thread pool that takes no size options
+                    options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+                engine = _engines[key] = create_engine(database_url, echo=False, **options)
+    return engine
 
 
 def get_session():
@@ -174,6 +227,30 @@ def create_all():
     return engine
 
 
+def ensure_schema(engine=None):
+    """
+    Create missing tables and add columns introduced after a table was created.
+    
+    Only nullable columns are added; anything more involved needs a migration script.
+    """
+    engine = engine or get_engine()
+    Base.metadata.create_all(engine)
+    
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                for index in table.indexes:
+                    if [c.name for c in index.columns] == [column.name]:
+                        index.create(conn, checkfirst=True)
+    return engine
+
+
 def get_db():
     """Dependency for FastAPI to get database session."""
     db = get_session()
@@ -184,7 +261,7 @@ def get_db():
 
 
 if __name__ == "__main__":
-    create_all()
+    ensure_schema()
     print("\nTables created:")
     print("  - rooms (warehouse rooms)")
     print("  - shelves (shelves within rooms)")
@@ -193,3 +270,4 @@ if __name__ == "__main__":
     print("  - style_summary (aggregated style data)")
     print("  - inventory_actions (action tracking)")
     print("  - file_uploads (file tracking)")
+    print("  - upload_jobs (background upload jobs)")
@@ -1,8 +1,12 @@
 """
 Diagnostic tool to check if images match their filenames.
-Creates an HTML report showing all images with their filenames.
+
+By default, creates an HTML report of suspected mismatches only: pairs of
+images that look like the same picture but are filed under different
+style/color keys (see image_hashes). With --all, shows every image.
 """
 import os
+import sys
 from pathlib import Path
 
 
@@ -138,9 +142,84 @@ def create_image_diagnostic_report(images_dir="static/images", output_file="imag
     print(f"\n   To view: open {output_file}")
 
 
+def create_mismatch_report(images_dir=None, output_file="image_mismatches.html", max_distance=None):
+    """
+    Create an HTML report of suspected mismatches, side by side.
+
+    Uses the perceptual-hash index, so only new or changed images are decoded.
+    Any directory other than the image library is hashed in full and its
+    hashes are not saved, leaving the library's index file alone.
+    """
+    from image_hashes import HashIndex, DEFAULT_MAX_DISTANCE, HASH_INDEX_PATH
+    from image_index import IMAGES_DIR
+
+    images_dir = images_dir or IMAGES_DIR
+    in_library = os.path.abspath(images_dir) == os.path.abspath(IMAGES_DIR)
+    index = HashIndex(images_dir, HASH_INDEX_PATH if in_library else None)
+    stats = index.refresh()
+    distance = DEFAULT_MAX_DISTANCE if max_distance is None else max_distance
+    total = index.duplicate_report(limit=0, max_distance=distance)['total']
+    pairs = index.duplicate_report(limit=total, max_distance=distance)['pairs']
+
+    def card(filename):
+        return f"""
+                <div class="image-card">
+                    <img src="/static/images/{filename}" alt="{filename}">
+                    <div class="filename">{filename}</div>
+                </div>"""
+
+    rows = "".join(f"""
+            <div class="pair">
+                <div class="pair-info">Distance {pair['distance']} / 64{' &middot; same style' if pair['same_style'] else ''}</div>
+                <div class="image-grid">{card(pair['image_a'])}{card(pair['image_b'])}
+                </div>
+            </div>""" for pair in pairs)
+
+    html_content = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Image Mismatch Report</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }}
+        .container {{ max-width: 900px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; }}
+        h1 {{ color: #333; border-bottom: 3px solid #667eea; padding-bottom: 10px; }}
+        .stats {{ background: #e7f3ff; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
+        .pair {{ border: 2px solid #ffc107; border-radius: 8px; padding: 15px; margin-bottom: 20px; background: #fffdf5; }}
+        .pair-info {{ font-weight: bold; color: #856404; margin-bottom: 10px; }}
+        .image-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 20px; }}
+        .image-card img {{ width: 100%; height: auto; border-radius: 5px; background: white; border: 1px solid #ddd; }}
+        .filename {{ margin-top: 10px; font-weight: bold; color: #667eea; word-break: break-all; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Image Mismatch Report</h1>
+        <div class="stats">
+            <strong>Images indexed:</strong> {stats['total']}<br>
+            <strong>Suspected mismatches:</strong> {len(pairs)}<br>
+            <strong>Location:</strong> {images_dir}
+        </div>
+        {rows or '<p>No images appear under more than one style/color.</p>'}
+    </div>
+</body>
+</html>
+"""
+
+    with open(output_file, 'w') as f:
+        f.write(html_content)
+
+    print(f"Mismatch report created: {output_file}")
+    print(f"   Images indexed: {stats['total']} ({stats['hashed']} newly hashed)")
+    print(f"   Suspected mismatches: {len(pairs)}")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("  IMAGE DIAGNOSTIC TOOL")
     print("=" * 60)
     print()
-    create_image_diagnostic_report()
+    if '--all' in sys.argv:
+        create_image_diagnostic_report()
+    else:
+        create_mismatch_report()
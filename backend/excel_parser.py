@@ -1,34 +1,142 @@
 import pandas as pd
 import re
 import os
-from typing import Dict, List, Optional
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 from sqlalchemy.exc import SQLAlchemyError
-from database import Item, StyleSummary, get_session
+from database import get_session
+from ingest import load_file_membership, compute_diff, apply_diff, summarize_diff, build_dry_run_report
+import parse_cache
+from file_formats import EXCEL_EXTENSIONS, SUPPORTED_EXTENSIONS, is_excel_file
+from image_index import image_index, IMAGES_DIR
+from thumbnails import write_thumbnails, thumbs_dir_for
+from item_images import sync_item_image_urls
 import openpyxl
 from PIL import Image
 import io
 from pathlib import Path
 
 
+# Only these columns are read; everything else in the sheet is ignored
+INGEST_COLUMNS = {'style', 'color', 'division', 'outsole', 'gender', 'image', 'image_url'}
+# Low-cardinality columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ('division', 'outsole', 'gender', 'variant', 'rejected')
+
+
+def save_library_image(image, filepath: str):
+    """
+    Write an RGB image into the library as JPEG.
+
+    Library files are never rewritten in place: snapshots hard-link to them,
+    so the new file is written under a temporary name and renamed over the old one.
+    """
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    try:
+        image.save(tmp_path, 'JPEG', quality=95)
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
 class InventoryParser:
-    def __init__(self, file_path: str):
-        """Initialize the parser with an Excel file path."""
+    def __init__(
+        self,
+        file_path: str,
+        content_hash: Optional[str] = None,
+        use_cache: bool = True,
+        progress: Optional[Callable[[str, int, int], None]] = None
+    ):
+        """
+        Initialize the parser with an Excel file path.
+        
+        Args:
+            file_path: Path to the Excel file
+            content_hash: SHA-256 of the file if already known (computed otherwise)
+            use_cache: Reuse a previous parse of identical content from the parse cache
+            progress: Called as progress(stage, done, total) while rows are parsed
+                ('parse'), images extracted ('images') and rows written ('save')
+        """
         self.file_path = file_path
+        self.content_hash = content_hash
+        self.progress = progress
+        self.from_cache = False
         self.df = None
         self.styles_data = {}
-        self._load_data()
+        # Seconds spent per load stage ('read', 'group'); empty on a parse cache hit
+        self.timings: Dict[str, float] = {}
+        self._load_data(use_cache)
     
-    def _load_data(self):
-        """Load and process the Excel file."""
+    def _load_data(self, use_cache: bool = True):
+        """Load and process the Excel file, or its cached parse."""
         try:
-            self.df = pd.read_excel(self.file_path)
+            if use_cache:
+                if self.content_hash is None:
+                    self.content_hash = parse_cache.hash_file(self.file_path)
+                cached = parse_cache.load(self.content_hash)
+                if cached:
+                    self.df = pd.DataFrame(cached['columns'])
+                    self._apply_dtypes()
+                    self.styles_data = cached['styles_data']
+                    self.from_cache = True
+                    self._report('parse', len(self.df), len(self.df))
+                    return
+            
+            started = time.perf_counter()
+            self.df = self._read_frame()
             self.df.columns = self.df.columns.str.strip().str.lower()
+            self.timings['read'] = time.perf_counter() - started
+            
+            started = time.perf_counter()
             self._process_styles()
+            self._apply_dtypes()
+            self.timings['group'] = time.perf_counter() - started
+            
+            if use_cache:
+                parse_cache.store(self.content_hash, self.df, self.styles_data)
         except FileNotFoundError:
             raise FileNotFoundError(f"Excel file not found: {self.file_path}")
         except Exception as e:
             raise Exception(f"Error loading Excel file: {str(e)}")
     
+    def _read_frame(self) -> pd.DataFrame:
+        """Read the needed columns of the source file based on its extension."""
+        path = self.file_path.lower()
+        wanted = lambda col: str(col).strip().lower() in INGEST_COLUMNS
+        if path.endswith('.csv'):
+            # CSV and Parquet exports skip openpyxl entirely
+            return pd.read_csv(self.file_path, usecols=wanted)
+        if path.endswith('.parquet'):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Reading Parquet files requires pyarrow: pip install pyarrow")
+            columns = [col for col in pq.read_schema(self.file_path).names if wanted(col)]
+            return pd.read_parquet(self.file_path, columns=columns)
+        return pd.read_excel(self.file_path, usecols=wanted)
+    
+    def _report(self, stage: str, done: int, total: int):
+        if self.progress:
+            self.progress(stage, done, total)
+    
+    def _apply_dtypes(self):
+        """Store low-cardinality columns as categoricals to shrink the frame."""
+        for col in CATEGORICAL_COLUMNS:
+            if col in self.df.columns:
+                self.df[col] = self.df[col].astype('category')
+    
+    def memory_usage_mb(self) -> float:
+        """Return the in-memory size of the parsed frame in MB (0 once released)."""
+        if self.df is None:
+            return 0.0
+        return round(self.df.memory_usage(deep=True).sum() / (1024 * 1024), 2)
+    
+    def release(self):
+        """Drop the parsed frame and style groups once they are no longer needed."""
+        self.df = None
+        self.styles_data = {}
+    
     def _process_styles(self):
         """Group data by style and extract relevant information."""
         required_columns = ['style', 'color']
@@ -46,10 +154,21 @@ class InventoryParser:
         
         self.df['base_style'] = self.df['style'].astype(str).apply(self._extract_base_style)
         self.df['variant'] = self.df['style'].astype(str).apply(self._extract_variant)
+        # Rejected rows stay in the frame so image row anchors still line up
+        self.df['rejected'] = [
+            self._rejection_reason(style, color)
+            for style, color in zip(self.df['style'], self.df['color'])
+        ]
         
-        grouped = self.df.groupby('base_style')
+        accepted = self.df[self.df['rejected'] == '']
+        grouped = accepted.groupby('base_style')
+        total_rows = len(self.df)
+        # Rejected rows need no grouping and count as parsed up front
+        rows_done = total_rows - len(accepted)
         
         for base_style, group in grouped:
+            rows_done += len(group)
+            self._report('parse', rows_done, total_rows)
             color_list = []
             for _, row in group.iterrows():
                 color = str(row['color'])
@@ -70,6 +189,37 @@ class InventoryParser:
                 'color_count': len(color_list)
             }
     
+    def _rejection_reason(self, style, color) -> str:
+        """Return why a row cannot be ingested, or an empty string if it can."""
+        style_str = str(style).strip() if pd.notna(style) else ''
+        color_str = str(color).strip() if pd.notna(color) else ''
+        if not style_str:
+            return 'missing style'
+        if not color_str:
+            return 'missing color'
+        if not re.match(r'^\d+', style_str):
+            return f"style '{style_str}' has no style number"
+        return ''
+    
+    def get_rejected_rows(self) -> List[Dict]:
+        """
+        List rows that will not be ingested.
+        
+        Returns:
+            List of dictionaries with the sheet row number (header is row 1),
+            raw style and color, and the reason
+        """
+        rejected = self.df[self.df['rejected'] != '']
+        return [
+            {
+                'row': int(index) + 2,
+                'style': None if pd.isna(row['style']) else str(row['style']),
+                'color': None if pd.isna(row['color']) else str(row['color']),
+                'reason': row['rejected']
+            }
+            for index, row in rejected.iterrows()
+        ]
+    
     def _extract_base_style(self, style: str) -> str:
         """Extract base style number by removing w/ww suffix."""
         match = re.match(r'^(\d+)', str(style))
@@ -130,22 +280,64 @@ class InventoryParser:
         """Return count of unique styles."""
         return len(self.styles_data)
 
-    def extract_images_to_folder(self, output_dir: str = "static/images") -> Dict:
+    def image_filename(self, excel_row_idx: int) -> Optional[str]:
         """
-        Extract images from Excel file and save them with correct style_color naming.
-        This ensures each image matches its corresponding row data.
+        Return the library file name for an image anchored at a sheet row.
 
         Args:
-            output_dir: Directory to save images (default: static/images)
+            excel_row_idx: 0-based openpyxl row of the image anchor
 
         Returns:
-            Dictionary with extraction statistics
+            style_color.jpg, or None when the row has no usable style and color
         """
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        # Excel rows: header is row 1, data starts at row 2
+        # df index: header consumed, data starts at index 0
+        df_row_idx = excel_row_idx - 1
+        if df_row_idx < 0 or df_row_idx >= len(self.df):
+            return None
+
+        # Get the data for this row
+        row_data = self.df.iloc[df_row_idx]
+
+        # Extract style and color
+        style_raw = str(row_data.get('style', '')).strip()
+        color_raw = str(row_data.get('color', '')).strip()
+
+        if not style_raw or not color_raw or style_raw == 'nan' or color_raw == 'nan':
+            return None
+
+        # Clean up style (extract base digits, pad to 6)
+        style_match = re.match(r'^(\d+)', style_raw)
+        if not style_match:
+            return None
+        style_clean = style_match.group(1).zfill(6)
+
+        # Extract variant from style and add to color
+        variant = self._extract_variant(style_raw)
+        if variant:
+            color_clean = f"{color_raw} ({variant})"
+        else:
+            color_clean = color_raw.strip()
+
+        return f"{style_clean}_{color_clean}.jpg"
+
+    def image_rows(self) -> List[Tuple[int, Optional[str], object]]:
+        """
+        Find the images anchored in the sheet and the file name each belongs under.
 
+        Only the first image anchored in a row is used.
+
+        Returns:
+            (0-based anchor row, file name or None, openpyxl image) per row with
+            an image, sorted by row; empty for CSV and Parquet files
+        """
+        if not is_excel_file(self.file_path):
+            # CSV and Parquet carry no embedded images
+            return []
+
+        # Load workbook to extract images
+        wb = openpyxl.load_workbook(self.file_path)
         try:
-            # Load workbook to extract images
-            wb = openpyxl.load_workbook(self.file_path)
             sheet = wb.active
 
             # Get all images and their positions
@@ -157,78 +349,82 @@ class InventoryParser:
                     if row_idx not in images_by_row:
                         images_by_row[row_idx] = []
                     images_by_row[row_idx].append(img)
+        finally:
+            wb.close()
 
-            print(f"Found {len(images_by_row)} rows with images")
+        return [
+            (row_idx, self.image_filename(row_idx), images[0])
+            for row_idx, images in sorted(images_by_row.items())
+        ]
 
-            extracted_count = 0
-            skipped_count = 0
-
-            for excel_row_idx, images in sorted(images_by_row.items()):
-                # Excel rows: header is row 1, data starts at row 2
-                # df index: header consumed, data starts at index 0
-                df_row_idx = excel_row_idx - 1
+    def extract_images_to_folder(self, output_dir: str = "static/images", thumbnails: bool = True) -> Dict:
+        """
+        Extract images from Excel file and save them with correct style_color naming.
+        This ensures each image matches its corresponding row data.
 
-                if df_row_idx < 0 or df_row_idx >= len(self.df):
-                    skipped_count += 1
-                    continue
+        Args:
+            output_dir: Directory to save images (default: static/images)
+            thumbnails: Also write the thumbnail sizes next to the library
 
-                # Get the data for this row
-                row_data = self.df.iloc[df_row_idx]
+        Returns:
+            Dictionary with extraction statistics
+        """
+        if not is_excel_file(self.file_path):
+            # CSV and Parquet carry no embedded images
+            return {
+                'extracted': 0,
+                'skipped': 0,
+                'output_dir': output_dir
+            }
+        
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        thumbs_dir = thumbs_dir_for(output_dir)
+        thumbnail_failures = 0
 
-                # Extract style and color
-                style_raw = str(row_data.get('style', '')).strip()
-                color_raw = str(row_data.get('color', '')).strip()
+        try:
+            rows = self.image_rows()
+            print(f"Found {len(rows)} rows with images")
 
-                if not style_raw or not color_raw or style_raw == 'nan' or color_raw == 'nan':
-                    skipped_count += 1
-                    continue
+            extracted_count = 0
+            skipped_count = 0
 
-                # Clean up style (extract base digits, pad to 6)
-                style_match = re.match(r'^(\d+)', style_raw)
-                if style_match:
-                    style_clean = style_match.group(1).zfill(6)
-                else:
+            for done, (excel_row_idx, filename, img_obj) in enumerate(rows, 1):
+                self._report('images', done, len(rows))
+                if filename is None:
                     skipped_count += 1
                     continue
 
-                # Extract variant from style and add to color
-                variant = self._extract_variant(style_raw)
-                if variant:
-                    color_clean = f"{color_raw} ({variant})"
-                else:
-                    color_clean = color_raw.strip()
-
-                # Process the first image in this row
-                if images:
-                    img_obj = images[0]
-
-                    try:
-                        # Get image data
-                        image_data = img_obj._data()
-                        pil_image = Image.open(io.BytesIO(image_data))
+                try:
+                    # Get image data
+                    pil_image = Image.open(io.BytesIO(img_obj._data()))
+                    filepath = os.path.join(output_dir, filename)
 
-                        # Save with correct filename
-                        filename = f"{style_clean}_{color_clean}.jpg"
-                        filepath = os.path.join(output_dir, filename)
+                    # Convert to RGB if necessary
+                    if pil_image.mode != 'RGB':
+                        pil_image = pil_image.convert('RGB')
 
-                        # Convert to RGB if necessary
-                        if pil_image.mode != 'RGB':
-                            pil_image = pil_image.convert('RGB')
+                    save_library_image(pil_image, filepath)
+                    image_index.add(filepath)
 
-                        pil_image.save(filepath, 'JPEG', quality=95)
+                    if thumbnails:
+                        # Derivatives are rendered from the already-decoded image
+                        try:
+                            write_thumbnails(pil_image, filename, thumbs_dir)
+                        except Exception as e:
+                            print(f"✗ Could not render thumbnails for {filename}: {e}")
+                            thumbnail_failures += 1
 
-                        print(f"Extracted: {filename} (from row {excel_row_idx})")
-                        extracted_count += 1
+                    print(f"Extracted: {filename} (from row {excel_row_idx})")
+                    extracted_count += 1
 
-                    except Exception as e:
-                        print(f"✗ Error extracting image from row {excel_row_idx}: {e}")
-                        skipped_count += 1
-
-            wb.close()
+                except Exception as e:
+                    print(f"✗ Error extracting image from row {excel_row_idx}: {e}")
+                    skipped_count += 1
 
             return {
                 'extracted': extracted_count,
                 'skipped': skipped_count,
+                'thumbnail_failures': thumbnail_failures,
                 'output_dir': output_dir
             }
 
@@ -240,112 +436,115 @@ class InventoryParser:
                 'error': str(e)
             }
     
+    def get_item_records(self) -> Dict[str, Dict]:
+        """
+        Build one record per style/color variant, keyed by item id.
+        
+        Returns:
+            Dictionary of item id to item fields (first row wins for duplicates)
+        """
+        records = {}
+        has_image = 'image' in self.df.columns
+        has_image_url = 'image_url' in self.df.columns
+        
+        for _, row in self.df[self.df['rejected'] == ''].iterrows():
+            base_style_6digit = str(row['base_style']).zfill(6)
+            color = str(row['color'])
+            variant = row['variant']
+            color_with_variant = f"{color} ({variant})" if variant else color
+            
+            # Generate ID as style_color
+            item_id = f"{base_style_6digit}_{color_with_variant}"
+            if item_id in records:
+                continue
+            
+            image_url = None
+            if has_image and pd.notna(row['image']):
+                image_url = str(row['image'])
+            elif has_image_url and pd.notna(row['image_url']):
+                image_url = str(row['image_url'])
+            
+            records[item_id] = {
+                'style': base_style_6digit,
+                'color': color_with_variant,
+                'division': str(row['division']),
+                'outsole': str(row['outsole']),
+                'gender': str(row['gender']),
+                'image_url': image_url
+            }
+        
+        return records
+    
+    def get_style_info(self) -> Dict[str, Dict]:
+        """Return division/outsole/gender per 6-digit style."""
+        return {
+            style.zfill(6): {
+                'division': data['division'],
+                'outsole': data['outsole'],
+                'gender': data['gender']
+            }
+            for style, data in self.styles_data.items()
+        }
+    
+    def dry_run(self, source_filename: str, images_dir: str = IMAGES_DIR) -> Dict:
+        """
+        Report what save_to_database would do, without writing anything.
+        
+        Args:
+            source_filename: Name the file would be saved under
+            images_dir: Image library used to report present/missing images
+            
+        Returns:
+            Dictionary with the dry-run report
+        """
+        session = get_session()
+        try:
+            return build_dry_run_report(
+                session,
+                source_filename,
+                self.get_item_records(),
+                self.get_rejected_rows(),
+                images_dir
+            )
+        finally:
+            session.close()
+    
     def save_to_database(self, source_filename: str) -> Dict:
         """
         Save parsed inventory data to database.
         
+        Rows are diffed against the items this file already contributed, and
+        only added, changed and removed rows are written, in one transaction.
+        
         Args:
             source_filename: Name of the source Excel file
             
         Returns:
-            Dictionary with save statistics
+            Dictionary with save statistics and the diff summary
         """
         session = get_session()
-        items_saved = 0
-        styles_processed = 0
         
         try:
-            for base_style, style_data in self.styles_data.items():
-                base_style_6digit = base_style.zfill(6)
-                
-                style_rows = self.df[self.df['base_style'] == base_style]
-                
-                processed_colors = set()
-                for _, row in style_rows.iterrows():
-                    color = str(row['color'])
-                    variant = row['variant']
-                    color_with_variant = f"{color} ({variant})" if variant else color
-                    
-                    if color_with_variant in processed_colors:
-                        continue
-                    processed_colors.add(color_with_variant)
-                    
-                    image_url = None
-                    if 'image' in self.df.columns and 'image' in row.index and pd.notna(row['image']):
-                        image_url = str(row['image'])
-                    elif 'image_url' in self.df.columns and 'image_url' in row.index and pd.notna(row['image_url']):
-                        image_url = str(row['image_url'])
-                    
-                    # Generate ID as style_color
-                    item_id = f"{base_style_6digit}_{color_with_variant}"
-                    
-                    existing_item = session.query(Item).filter_by(id=item_id).first()
-                    
-                    if existing_item:
-                        existing_item.division = str(row['division'])
-                        existing_item.outsole = str(row['outsole'])
-                        existing_item.gender = str(row['gender'])
-                        if image_url:
-                            existing_item.image_url = image_url
-                        
-                        existing_files = set(existing_item.source_files)
-                        existing_files.add(source_filename)
-                        existing_item.source_files = sorted(list(existing_files))
-                        
-                        from datetime import datetime
-                        existing_item.updated_at = datetime.utcnow()
-                    else:
-                        new_item = Item(
-                            id=item_id,
-                            style=base_style_6digit,
-                            color=color_with_variant,
-                            division=str(row['division']),
-                            outsole=str(row['outsole']),
-                            gender=str(row['gender']),
-                            image_url=image_url,
-                            source_files=[source_filename]
-                        )
-                        session.add(new_item)
-                    
-                    items_saved += 1
-                
-                existing_summary = session.query(StyleSummary).filter_by(
-                    style=base_style_6digit
-                ).first()
-                
-                if existing_summary:
-                    existing_colors = set(existing_summary.all_colors)
-                    new_colors = set(style_data['colors'])
-                    merged_colors = sorted(list(existing_colors | new_colors))
-                    
-                    existing_files = set(existing_summary.source_files)
-                    existing_files.add(source_filename)
-                    
-                    existing_summary.all_colors = merged_colors
-                    existing_summary.source_files = sorted(list(existing_files))
-                    existing_summary.color_count = len(merged_colors)
-                    from datetime import datetime
-                    existing_summary.updated_at = datetime.utcnow()
-                else:
-                    new_summary = StyleSummary(
-                        style=base_style_6digit,
-                        all_colors=style_data['colors'],
-                        division=style_data['division'],
-                        outsole=style_data['outsole'],
-                        gender=style_data['gender'],
-                        source_files=[source_filename],
-                        color_count=style_data['color_count']
-                    )
-                    session.add(new_summary)
-                
-                styles_processed += 1
+            records = self.get_item_records()
+            membership = load_file_membership(session, source_filename)
+            diff = compute_diff(records, membership)
+            summary = summarize_diff(diff, records, membership)
             
+            applied = apply_diff(
+                session, source_filename, records, diff, membership, self.get_style_info(),
+                progress=lambda done, total: self._report('save', done, total)
+            )
+            # Images for these rows were extracted (if at all) before the save
+            session.flush()
+            image_urls_updated = sync_item_image_urls(session, records)
             session.commit()
             
             return {
-                'items_saved': items_saved,
-                'styles_processed': styles_processed,
-                'source_file': source_filename
+                'items_saved': len(records),
+                'styles_processed': len(self.styles_data),
+                'source_file': source_filename,
+                'image_urls_updated': image_urls_updated,
+                'diff': {**summary, **applied}
             }
             
         except SQLAlchemyError as e:
@@ -355,17 +554,46 @@ class InventoryParser:
             session.close()
 
 
+def print_dry_run_report(report: Dict):
+    """Print a dry-run report in the CLI's format."""
+    print("\n" + "=" * 50)
+    print(f"DRY RUN: {report['source_file']}")
+    print("=" * 50)
+    print(f"Rows rejected:      {report['rows_rejected']}")
+    for row in report['rejected_rows'][:10]:
+        print(f"   row {row['row']}: {row['reason']}")
+    if report['rows_rejected'] > 10:
+        print(f"   ... and {report['rows_rejected'] - 10} more")
+    print(f"Styles new:         {report['styles_new']}")
+    print(f"Styles existing:    {report['styles_existing']}")
+    print(f"Colors added:       {report['colors_added']}")
+    print(f"Colors changed:     {report['colors_changed']}")
+    print(f"Colors removed:     {report['colors_removed']}")
+    for item in report['removed_items'][:10]:
+        print(f"   {item['style']} - {item['color']}")
+    print(f"Images present:     {report['images_present']}")
+    print(f"Images missing:     {report['images_missing']}")
+    print("=" * 50)
+
+
 def main():
     """Interactive terminal interface for the inventory parser."""
+    # Non-interactive preview: python excel_parser.py --dry-run <file>
+    if len(sys.argv) == 3 and sys.argv[1] == '--dry-run':
+        parser = InventoryParser(sys.argv[2])
+        print_dry_run_report(parser.dry_run(os.path.basename(sys.argv[2])))
+        return
+    
     print("\n" + "=" * 50)
     print("  SKECHERS INVENTORY LOOKUP SYSTEM")
     print("=" * 50)
     
-    file_path = input("\nEnter Excel file path: ").strip()
+    file_path = input("\nEnter Excel, CSV or Parquet file path: ").strip()
     
     try:
         parser = InventoryParser(file_path)
-        print(f"\nLoaded {parser.get_style_count()} unique styles")
+        cache_note = " (from parse cache)" if parser.from_cache else ""
+        print(f"\nLoaded {parser.get_style_count()} unique styles{cache_note}")
     except Exception as e:
         print(f"\nError: {str(e)}")
         return
@@ -375,8 +603,9 @@ def main():
         print("[1] Lookup style")
         print("[2] List all styles")
         print("[3] Extract images (FIXES IMAGE MISMATCH)")
-        print("[4] Save to database")
-        print("[5] Exit")
+        print("[4] Dry run (preview database changes)")
+        print("[5] Save to database")
+        print("[6] Exit")
         print("=" * 50)
 
         choice = input("\nChoice: ").strip()
@@ -398,19 +627,15 @@ def main():
 
         elif choice == "3":
             print(f"\nExtracting images from Excel file...")
-            print("This will backup existing images and extract fresh ones")
+            print("This will snapshot existing images and extract fresh ones")
 
-            # Backup existing images
-            import shutil
-            from datetime import datetime
-            backup_dir = f"static/images_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            if os.path.exists("static/images"):
-                print(f"Backing up existing images to {backup_dir}...")
-                shutil.copytree("static/images", backup_dir)
-                print("Backup complete")
+            # Hard-link snapshot of the library; old snapshots are pruned
+            from image_snapshots import create_snapshot
+            snapshot = create_snapshot(IMAGES_DIR, label=os.path.splitext(os.path.basename(file_path))[0])
+            print(f"Snapshot {snapshot['name']} of {snapshot['files']} images taken in {snapshot['seconds']}s")
 
             try:
-                result = parser.extract_images_to_folder("static/images")
+                result = parser.extract_images_to_folder(IMAGES_DIR)
                 if 'error' in result:
                     print(f"\nImage extraction failed: {result['error']}")
                 else:
@@ -418,11 +643,15 @@ def main():
                     print(f"   Extracted: {result['extracted']} images")
                     print(f"   Skipped: {result['skipped']} images")
                     print(f"   Saved to: {result['output_dir']}")
-                    print(f"\n   Original images backed up to: {backup_dir}")
+                    print(f"\n   Previous images: snapshot {snapshot['name']} "
+                          f"(restore with: python image_snapshots.py restore {snapshot['name']})")
             except Exception as e:
                 print(f"\nImage extraction failed: {str(e)}")
 
         elif choice == "4":
+            print_dry_run_report(parser.dry_run(os.path.basename(file_path)))
+
+        elif choice == "5":
             source_filename = os.path.basename(file_path)
             print(f"\nSaving to database...")
             try:
@@ -431,15 +660,18 @@ def main():
                 print(f"   Items saved: {result['items_saved']}")
                 print(f"   Styles processed: {result['styles_processed']}")
                 print(f"   Source file: {result['source_file']}")
+                diff = result['diff']
+                print(f"   Added: {diff['added']} | Changed: {diff['changed']} | "
+                      f"Removed: {diff['removed']} | Unchanged: {diff['unchanged']}")
             except Exception as e:
                 print(f"\nDatabase save failed: {str(e)}")
 
-        elif choice == "5":
+        elif choice == "6":
             print("\nGoodbye!")
             break
         
         else:
-            print("\nInvalid choice. Please select 1, 2, 3, 4, or 5.")
+            print("\nInvalid choice. Please select 1, 2, 3, 4, 5, or 6.")
 
 
 if __name__ == "__main__":
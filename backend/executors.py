@@ -0,0 +1,113 @@
+"""
+Dedicated thread pools for blocking request work, one per class of work.
+
+OCR, ingest, analytics and image rendering each get their own worker limit, so a burst of one
+kind queues behind its own pool instead of starving the event loop or the
+default threadpool that serves interactive routes (scans, location updates).
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from fastapi import HTTPException
+
+OCR_WORKERS = int(os.getenv('OCR_WORKERS', '2'))
+OCR_MAX_QUEUE = int(os.getenv('OCR_MAX_QUEUE', '8'))
+INGEST_REQUEST_WORKERS = int(os.getenv('INGEST_REQUEST_WORKERS', '2'))
+INGEST_MAX_QUEUE = int(os.getenv('INGEST_MAX_QUEUE', '8'))
+ANALYTICS_WORKERS = int(os.getenv('ANALYTICS_WORKERS', '4'))
+ANALYTICS_MAX_QUEUE = int(os.getenv('ANALYTICS_MAX_QUEUE', '32'))
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '2'))
+IMAGE_MAX_QUEUE = int(os.getenv('IMAGE_MAX_QUEUE', '64'))
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a fixed number of workers and a bounded wait queue.
+
+    Calls beyond workers + max_queue are rejected with 503 rather than piling
+    up. A slot is held until the work itself finishes, even if the client
+    disconnects first.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'{name}-pool')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) on this pool and await its result."""
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server busy: too many {self.name} requests in progress. Try again shortly."
+            )
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict:
+        """Return the worker limit and how many calls are running or queued."""
+        with self._lock:
+            pending = self._pending
+        return {
+            'workers': self.workers,
+            'running': min(pending, self.workers),
+            'queued': max(0, pending - self.workers),
+            'max_queue': self.max_queue
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+ocr_executor = BoundedExecutor('ocr', OCR_WORKERS, OCR_MAX_QUEUE)
+ingest_executor = BoundedExecutor('ingest', INGEST_REQUEST_WORKERS, INGEST_MAX_QUEUE)
+analytics_executor = BoundedExecutor('analytics', ANALYTICS_WORKERS, ANALYTICS_MAX_QUEUE)
+image_executor = BoundedExecutor('image', IMAGE_WORKERS, IMAGE_MAX_QUEUE)
+
+EXECUTORS = {
+    'ocr': ocr_executor,
+    'ingest': ingest_executor,
+    'analytics': analytics_executor,
+    'image': image_executor,
+}
+
+
+def offload(executor: BoundedExecutor):
+    """
+    Run a sync route handler on an executor.
+
+    Use below the router decorator on a plain def handler; FastAPI still sees
+    the original signature (and its dependencies) through functools.wraps.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await executor.run(fn, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def shutdown_executors():
+    """Stop all pools; queued calls are cancelled."""
+    for executor in EXECUTORS.values():
+        executor.shutdown()
@@ -0,0 +1,9 @@
+"""Workbook file types accepted for ingestion (no heavy imports, safe at startup)."""
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+SUPPORTED_EXTENSIONS = EXCEL_EXTENSIONS + ('.csv', '.parquet')
+
+
+def is_excel_file(file_path: str) -> bool:
+    """Return True if the path has an Excel extension (the only format with embedded images)."""
+    return file_path.lower().endswith(EXCEL_EXTENSIONS)
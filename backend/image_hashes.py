@@ -0,0 +1,183 @@
+"""
+Perceptual-hash index of the image library, for finding the same picture
+filed under two different style/color keys.
+
+Each image gets a 64-bit difference hash (dHash) of its grayscale layout and
+its mean RGB color, kept in an incrementally refreshed .npz file
+(library_index.py).
+Pairs are compared blockwise with XOR and popcount over the whole array.
+
+Color variants of one style usually share a dHash (it ignores color), so a
+pair is only flagged when the mean colors also agree; what remains is almost
+always one picture saved under two keys, typically a row-offset mistake from
+Excel image anchors.
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from image_index import IMAGES_DIR
+from library_index import LibraryFeatureIndex
+
+HASH_INDEX_PATH = os.getenv('IMAGE_HASH_INDEX', os.path.join('..', 'cache', 'image_hashes.npz'))
+
+# Hamming distance (of 64 bits) at or below which two layouts count as the same picture
+DEFAULT_MAX_DISTANCE = 6
+# Largest per-channel difference in mean color (0-255) for a flagged pair
+COLOR_TOLERANCE = 12
+# Rows of the hash array compared against the rest at once (block x N uint64 in memory)
+COMPARE_BLOCK = 512
+
+# Set bits per byte value, for numpy < 2.0 which has no bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Number of set bits in each element of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    values = np.ascontiguousarray(values)
+    per_byte = _BYTE_POPCOUNT[values.view(np.uint8)].reshape(*values.shape, 8)
+    return per_byte.sum(axis=-1, dtype=np.uint8)
+
+
+def dhash(image) -> Tuple[int, Tuple[int, int, int]]:
+    """
+    Compute the difference hash and mean color of a PIL image.
+
+    Returns:
+        (64-bit hash, (r, g, b) mean color)
+    """
+    from PIL import Image
+
+    # Let the JPEG decoder downscale while decoding; only a few pixels are needed
+    image.draft('RGB', (64, 64))
+    rgb = image.convert('RGB')
+    mean = tuple(int(c) for c in np.asarray(rgb.resize((1, 1), Image.BOX)).reshape(3))
+
+    pixels = np.asarray(rgb.convert('L').resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big'), mean
+
+
+class HashIndex(LibraryFeatureIndex):
+    """dHash and mean color per library image, persisted and refreshed incrementally."""
+
+    FEATURES = {'hashes': ((), np.uint64), 'colors': ((3,), np.uint8)}
+    COMPUTED_STAT = 'hashed'
+
+    def __init__(self, images_dir: str = IMAGES_DIR, index_path: Optional[str] = HASH_INDEX_PATH):
+        self._pairs_cache: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+        super().__init__(images_dir, index_path)
+
+    def features_of(self, image) -> Tuple[int, Tuple[int, int, int]]:
+        return dhash(image)
+
+    def _changed(self):
+        self._pairs_cache.clear()
+
+    def near_duplicate_pairs(self, max_distance: int = DEFAULT_MAX_DISTANCE,
+                             color_tolerance: int = COLOR_TOLERANCE) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find every pair of images with matching layout and color.
+
+        Returns:
+            (pairs, names): int64 array of shape (pairs, 4) holding index a,
+            index b, hamming distance and largest mean-color channel
+            difference, sorted by distance; and the file names it indexes
+        """
+        key = (max_distance, color_tolerance)
+        with self._lock:
+            cached = self._pairs_cache.get(key)
+            if cached is not None:
+                return cached
+            names, hashes, colors = self.names, self.hashes, self.colors.astype(np.int16)
+
+        found = []
+        n = len(hashes)
+        for start in range(0, n, COMPARE_BLOCK):
+            block = hashes[start:start + COMPARE_BLOCK]
+            distances = popcount64(block[:, None] ^ hashes[None, :])
+            rows, cols = np.nonzero(distances <= max_distance)
+            a = rows + start
+            # Upper triangle only: each pair once, never an image with itself
+            upper = cols > a
+            a, b = a[upper], cols[upper]
+            if not len(a):
+                continue
+            color_delta = np.abs(colors[a] - colors[b]).max(axis=1)
+            keep = color_delta <= color_tolerance
+            found.append(np.stack([a[keep], b[keep], distances[rows[upper][keep], b[keep]], color_delta[keep]], axis=1))
+
+        pairs = np.concatenate(found).astype(np.int64) if found else np.zeros((0, 4), dtype=np.int64)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0], pairs[:, 2]))]
+        with self._lock:
+            # A refresh may have replaced the arrays meanwhile; don't cache a stale result
+            if self.hashes is hashes:
+                self._pairs_cache[key] = (pairs, names)
+        return pairs, names
+
+    def duplicate_report(self, limit: int = 50, offset: int = 0,
+                         max_distance: int = DEFAULT_MAX_DISTANCE,
+                         color_tolerance: int = COLOR_TOLERANCE) -> Dict:
+        """
+        Page through suspected mismatches: one picture under two style/color keys.
+
+        Returns:
+            Dictionary with total, limit, offset and the pairs on this page
+        """
+        pairs, names = self.near_duplicate_pairs(max_distance, color_tolerance)
+        page = pairs[offset:offset + limit]
+        results = []
+        for a, b, distance, color_delta in page.tolist():
+            name_a, name_b = str(names[a]), str(names[b])
+            key_a, key_b = os.path.splitext(name_a)[0], os.path.splitext(name_b)[0]
+            results.append({
+                'image_a': name_a,
+                'image_b': name_b,
+                'key_a': key_a,
+                'key_b': key_b,
+                'same_style': key_a.split('_', 1)[0] == key_b.split('_', 1)[0],
+                'distance': distance,
+                'color_delta': color_delta
+            })
+        return {
+            'total': int(len(pairs)),
+            'limit': limit,
+            'offset': offset,
+            'images_indexed': int(len(names)),
+            'pairs': results
+        }
+
+
+_index: Optional[HashIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_hash_index() -> HashIndex:
+    """Return the process-wide index of the image library, loaded on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = HashIndex()
+        return _index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Update the perceptual-hash index and list suspected image mismatches.')
+    parser.add_argument('--images-dir', default=IMAGES_DIR)
+    parser.add_argument('--max-distance', type=int, default=DEFAULT_MAX_DISTANCE)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    index = HashIndex(args.images_dir)
+    stats = index.refresh()
+    print(f"Indexed {stats['total']} images ({stats['hashed']} hashed, {stats['failed']} failed) in {stats['seconds']}s")
+    report = index.duplicate_report(limit=args.limit, max_distance=args.max_distance)
+    print(f"{report['total']} suspected mismatches")
+    for pair in report['pairs']:
+        print(f"  {pair['distance']:2d}  {pair['image_a']}  <->  {pair['image_b']}")
@@ -0,0 +1,103 @@
+"""
+Process-wide index of the image library, so URL lookups are set lookups.
+
+The index holds every file name in IMAGES_DIR; a name not in it is a known
+miss. It is rebuilt when the directory's mtime changes (checked at most once
+per CHECK_INTERVAL_SECONDS), which covers files added, removed or replaced
+by rename in other processes, and updated directly by extraction in this
+process. URLs carry a hash of the file's bytes (?v=), computed on first use
+and kept until the file's mtime or size changes.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from static_assets import file_digest
+
+IMAGES_DIR = os.getenv('IMAGES_DIR', os.path.join('..', 'static', 'images'))
+IMAGES_URL_PREFIX = '/static/images'
+CHECK_INTERVAL_SECONDS = float(os.getenv('IMAGE_INDEX_CHECK_SECONDS', '1.0'))
+
+# Directory mtimes this recent may not reflect writes in the same tick on
+# coarse-grained filesystems, so such a scan is redone on the next check
+MTIME_SETTLE_SECONDS = 2.0
+
+
+class ImageIndex:
+    """Image file names (with their stat) in one directory, refreshed on mtime change."""
+
+    def __init__(self, images_dir: str = IMAGES_DIR, check_interval: float = CHECK_INTERVAL_SECONDS):
+        self.images_dir = images_dir
+        self.check_interval = check_interval
+        self._names: Optional[Dict[str, os.stat_result]] = None
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _dir_mtime_ns(self) -> Optional[int]:
+        try:
+            return os.stat(self.images_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def refresh(self) -> int:
+        """Rescan the directory now and return the number of files."""
+        mtime_ns = self._dir_mtime_ns()
+        names = {}
+        if mtime_ns is not None:
+            with os.scandir(self.images_dir) as entries:
+                names = {entry.name: entry.stat() for entry in entries if entry.is_file()}
+
+        with self._lock:
+            self._names = names
+            recent = mtime_ns is not None and time.time() - mtime_ns / 1e9 < MTIME_SETTLE_SECONDS
+            self._mtime_ns = None if recent else mtime_ns
+            self._checked_at = time.monotonic()
+        return len(names)
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self._names is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        if self._names is None or self._dir_mtime_ns() != self._mtime_ns:
+            self.refresh()
+
+    def version(self, filename: str) -> Optional[str]:
+        """Return the content hash of a library file, or None if it is not in the library."""
+        self._ensure_current()
+        stat_result = self._names.get(filename)
+        if stat_result is None:
+            return None
+        try:
+            return file_digest(os.path.join(self.images_dir, filename), stat_result)
+        except FileNotFoundError:
+            return None
+
+    def _in_library(self, path: str) -> bool:
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.images_dir)
+
+    def add(self, path: str):
+        """Record a file written to the library (paths outside it are ignored)."""
+        if not self._in_library(path):
+            return
+        stat_result = os.stat(path)
+        with self._lock:
+            if self._names is not None:
+                self._names[os.path.basename(path)] = stat_result
+
+    def discard(self, path: str):
+        """Record a file removed from the library (paths outside it are ignored)."""
+        if not self._in_library(path):
+            return
+        with self._lock:
+            if self._names is not None:
+                self._names.pop(os.path.basename(path), None)
+
+    def __len__(self) -> int:
+        self._ensure_current()
+        return len(self._names)
+
+
+image_index = ImageIndex()
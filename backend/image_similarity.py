@@ -0,0 +1,145 @@
+"""
+Color-histogram index of the image library, for "find items that look like this".
+
+Each image is reduced to a small histogram of its colors: hue x saturation x
+brightness bins for colored pixels and brightness-only bins for gray ones,
+ignoring the near-white studio background. Histograms are stored square-rooted
+and L1-normalized, so the dot product of two of them is their Bhattacharyya
+coefficient (1.0 for identical color distributions) and a query against the
+whole catalog is one matrix-vector product.
+
+Like the perceptual-hash index (image_hashes.py), features live in an
+incrementally refreshed .npz file (library_index.py), so a refresh only
+decodes images that were added or changed.
+"""
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from image_index import IMAGES_DIR
+from library_index import LibraryFeatureIndex
+
+SIMILARITY_INDEX_PATH = os.getenv('IMAGE_SIMILARITY_INDEX', os.path.join('..', 'cache', 'image_colors.npz'))
+
+HUE_BINS = 12
+SATURATION_BINS = 2
+VALUE_BINS = 2
+GRAY_BINS = 4
+FEATURE_SIZE = HUE_BINS * SATURATION_BINS * VALUE_BINS + GRAY_BINS
+
+# Saturation (0-255) below which a pixel counts as gray and its hue is ignored
+GRAY_SATURATION = 40
+# Near-white, unsaturated pixels are background on product shots
+BACKGROUND_VALUE = 225
+BACKGROUND_SATURATION = 30
+# Fraction of the query photo kept around its centre, where the shoe usually is
+QUERY_CROP = 0.8
+# Pixels per side the image is reduced to before binning
+SAMPLE_EDGE = 64
+
+
+def color_features(image, crop: float = 1.0) -> np.ndarray:
+    """
+    Compute the color histogram feature of a PIL image.
+
+    Args:
+        image: Decoded (or lazily opened) PIL image
+        crop: Fraction of width and height to keep around the centre
+
+    Returns:
+        float32 vector of FEATURE_SIZE, square-rooted and L1-normalized before the root
+    """
+    image.draft('RGB', (SAMPLE_EDGE * 2, SAMPLE_EDGE * 2))
+    rgb = image.convert('RGB')
+    if crop < 1.0:
+        w, h = rgb.size
+        dx, dy = int(w * (1 - crop) / 2), int(h * (1 - crop) / 2)
+        rgb = rgb.crop((dx, dy, w - dx, h - dy))
+    rgb.thumbnail((SAMPLE_EDGE, SAMPLE_EDGE))
+
+    hsv = np.asarray(rgb.convert('HSV'), dtype=np.int32).reshape(-1, 3)
+    hue, sat, val = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+
+    foreground = ~((sat < BACKGROUND_SATURATION) & (val > BACKGROUND_VALUE))
+    # A white shoe on white: fall back to every pixel rather than an empty histogram
+    if foreground.sum() >= len(hsv) // 20:
+        hue, sat, val = hue[foreground], sat[foreground], val[foreground]
+
+    gray = sat < GRAY_SATURATION
+    colored_bins = (
+        (hue * HUE_BINS // 256) * SATURATION_BINS * VALUE_BINS
+        + ((sat - GRAY_SATURATION) * SATURATION_BINS // (256 - GRAY_SATURATION)) * VALUE_BINS
+        + val * VALUE_BINS // 256
+    )
+    gray_bins = HUE_BINS * SATURATION_BINS * VALUE_BINS + val * GRAY_BINS // 256
+    bins = np.where(gray, gray_bins, colored_bins)
+
+    hist = np.bincount(bins, minlength=FEATURE_SIZE).astype(np.float32)
+    hist /= max(hist.sum(), 1.0)
+    return np.sqrt(hist)
+
+
+class SimilarityIndex(LibraryFeatureIndex):
+    """Color feature per library image, persisted and refreshed incrementally."""
+
+    FEATURES = {'features': ((FEATURE_SIZE,), np.float32)}
+
+    def __init__(self, images_dir: str = IMAGES_DIR, index_path: Optional[str] = SIMILARITY_INDEX_PATH):
+        super().__init__(images_dir, index_path)
+
+    def features_of(self, image) -> Tuple[np.ndarray]:
+        return (color_features(image),)
+
+    def query(self, features: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Return the k library images whose colors are closest to a feature vector.
+
+        Returns:
+            (file name, similarity 0-1) pairs, most similar first
+        """
+        with self._lock:
+            names, matrix = self.names, self.features
+        if not len(names):
+            return []
+
+        scores = matrix @ features
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(str(names[i]), round(float(scores[i]), 4)) for i in top]
+
+
+_index: Optional[SimilarityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Return the process-wide index of the image library, loaded on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SimilarityIndex()
+        return _index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from PIL import Image
+
+    parser = argparse.ArgumentParser(description='Update the color similarity index, optionally querying it with a photo.')
+    parser.add_argument('photo', nargs='?', help='Photo to find look-alikes for')
+    parser.add_argument('--images-dir', default=IMAGES_DIR)
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    index = SimilarityIndex(args.images_dir)
+    stats = index.refresh()
+    print(f"Indexed {stats['total']} images ({stats['computed']} computed, {stats['failed']} failed) in {stats['seconds']}s")
+    if args.photo:
+        with Image.open(args.photo) as photo:
+            query = color_features(photo, crop=QUERY_CROP)
+        for name, score in index.query(query, args.k):
+            print(f"  {score:.3f}  {name}")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Point-in-time snapshots of the image library, taken before re-extracting.
+
+A snapshot is a directory of hard links to the library's files, so taking
+one costs a directory entry per image rather than a copy of every byte.
+This is only safe because extraction never rewrites a library file in
+place: it writes a temporary file and renames it over the old name (see
+InventoryParser.extract_images_to_folder), which leaves the snapshot's link
+pointing at the old content. Where hard links aren't available (another
+filesystem), files are copied instead.
+
+Only the newest SNAPSHOT_KEEP snapshots are kept.
+
+Usage:
+    python image_snapshots.py create [label]
+    python image_snapshots.py list
+    python image_snapshots.py restore <name>
+    python image_snapshots.py prune
+"""
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from image_index import IMAGES_DIR, image_index
+
+SNAPSHOTS_DIR = os.getenv('IMAGE_SNAPSHOTS_DIR', os.path.join('..', 'snapshots', 'images'))
+SNAPSHOT_KEEP = int(os.getenv('IMAGE_SNAPSHOT_KEEP', '10'))
+
+
+def _link_or_copy(source: str, dest: str) -> bool:
+    """Hard-link source to dest, copying if linking isn't possible; returns True if linked."""
+    try:
+        os.link(source, dest)
+        return True
+    except OSError:
+        shutil.copy2(source, dest)
+        return False
+
+
+def create_snapshot(images_dir: str = IMAGES_DIR, label: Optional[str] = None,
+                    snapshots_dir: str = SNAPSHOTS_DIR, keep: Optional[int] = SNAPSHOT_KEEP) -> Dict:
+    """
+    Snapshot the image library and prune old snapshots.
+
+    Args:
+        images_dir: Library to snapshot
+        label: Optional suffix for the snapshot name (e.g. the workbook name)
+        snapshots_dir: Where snapshots are kept
+        keep: Number of newest snapshots to retain (None skips pruning)
+
+    Returns:
+        Dictionary with the snapshot name and path, file counts and seconds taken
+    """
+    started = time.perf_counter()
+    name = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if label:
+        name += '_' + ''.join(c if c.isalnum() or c in '-.' else '-' for c in label)[:40]
+    path = os.path.join(snapshots_dir, name)
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(snapshots_dir, f"{name}-{suffix}")
+
+    os.makedirs(path)
+    linked = copied = 0
+    if os.path.isdir(images_dir):
+        with os.scandir(images_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.endswith('.tmp'):
+                    continue
+                if _link_or_copy(entry.path, os.path.join(path, entry.name)):
+                    linked += 1
+                else:
+                    copied += 1
+
+    pruned = prune_snapshots(snapshots_dir, keep) if keep is not None else 0
+    return {
+        'name': os.path.basename(path),
+        'path': path,
+        'files': linked + copied,
+        'linked': linked,
+        'copied': copied,
+        'pruned': pruned,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def list_snapshots(snapshots_dir: str = SNAPSHOTS_DIR) -> List[Dict]:
+    """Return snapshots, newest first, with their file counts."""
+    if not os.path.isdir(snapshots_dir):
+        return []
+    with os.scandir(snapshots_dir) as entries:
+        dirs = [(entry.stat().st_mtime_ns, entry.name, entry.path) for entry in entries if entry.is_dir()]
+    # Snapshots are never modified after they are taken, so mtime orders them
+    return [
+        {'name': name, 'path': path, 'files': len(os.listdir(path))}
+        for _, name, path in sorted(dirs, reverse=True)
+    ]
+
+
+def prune_snapshots(snapshots_dir: str = SNAPSHOTS_DIR, keep: int = SNAPSHOT_KEEP) -> int:
+    """Delete all but the newest `keep` snapshots; returns how many were deleted."""
+    old = list_snapshots(snapshots_dir)[keep:]
+    for snapshot in old:
+        shutil.rmtree(snapshot['path'], ignore_errors=True)
+    return len(old)
+
+
+def restore_snapshot(name: str, images_dir: str = IMAGES_DIR, snapshots_dir: str = SNAPSHOTS_DIR) -> Dict:
+    """
+    Put the library back to a snapshot's contents.
+
+    Each file is linked in under a temporary name and renamed into place, so
+    readers never see a partial file; files the snapshot didn't have are
+    removed. A fresh snapshot of the current state is taken first.
+
+    Returns:
+        Dictionary with restored and removed counts and the pre-restore snapshot name
+    """
+    source = os.path.join(snapshots_dir, name)
+    if not os.path.isdir(source):
+        raise FileNotFoundError(f"No snapshot named {name}")
+
+    # Not pruned yet: the snapshot being restored may be the oldest one kept
+    before = create_snapshot(images_dir, label='before-restore', snapshots_dir=snapshots_dir, keep=None)
+    os.makedirs(images_dir, exist_ok=True)
+
+    wanted = set(os.listdir(source))
+    restored = 0
+    for filename in wanted:
+        target = os.path.join(images_dir, filename)
+        if os.path.exists(target) and os.path.samefile(os.path.join(source, filename), target):
+            # Unchanged since the snapshot (renaming a link over itself would be a no-op anyway)
+            continue
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        _link_or_copy(os.path.join(source, filename), tmp_path)
+        # A restored file is new to the library: thumbnails and hashes keyed on mtime must be redone
+        os.utime(tmp_path)
+        os.replace(tmp_path, target)
+        restored += 1
+
+    removed = 0
+    for filename in os.listdir(images_dir):
+        path = os.path.join(images_dir, filename)
+        if filename not in wanted and os.path.isfile(path):
+            os.unlink(path)
+            image_index.discard(path)
+            removed += 1
+
+    image_index.refresh()
+    prune_snapshots(snapshots_dir)
+    return {'restored': restored, 'removed': removed, 'previous_state': before['name']}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('create', 'list', 'restore', 'prune'):
+        print(__doc__.split('Usage:')[1].rstrip())
+        return 1
+
+    command = sys.argv[1]
+    if command == 'create':
+        result = create_snapshot(label=sys.argv[2] if len(sys.argv) > 2 else None)
+        print(f"Snapshot {result['name']}: {result['files']} images "
+              f"({result['linked']} linked, {result['copied']} copied) in {result['seconds']}s")
+        if result['pruned']:
+            print(f"Pruned {result['pruned']} old snapshot(s)")
+    elif command == 'list':
+        for snapshot in list_snapshots():
+            print(f"  {snapshot['name']}  ({snapshot['files']} images)")
+    elif command == 'restore':
+        if len(sys.argv) < 3:
+            print("Usage: python image_snapshots.py restore <name>")
+            return 1
+        result = restore_snapshot(sys.argv[2])
+        print(f"Restored {result['restored']} images, removed {result['removed']}")
+        print(f"Previous state saved as snapshot {result['previous_state']}")
+        print("Run `python item_images.py` to update stored image URLs.")
+    else:
+        print(f"Pruned {prune_snapshots()} snapshot(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Extract workbook images into the image library, many workbooks at once.
+
+Each workbook is handled by a worker process using InventoryParser's own
+row mapping (InventoryParser.image_rows), so every tool names images the
+same way the upload path does. A manifest records, for each library file,
+a hash of the embedded image it came from and the content hash of the file
+written; an image whose source bytes and library file are both unchanged is
+skipped without being decoded.
+
+Before anything is written to the library a snapshot is taken (see
+image_snapshots.py), and afterwards the image index and the URLs stored on
+items are brought up to date.
+
+Usage:
+    python image_sync.py inventory.xlsx [more.xlsx ...]
+    python image_sync.py --force inventory.xlsx        # rewrite every image
+    python image_sync.py --images-dir ../static/images_fixed inventory.xlsx
+"""
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from image_index import IMAGES_DIR, image_index
+from static_assets import file_digest
+
+IMAGE_SYNC_PROCESSES = int(os.getenv('IMAGE_SYNC_PROCESSES', str(min(4, os.cpu_count() or 1))))
+IMAGE_MANIFEST_DIR = os.getenv('IMAGE_MANIFEST_DIR', os.path.join('..', 'cache', 'image_sync'))
+
+# Listed in the summary; the counts always cover everything
+SUMMARY_LIST_LIMIT = 20
+
+
+def is_library(images_dir: str) -> bool:
+    return os.path.abspath(images_dir) == os.path.abspath(IMAGES_DIR)
+
+
+def manifest_path(images_dir: str) -> str:
+    """Manifest file for an output directory (one per directory)."""
+    key = hashlib.sha256(os.path.abspath(images_dir).encode()).hexdigest()[:12]
+    return os.path.join(IMAGE_MANIFEST_DIR, f"manifest_{key}.json")
+
+
+def load_manifest(images_dir: str) -> Dict[str, Dict]:
+    """Return the manifest entries of an output directory, keyed by file name."""
+    try:
+        with open(manifest_path(images_dir)) as f:
+            return json.load(f)['files']
+    except (FileNotFoundError, KeyError, ValueError):
+        return {}
+
+
+def save_manifest(images_dir: str, entries: Dict[str, Dict]):
+    path = manifest_path(images_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'images_dir': os.path.abspath(images_dir), 'files': entries}, f)
+    os.replace(tmp_path, path)
+
+
+def _file_matches(filepath: str, entry: Dict) -> bool:
+    """Return True if a library file still holds what the manifest says was written."""
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return False
+    if (st.st_mtime_ns, st.st_size) == (entry.get('mtime_ns'), entry.get('size')):
+        return True
+    return file_digest(filepath, st) == entry.get('digest')
+
+
+def sync_workbook(path: str, images_dir: str, known: Dict[str, Dict],
+                  force: bool = False, thumbnails: bool = True) -> Dict:
+    """
+    Extract one workbook's images into images_dir (runs in a worker process).
+
+    Args:
+        path: Workbook to read
+        images_dir: Output directory
+        known: Manifest entries for images_dir
+        force: Rewrite images even when unchanged
+        thumbnails: Also write the thumbnail sizes
+
+    Returns:
+        Dictionary with the new manifest entries, the added, changed and
+        unchanged file names, unmatched anchor rows and failures
+    """
+    from PIL import Image
+    from excel_parser import InventoryParser, save_library_image
+    from thumbnails import write_thumbnails, thumbs_dir_for
+
+    parser = InventoryParser(path)
+    thumbs_dir = thumbs_dir_for(images_dir)
+    workbook = os.path.basename(path)
+    result = {
+        'workbook': workbook,
+        'entries': {},
+        'added': [],
+        'changed': [],
+        'unchanged': [],
+        'unmatched': [],
+        'conflicts': [],
+        'failed': []
+    }
+
+    for row_idx, filename, img in parser.image_rows():
+        if filename is None:
+            # Anchor on a row without a usable style/color: usually an image placed a row off
+            result['unmatched'].append(row_idx)
+            continue
+
+        try:
+            data = img._data()
+            source = hashlib.sha256(data).hexdigest()[:16]
+            if filename in result['entries']:
+                if result['entries'][filename]['source'] != source:
+                    result['conflicts'].append({'file': filename, 'workbooks': [workbook], 'row': row_idx})
+                continue
+
+            filepath = os.path.join(images_dir, filename)
+            entry = known.get(filename)
+            if not force and entry and entry['source'] == source and _file_matches(filepath, entry):
+                result['entries'][filename] = {**entry, 'workbook': workbook}
+                result['unchanged'].append(filename)
+                continue
+
+            previous = file_digest(filepath) if os.path.exists(filepath) else None
+            image = Image.open(io.BytesIO(data))
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            save_library_image(image, filepath)
+            if thumbnails:
+                try:
+                    write_thumbnails(image, filename, thumbs_dir)
+                except Exception as e:
+                    print(f"✗ Could not render thumbnails for {filename}: {e}")
+
+            st = os.stat(filepath)
+            digest = file_digest(filepath, st)
+            result['entries'][filename] = {
+                'source': source,
+                'digest': digest,
+                'mtime_ns': st.st_mtime_ns,
+                'size': st.st_size,
+                'workbook': workbook
+            }
+            if previous is None:
+                result['added'].append(filename)
+            elif previous != digest:
+                result['changed'].append(filename)
+            else:
+                result['unchanged'].append(filename)
+        except Exception as e:
+            print(f"✗ {workbook} row {row_idx}: {e}")
+            result['failed'].append({'row': row_idx, 'file': filename, 'error': str(e)})
+
+    return result
+
+
+def sync_images(workbooks: List[str], images_dir: str = IMAGES_DIR, processes: Optional[int] = None,
+                force: bool = False, thumbnails: bool = True, snapshot: bool = True,
+                update_items: bool = True) -> Dict:
+    """
+    Extract the images of several workbooks into a directory, one process per workbook.
+
+    When the same file name is claimed by different images in two workbooks,
+    whichever workbook finished last is on disk; such names are reported as
+    conflicts.
+
+    Args:
+        workbooks: Workbook paths
+        images_dir: Output directory (the library by default)
+        processes: Worker processes (IMAGE_SYNC_PROCESSES by default)
+        force: Rewrite images even when unchanged
+        thumbnails: Also write the thumbnail sizes
+        snapshot: Snapshot the library first (library only)
+        update_items: Update the URLs stored on items afterwards (library only)
+
+    Returns:
+        Dictionary with added, changed, unchanged, unmatched, conflicts and
+        failed lists, per-workbook counts and seconds taken
+    """
+    started = time.perf_counter()
+    os.makedirs(images_dir, exist_ok=True)
+    library = is_library(images_dir)
+
+    snapshot_name = None
+    if snapshot and library:
+        from image_snapshots import create_snapshot
+        snapshot_name = create_snapshot(images_dir, label='sync')['name']
+
+    known = load_manifest(images_dir)
+    results = {}
+    workers = max(1, min(processes or IMAGE_SYNC_PROCESSES, len(workbooks)))
+    if workers == 1:
+        for path in workbooks:
+            results[path] = sync_workbook(path, images_dir, known, force, thumbnails)
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {
+                pool.submit(sync_workbook, path, images_dir, known, force, thumbnails): path
+                for path in workbooks
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    print(f"✗ {os.path.basename(path)}: {e}")
+                    results[path] = {'workbook': os.path.basename(path), 'error': str(e), 'entries': {}}
+                else:
+                    print(f"✓ {os.path.basename(path)}: {len(results[path]['entries'])} images")
+
+    summary = {key: [] for key in ('added', 'changed', 'unchanged', 'unmatched', 'conflicts', 'failed')}
+    summary['workbooks'] = {}
+    entries = dict(known)
+    claimed = {}
+    for path in workbooks:
+        result = results[path]
+        workbook = result['workbook']
+        if 'error' in result:
+            summary['workbooks'][workbook] = {'error': result['error']}
+            continue
+        for filename, entry in result['entries'].items():
+            if filename in claimed and claimed[filename]['source'] != entry['source']:
+                summary['conflicts'].append({'file': filename, 'workbooks': [claimed[filename]['workbook'], workbook]})
+            claimed[filename] = entry
+            entries[filename] = entry
+        summary['conflicts'].extend(result['conflicts'])
+        summary['unmatched'].extend({'workbook': workbook, 'row': row} for row in result['unmatched'])
+        summary['failed'].extend({'workbook': workbook, **failure} for failure in result['failed'])
+        for key in ('added', 'changed', 'unchanged'):
+            summary[key].extend(result[key])
+        summary['workbooks'][workbook] = {
+            key: len(result[key]) for key in ('added', 'changed', 'unchanged', 'unmatched', 'failed')
+        }
+
+    # The file on disk is the last one written; its recorded hash must match it
+    for conflict in summary['conflicts']:
+        filename = conflict['file']
+        filepath = os.path.join(images_dir, filename)
+        if filename in entries and not _file_matches(filepath, entries[filename]):
+            del entries[filename]
+    # Forget files that are no longer in the directory
+    entries = {name: entry for name, entry in entries.items() if os.path.exists(os.path.join(images_dir, name))}
+    save_manifest(images_dir, entries)
+
+    items_updated = 0
+    if library:
+        image_index.refresh()
+    if update_items and library:
+        from database import ensure_schema, get_session
+        from item_images import sync_item_image_urls
+
+        ensure_schema()
+        session = get_session()
+        try:
+            items_updated = sync_item_image_urls(session)
+            session.commit()
+        finally:
+            session.close()
+
+    summary.update({
+        'images_dir': images_dir,
+        'snapshot': snapshot_name,
+        'items_updated': items_updated,
+        'seconds': round(time.perf_counter() - started, 2)
+    })
+    return summary
+
+
+def print_summary(summary: Dict):
+    print("\n" + "=" * 70)
+    print("  IMAGE SYNC COMPLETE")
+    print("=" * 70)
+    for workbook, counts in summary['workbooks'].items():
+        if 'error' in counts:
+            print(f"  {workbook}: FAILED ({counts['error']})")
+        else:
+            print(f"  {workbook}: {counts['added']} added, {counts['changed']} changed, "
+                  f"{counts['unchanged']} unchanged, {counts['unmatched']} unmatched, {counts['failed']} failed")
+    print("-" * 70)
+    print(f"Added:      {len(summary['added'])}")
+    print(f"Changed:    {len(summary['changed'])}")
+    print(f"Skipped:    {len(summary['unchanged'])} (unchanged)")
+    print(f"Mismatched: {len(summary['unmatched'])} anchors on rows without style/color, "
+          f"{len(summary['conflicts'])} names claimed by different images")
+    if summary['failed']:
+        print(f"Failed:     {len(summary['failed'])}")
+    for item in summary['unmatched'][:SUMMARY_LIST_LIMIT]:
+        print(f"  ? {item['workbook']} row {item['row'] + 1}: no style/color on this row")
+    for conflict in summary['conflicts'][:SUMMARY_LIST_LIMIT]:
+        print(f"  ! {conflict['file']}: different images in {' and '.join(conflict['workbooks'])}")
+    print(f"\nSaved to: {summary['images_dir']} in {summary['seconds']}s")
+    if summary['snapshot']:
+        print(f"Previous images: snapshot {summary['snapshot']} "
+              f"(restore with: python image_snapshots.py restore {summary['snapshot']})")
+    if summary['items_updated']:
+        print(f"Updated image URLs on {summary['items_updated']} items")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Extract workbook images into the image library.')
+    parser.add_argument('workbooks', nargs='+', help='Excel workbooks to read')
+    parser.add_argument('--images-dir', default=IMAGES_DIR, help='Output directory (default: the image library)')
+    parser.add_argument('--processes', type=int, default=None, help='Worker processes')
+    parser.add_argument('--force', action='store_true', help='Rewrite images even when unchanged')
+    parser.add_argument('--no-thumbnails', action='store_true', help='Skip writing thumbnail sizes')
+    parser.add_argument('--no-snapshot', action='store_true', help='Skip the snapshot of the library')
+    args = parser.parse_args(argv)
+
+    missing = [path for path in args.workbooks if not os.path.exists(path)]
+    if missing:
+        print(f"Error: File not found: {', '.join(missing)}")
+        return 1
+
+    summary = sync_images(
+        args.workbooks,
+        images_dir=args.images_dir,
+        processes=args.processes,
+        force=args.force,
+        thumbnails=not args.no_thumbnails,
+        snapshot=not args.no_snapshot
+    )
+    print_summary(summary)
+    return 1 if summary['failed'] or any('error' in c for c in summary['workbooks'].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
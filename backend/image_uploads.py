@@ -0,0 +1,130 @@
+"""
+Product images uploaded through the API for existing items.
+
+The request only streams each file to the job's spool directory and checks
+that it looks like an image; decoding, writing the library file and its
+thumbnails and updating the item's stored URLs happen in a background job
+(kind 'images') on the job runner, so the request returns immediately and
+progress is followed on /upload-jobs/{upload_id} like a workbook upload.
+"""
+import os
+from typing import Callable, Dict, List, Optional
+
+from database import get_session, Item
+from image_index import IMAGES_DIR, image_index
+from item_images import apply_image_urls
+
+IMAGE_UPLOAD_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+MAX_IMAGE_UPLOAD_MB = int(os.getenv('MAX_IMAGE_UPLOAD_MB', '20'))
+MAX_IMAGE_UPLOAD_BYTES = MAX_IMAGE_UPLOAD_MB * 1024 * 1024
+# Larger uploads are scaled down to this edge before being stored in the library
+MAX_LIBRARY_EDGE = int(os.getenv('MAX_LIBRARY_EDGE', '2000'))
+
+
+def sniff_image_type(path: str) -> Optional[str]:
+    """Return 'jpeg', 'png' or 'webp' from a file's magic bytes, or None."""
+    with open(path, 'rb') as f:
+        head = f.read(12)
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def item_id_from_filename(filename: str) -> str:
+    """Item id named by an upload's file name, e.g. 100702_BBK.jpg -> 100702_BBK."""
+    return os.path.splitext(os.path.basename(filename))[0].strip()
+
+
+def store_item_image(path: str, item: Item, images_dir: str = IMAGES_DIR) -> str:
+    """
+    Decode an uploaded image and write it and its thumbnails into the library.
+
+    Args:
+        path: Spooled upload
+        item: Item the image belongs to
+        images_dir: Library directory
+
+    Returns:
+        Library file name
+    """
+    from PIL import Image, ImageOps
+    from excel_parser import save_library_image
+    from thumbnails import write_thumbnails, thumbs_dir_for
+
+    filename = f"{item.style}_{item.color}.jpg"
+    with Image.open(path) as image:
+        # Phone photos are often stored sideways with an EXIF rotation
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        if max(image.size) > MAX_LIBRARY_EDGE:
+            image.thumbnail((MAX_LIBRARY_EDGE, MAX_LIBRARY_EDGE), Image.LANCZOS)
+
+        os.makedirs(images_dir, exist_ok=True)
+        filepath = os.path.join(images_dir, filename)
+        save_library_image(image, filepath)
+        image_index.add(filepath)
+        write_thumbnails(image, filename, thumbs_dir_for(images_dir))
+    return filename
+
+
+def run_image_upload_job(job, report: Callable[[Dict], None]) -> Dict:
+    """
+    Store the images of an 'images' job and update the items' stored URLs.
+
+    Each image is committed as soon as its derivatives are written, so one
+    bad file doesn't hold back the rest.
+
+    Args:
+        job: Job whose params hold the spooled images ({'item_id', 'filename', 'path'})
+        report: Callback receiving progress dictionaries
+
+    Returns:
+        Dictionary with counts, per-item URLs and failures
+    """
+    images: List[Dict] = (job.params or {}).get('images', [])
+    saved = {}
+    failed = []
+    session = get_session()
+    try:
+        for done, entry in enumerate(images):
+            report({
+                'status': 'processing',
+                'message': f"Processing image {done + 1}/{len(images)}...",
+                'percentage': int(done / max(len(images), 1) * 100)
+            })
+            item = session.query(Item).filter_by(id=entry['item_id']).first()
+            if item is None:
+                failed.append({**_public(entry), 'error': 'Item not found'})
+                continue
+            try:
+                filename = store_item_image(entry['path'], item)
+                apply_image_urls(item)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"✗ Could not store image {entry['filename']} for {entry['item_id']}: {e}")
+                failed.append({**_public(entry), 'error': str(e)})
+                continue
+            saved[item.id] = {
+                'file': filename,
+                'image_url': item.image_url,
+                'thumbnail_url': item.thumbnail_url
+            }
+    finally:
+        session.close()
+
+    return {
+        'images_saved': len(saved),
+        'images_failed': len(failed),
+        'items': saved,
+        'failed': failed
+    }
+
+
+def _public(entry: Dict) -> Dict:
+    return {'item_id': entry['item_id'], 'filename': entry['filename']}
@@ -0,0 +1,414 @@
+"""Diff-based ingest of parsed workbook rows into items and style summaries."""
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import cast, String
+from sqlalchemy.orm import Session
+
+from database import Item, StyleSummary
+
+# Fields compared to decide whether an existing item changed
+TRACKED_FIELDS = ('division', 'outsole', 'gender', 'image_url')
+
+# Keep IN (...) lists under SQLite's bound parameter limit
+QUERY_CHUNK_SIZE = 500
+
+
+def _chunks(values: List, size: int = QUERY_CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def load_items(session: Session, item_ids: Iterable[str]) -> Dict[str, Item]:
+    """Load items by id in chunks, keyed by id."""
+    item_ids = list(item_ids)
+    items = {}
+    for chunk in _chunks(item_ids):
+        for item in session.query(Item).filter(Item.id.in_(chunk)).all():
+            items[item.id] = item
+    return items
+
+
+def load_file_membership(session: Session, source_filename: str) -> Dict[str, Item]:
+    """
+    Load all items currently attributed to a source file.
+
+    The LIKE on the serialized JSON narrows the scan in SQL; the exact
+    membership check happens in Python.
+    """
+    pattern = f"%{json.dumps(source_filename)}%"
+    candidates = session.query(Item).filter(cast(Item.source_files, String).like(pattern)).all()
+    return {item.id: item for item in candidates if source_filename in (item.source_files or [])}
+
+
+def compute_diff(records: Dict[str, Dict], membership: Dict[str, Item]) -> Dict[str, List[str]]:
+    """
+    Compare parsed records against a file's current membership.
+
+    Args:
+        records: Parsed rows keyed by item id
+        membership: Items currently attributed to the file, keyed by id
+
+    Returns:
+        Dictionary of item id lists: added, removed, changed, unchanged
+    """
+    added = [item_id for item_id in records if item_id not in membership]
+    removed = [item_id for item_id in membership if item_id not in records]
+    changed = []
+    unchanged = []
+
+    for item_id, item in membership.items():
+        record = records.get(item_id)
+        if record is None:
+            continue
+        if _item_differs(item, record):
+            changed.append(item_id)
+        else:
+            unchanged.append(item_id)
+
+    return {
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+        'unchanged': unchanged
+    }
+
+
+def _item_differs(item: Item, record: Dict) -> bool:
+    for field in TRACKED_FIELDS:
+        new_value = record.get(field)
+        if field == 'image_url' and not new_value:
+            # A missing image in the sheet never clears a stored one
+            continue
+        if getattr(item, field) != new_value:
+            return True
+    return False
+
+
+def _apply_fields(item: Item, record: Dict):
+    for field in TRACKED_FIELDS:
+        value = record.get(field)
+        if field == 'image_url' and not value:
+            continue
+        setattr(item, field, value)
+
+
+def apply_diff(
+    session: Session,
+    source_filename: str,
+    records: Dict[str, Dict],
+    diff: Dict[str, List[str]],
+    membership: Dict[str, Item],
+    style_info: Dict[str, Dict],
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict:
+    """
+    Apply a computed diff for one source file without committing.
+
+    Added rows attach the file to existing items or create new ones, changed
+    rows update tracked fields, and removed rows detach the file, deleting
+    items that have no other source (the same rule as deleting a file).
+    Style summaries are rebuilt only for styles the diff touched.
+
+    Args:
+        session: Open database session (caller commits)
+        source_filename: Name of the source file
+        records: Parsed rows keyed by item id
+        diff: Result of compute_diff
+        membership: Items currently attributed to the file
+        style_info: Per-style division/outsole/gender keyed by 6-digit style
+        progress: Called as progress(rows_written, total_rows) every chunk of rows
+
+    Returns:
+        Dictionary with counts of applied changes
+    """
+    now = datetime.utcnow()
+    touched_styles: Set[str] = set()
+    items_deleted = 0
+    total_rows = len(diff['added']) + len(diff['changed']) + len(diff['removed'])
+    rows_written = 0
+
+    def advance():
+        nonlocal rows_written
+        rows_written += 1
+        if progress and (rows_written % QUERY_CHUNK_SIZE == 0 or rows_written == total_rows):
+            progress(rows_written, total_rows)
+
+    existing = load_items(session, diff['added'])
+    for item_id in diff['added']:
+        record = records[item_id]
+        item = existing.get(item_id)
+        if item:
+            _apply_fields(item, record)
+            item.source_files = sorted(set(item.source_files or []) | {source_filename})
+            item.updated_at = now
+        else:
+            session.add(Item(
+                id=item_id,
+                style=record['style'],
+                color=record['color'],
+                division=record['division'],
+                outsole=record['outsole'],
+                gender=record['gender'],
+                image_url=record.get('image_url'),
+                source_files=[source_filename]
+            ))
+        touched_styles.add(record['style'])
+        advance()
+
+    for item_id in diff['changed']:
+        item = membership[item_id]
+        _apply_fields(item, records[item_id])
+        item.updated_at = now
+        touched_styles.add(item.style)
+        advance()
+
+    for item_id in diff['removed']:
+        item = membership[item_id]
+        remaining = [f for f in item.source_files if f != source_filename]
+        if remaining:
+            item.source_files = remaining
+            item.updated_at = now
+        else:
+            session.delete(item)
+            items_deleted += 1
+        touched_styles.add(item.style)
+        advance()
+
+    session.flush()
+    summaries = rebuild_style_summaries(session, touched_styles, style_info)
+
+    return {
+        'items_deleted': items_deleted,
+        'styles_touched': len(touched_styles),
+        **summaries
+    }
+
+
+def rebuild_style_summaries(session: Session, styles: Iterable[str], style_info: Dict[str, Dict]) -> Dict:
+    """
+    Recompute colors and source files of style summaries from their items.
+
+    Summaries whose style no longer has items are deleted.
+    """
+    styles = sorted(set(styles))
+    items_by_style: Dict[str, List[Item]] = {style: [] for style in styles}
+    for chunk in _chunks(styles):
+        for item in session.query(Item).filter(Item.style.in_(chunk)).all():
+            items_by_style[item.style].append(item)
+
+    summaries = {}
+    for chunk in _chunks(styles):
+        for summary in session.query(StyleSummary).filter(StyleSummary.style.in_(chunk)).all():
+            summaries[summary.style] = summary
+
+    created = updated = deleted = 0
+    now = datetime.utcnow()
+    for style in styles:
+        items = items_by_style[style]
+        summary = summaries.get(style)
+
+        if not items:
+            if summary:
+                session.delete(summary)
+                deleted += 1
+            continue
+
+        colors = sorted({item.color for item in items})
+        files = sorted({f for item in items for f in (item.source_files or [])})
+
+        if summary:
+            summary.all_colors = colors
+            summary.source_files = files
+            summary.color_count = len(colors)
+            summary.updated_at = now
+            updated += 1
+        else:
+            info = style_info.get(style, {})
+            session.add(StyleSummary(
+                style=style,
+                all_colors=colors,
+                division=info.get('division'),
+                outsole=info.get('outsole'),
+                gender=info.get('gender'),
+                source_files=files,
+                color_count=len(colors)
+            ))
+            created += 1
+
+    return {
+        'styles_created': created,
+        'styles_updated': updated,
+        'styles_deleted': deleted
+    }
+
+
+def summarize_diff(diff: Dict[str, List[str]], records: Dict[str, Dict], membership: Dict[str, Item]) -> Dict:
+    """Build the client-facing diff summary (counts plus changed/removed rows)."""
+    def describe(item_id):
+        source = records.get(item_id) or membership[item_id]
+        if isinstance(source, dict):
+            return {'style': source['style'], 'color': source['color']}
+        return {'style': source.style, 'color': source.color}
+
+    return {
+        'added': len(diff['added']),
+        'removed': len(diff['removed']),
+        'changed': len(diff['changed']),
+        'unchanged': len(diff['unchanged']),
+        'removed_items': [describe(i) for i in diff['removed']],
+        'changed_items': [describe(i) for i in diff['changed']]
+    }
+
+
+def apply_batch(
+    session: Session,
+    parsed_files: Dict[str, Dict[str, Dict]],
+    style_info: Dict[str, Dict]
+) -> Dict:
+    """
+    Apply several parsed files as one merged upsert, without committing.
+
+    Rows are merged by item id across files (later files win on field values)
+    so every item is loaded and written once. Rows that disappeared from a
+    file's previous membership are detached as in apply_diff.
+
+    Args:
+        session: Open database session (caller commits)
+        parsed_files: Item records keyed by id, per source filename (in batch order)
+        style_info: Per-style division/outsole/gender keyed by 6-digit style
+
+    Returns:
+        Dictionary with merged counts and the per-file diff summaries
+    """
+    now = datetime.utcnow()
+    touched_styles: Set[str] = set()
+
+    # Per-file diffs against current membership, computed before any writes
+    file_diffs = {}
+    removals = {}
+    for filename, records in parsed_files.items():
+        membership = load_file_membership(session, filename)
+        diff = compute_diff(records, membership)
+        file_diffs[filename] = summarize_diff(diff, records, membership)
+        removals[filename] = [membership[item_id] for item_id in diff['removed']]
+
+    merged: Dict[str, Dict] = {}
+    for filename, records in parsed_files.items():
+        for item_id, record in records.items():
+            entry = merged.setdefault(item_id, {'record': record, 'files': set()})
+            entry['record'] = record
+            entry['files'].add(filename)
+
+    existing = load_items(session, merged)
+    items_created = items_updated = 0
+    for item_id, entry in merged.items():
+        record = entry['record']
+        item = existing.get(item_id)
+        if item:
+            files = set(item.source_files or []) | entry['files']
+            if _item_differs(item, record) or files != set(item.source_files or []):
+                _apply_fields(item, record)
+                item.source_files = sorted(files)
+                item.updated_at = now
+                items_updated += 1
+                touched_styles.add(item.style)
+        else:
+            session.add(Item(
+                id=item_id,
+                style=record['style'],
+                color=record['color'],
+                division=record['division'],
+                outsole=record['outsole'],
+                gender=record['gender'],
+                image_url=record.get('image_url'),
+                source_files=sorted(entry['files'])
+            ))
+            items_created += 1
+            touched_styles.add(record['style'])
+
+    items_deleted = 0
+    session.flush()
+    for filename, items in removals.items():
+        for item in items:
+            remaining = [f for f in item.source_files if f != filename]
+            if remaining:
+                item.source_files = remaining
+                item.updated_at = now
+            else:
+                session.delete(item)
+                items_deleted += 1
+            touched_styles.add(item.style)
+
+    session.flush()
+    summaries = rebuild_style_summaries(session, touched_styles, style_info)
+
+    return {
+        'items_merged': len(merged),
+        'items_created': items_created,
+        'items_updated': items_updated,
+        'items_deleted': items_deleted,
+        'styles_touched': len(touched_styles),
+        'files': file_diffs,
+        **summaries
+    }
+
+
+def build_dry_run_report(
+    session: Session,
+    source_filename: str,
+    records: Dict[str, Dict],
+    rejected_rows: List[Dict],
+    images_dir: str
+) -> Dict:
+    """
+    Describe what ingesting a parsed file would change, without writing.
+
+    Only keys are read from the database (item ids, style numbers and the
+    file's current membership), so the report stays cheap on large tables.
+
+    Args:
+        session: Open database session (read only)
+        source_filename: Name the file would be saved under
+        records: Parsed rows keyed by item id
+        rejected_rows: Rows the parser will skip
+        images_dir: Image library to check for {style}_{color}.jpg
+
+    Returns:
+        Dictionary with the dry-run report
+    """
+    existing_styles = {style for (style,) in session.query(StyleSummary.style).all()}
+    existing_items: Set[str] = set()
+    for chunk in _chunks(list(records)):
+        existing_items.update(item_id for (item_id,) in session.query(Item.id).filter(Item.id.in_(chunk)).all())
+
+    membership = load_file_membership(session, source_filename)
+    diff = compute_diff(records, membership)
+
+    parsed_styles = {record['style'] for record in records.values()}
+    image_files = set(os.listdir(images_dir)) if os.path.isdir(images_dir) else set()
+    missing_images = [
+        {'style': record['style'], 'color': record['color']}
+        for record in records.values()
+        if f"{record['style']}_{record['color']}.jpg" not in image_files
+    ]
+
+    return {
+        'dry_run': True,
+        'source_file': source_filename,
+        'rows_accepted': len(records),
+        'rows_rejected': len(rejected_rows),
+        'rejected_rows': rejected_rows,
+        'styles_new': len(parsed_styles - existing_styles),
+        'styles_existing': len(parsed_styles & existing_styles),
+        'colors_new': len([item_id for item_id in records if item_id not in existing_items]),
+        'colors_added': len(diff['added']),
+        'colors_changed': len(diff['changed']),
+        'colors_removed': len(diff['removed']),
+        'removed_items': [{'style': membership[i].style, 'color': membership[i].color} for i in diff['removed']],
+        'images_present': len(records) - len(missing_images),
+        'images_missing': len(missing_images),
+        'missing_images': missing_images
+    }
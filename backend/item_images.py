@@ -0,0 +1,94 @@
+"""
+Image and thumbnail URLs stored on items.
+
+Read paths return Item.image_url and Item.thumbnail_url as stored and never
+look at the image library. The stored values are resolved here whenever the
+pipeline changes what an item's image is: when a file is saved (new items may
+already have an extracted image, and extraction runs just before the save),
+and by running this module as a script after images were added or removed
+outside the app.
+
+An image_url that came from the sheet itself (any URL outside the library)
+takes precedence and is never replaced or cleared.
+
+Usage:
+    python item_images.py              # resolve URLs for every item
+"""
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from database import Item, get_session, ensure_schema
+from image_index import image_index, IMAGES_URL_PREFIX
+from ingest import load_items
+from static_assets import versioned_url
+from thumbnails import thumbnail_url
+
+
+def is_library_url(url: Optional[str]) -> bool:
+    """Return True if a URL points into the image library (as opposed to one from the sheet)."""
+    return bool(url) and url.startswith(f"{IMAGES_URL_PREFIX}/")
+
+
+def resolve_image_urls(style: str, color: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resolve a style/color against the image library.
+
+    Returns:
+        (image_url, thumbnail_url), both content-hashed, or (None, None) without an image
+    """
+    filename = f"{style}_{color}.jpg"
+    digest = image_index.version(filename)
+    if digest is None:
+        return None, None
+    return versioned_url(f"{IMAGES_URL_PREFIX}/{filename}", digest), thumbnail_url(filename, version=digest)
+
+
+def apply_image_urls(item: Item) -> bool:
+    """Set an item's stored URLs from the library; returns True if anything changed."""
+    image_url, thumb_url = resolve_image_urls(item.style, item.color)
+    changed = False
+    if (item.image_url is None or is_library_url(item.image_url)) and item.image_url != image_url:
+        item.image_url = image_url
+        changed = True
+    if item.thumbnail_url != thumb_url:
+        item.thumbnail_url = thumb_url
+        changed = True
+    return changed
+
+
+def sync_item_image_urls(session: Session, item_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Rewrite stored image URLs for the given items (all items if None) without committing.
+
+    Args:
+        session: Open database session (caller commits)
+        item_ids: Items to resolve; unknown ids are ignored
+
+    Returns:
+        Number of items whose URLs changed
+    """
+    if item_ids is None:
+        item_ids = [item_id for (item_id,) in session.query(Item.id)]
+
+    updated = 0
+    for item in load_items(session, item_ids).values():
+        if apply_image_urls(item):
+            updated += 1
+    return updated
+
+
+def main():
+    ensure_schema()
+    image_index.refresh()
+    session = get_session()
+    try:
+        updated = sync_item_image_urls(session)
+        session.commit()
+    finally:
+        session.close()
+    print(f"Updated image URLs on {updated} items ({len(image_index)} images in library)")
+
+
+if __name__ == "__main__":
+    main()
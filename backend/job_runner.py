@@ -0,0 +1,536 @@
+"""
+Background job runner for Excel uploads, persisted in the upload_jobs table.
+
+The table is the shared state between API worker processes: any worker can
+enqueue, run, report progress for, or recover a job. Running jobs carry the
+worker id and a heartbeat so recovery only takes over jobs whose worker died.
+"""
+import gc
+import os
+import shutil
+import socket
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Set
+
+from database import ensure_schema, get_session, UploadJob, FileUpload
+from batch_ingest import run_batch_job
+from image_uploads import run_image_upload_job
+from seasonal_drop import process_seasonal_drop
+from memory_stats import PeakMemorySampler
+from image_index import IMAGES_DIR
+
+# Uploaded workbooks are spooled here until their job finishes, so queued
+# and interrupted jobs can be picked up again after a restart.
+SPOOL_DIR = os.getenv('UPLOAD_SPOOL_DIR', os.path.join('..', 'uploads'))
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', '2'))
+MAX_ATTEMPTS = int(os.getenv('INGEST_MAX_ATTEMPTS', '2'))
+HEARTBEAT_SECONDS = int(os.getenv('JOB_HEARTBEAT_SECONDS', '10'))
+# A running job whose heartbeat is older than this is considered orphaned
+STALE_AFTER_SECONDS = int(os.getenv('JOB_STALE_AFTER_SECONDS', '60'))
+# How long shutdown waits for running jobs before leaving them to recovery
+DRAIN_SECONDS = int(os.getenv('JOB_DRAIN_SECONDS', '120'))
+
+
+STAGE_MESSAGES = {
+    'parse': 'Parsed {done:,}/{total:,} rows',
+    'images': 'Extracting image {done:,}/{total:,}',
+    'save': 'Saved {done:,}/{total:,} rows',
+    'drop': 'Checked {done:,}/{total:,} items',
+}
+
+STAGE_COUNTERS = {
+    'parse': 'rows_parsed',
+    'images': 'images_extracted',
+    'save': 'rows_written',
+    'drop': 'items_checked',
+}
+
+
+def stage_progress(report: Callable[[Dict], None], ranges: Dict[str, tuple]) -> Callable[[str, int, int], None]:
+    """
+    Turn parser stage callbacks into progress reports.
+
+    Each stage maps onto a slice of the overall percentage. Reports are sent
+    only when the whole-number percentage moves or a stage finishes, so row
+    level callbacks don't flood subscribers.
+
+    Args:
+        report: Callback receiving progress dictionaries
+        ranges: Stage name to (start, end) percentage
+
+    Returns:
+        Callback for InventoryParser(progress=...)
+    """
+    counters = {}
+    last = {'percentage': None}
+
+    def on_progress(stage: str, done: int, total: int):
+        if stage not in ranges:
+            return
+        start, end = ranges[stage]
+        percentage = start + (end - start) * done // max(total, 1)
+        counters[STAGE_COUNTERS[stage]] = done
+        if percentage == last['percentage'] and done < total:
+            return
+        last['percentage'] = percentage
+        report({
+            'status': 'processing',
+            'stage': stage,
+            'message': STAGE_MESSAGES[stage].format(done=done, total=total),
+            'percentage': percentage,
+            **counters
+        })
+
+    return on_progress
+
+
+def run_upload_job(job: UploadJob, report: Callable[[Dict], None]) -> Dict:
+    """
+    Parse a spooled workbook, optionally extract images, and save to database.
+
+    Args:
+        job: Job describing the spooled workbook
+        report: Callback receiving progress dictionaries
+
+    Returns:
+        Dictionary with upload statistics
+    """
+    # pandas/openpyxl load with the first job rather than at API startup
+    from excel_parser import InventoryParser
+
+    session = get_session()
+    try:
+        file_upload = session.query(FileUpload).filter_by(filename=job.filename).first()
+        if file_upload:
+            file_upload.status = 'processing'
+            file_upload.uploaded_at = datetime.utcnow()
+        else:
+            file_upload = FileUpload(filename=job.filename, status='processing')
+            session.add(file_upload)
+        # Recorded only once the job completes so failed runs never count as duplicates
+        file_upload.content_hash = None
+        session.commit()
+
+        try:
+            if job.upload_images:
+                ranges = {'parse': (0, 40), 'images': (40, 80), 'save': (80, 99)}
+            else:
+                ranges = {'parse': (0, 70), 'save': (70, 99)}
+            progress = stage_progress(report, ranges)
+
+            with PeakMemorySampler() as memory:
+                report({'status': 'processing', 'message': 'Parsing Excel file...', 'percentage': 0})
+                parser = InventoryParser(job.file_path, content_hash=job.content_hash, progress=progress)
+
+                images_uploaded = 0
+                if job.upload_images:
+                    report({'status': 'processing', 'message': 'Extracting images...', 'percentage': ranges['images'][0]})
+                    image_result = parser.extract_images_to_folder(IMAGES_DIR)
+                    images_uploaded = image_result.get('extracted', 0)
+
+                report({'status': 'processing', 'message': 'Saving to database...', 'percentage': ranges['save'][0]})
+                result = parser.save_to_database(job.filename)
+
+                # The frame is not needed past the DB phase; free it before the job returns
+                frame_mb = parser.memory_usage_mb()
+                parser.release()
+                del parser
+                gc.collect()
+        except Exception:
+            file_upload.status = 'failed'
+            session.commit()
+            raise
+
+        file_upload.status = 'completed'
+        file_upload.content_hash = job.content_hash
+        file_upload.styles_count = result['styles_processed']
+        file_upload.items_count = result['items_saved']
+        file_upload.images_uploaded = images_uploaded
+        session.commit()
+
+        return {
+            'items_saved': result['items_saved'],
+            'styles_processed': result['styles_processed'],
+            'images_uploaded': images_uploaded,
+            'source_file': job.filename,
+            'diff': result['diff'],
+            'memory': {**memory.report(), 'frame_mb': frame_mb}
+        }
+    finally:
+        session.close()
+
+
+def run_seasonal_drop_job(job: UploadJob, report: Callable[[Dict], None]) -> Dict:
+    """
+    Mark styles missing from a spooled seasonal sheet as dropped.
+
+    Args:
+        job: Job whose params hold the season_name
+        report: Callback receiving progress dictionaries
+
+    Returns:
+        Seasonal drop result (see process_seasonal_drop)
+    """
+    progress = stage_progress(report, {'parse': (0, 50), 'drop': (50, 99)})
+    report({'status': 'processing', 'message': 'Parsing seasonal sheet...', 'percentage': 0})
+    return process_seasonal_drop(
+        job.file_path,
+        (job.params or {}).get('season_name'),
+        content_hash=job.content_hash,
+        progress=progress
+    )
+
+
+JOB_HANDLERS = {
+    'upload': run_upload_job,
+    'batch': run_batch_job,
+    'seasonal_drop': run_seasonal_drop_job,
+    'images': run_image_upload_job,
+}
+
+
+def current_worker_id() -> str:
+    """Identify this process; read per call so forked workers get their own pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobRunner:
+    """Thread pool that executes persisted upload jobs."""
+
+    def __init__(self, workers: int = INGEST_WORKERS, spool_dir: str = SPOOL_DIR):
+        self.workers = workers
+        self.spool_dir = spool_dir
+        self.on_progress: Optional[Callable[[str, Dict], None]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Jobs handed to this process's pool, and the subset currently running
+        self._submitted: Set[str] = set()
+        self._active: Set[str] = set()
+        self._stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Create the job table if needed, start the pool and recover unfinished jobs."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        ensure_schema()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='upload-job'
+                )
+                self._stop.clear()
+                self._heartbeat_thread = threading.Thread(
+                    target=self._heartbeat_loop, name='upload-job-heartbeat', daemon=True
+                )
+                self._heartbeat_thread.start()
+        self.recover()
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None):
+        """
+        Stop taking jobs and optionally drain the running ones.
+
+        Jobs still queued stay in the table for another worker or the next
+        start. With wait, running jobs get up to timeout seconds (None waits
+        indefinitely); any still running afterwards are recovered once this
+        process has exited. Heartbeats continue while draining so other
+        workers don't take the jobs over.
+
+        Args:
+            wait: Wait for running jobs to finish
+            timeout: Maximum seconds to wait
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if wait and not self._wait_idle(timeout):
+                print(f"Shutdown with {len(self._active)} upload jobs still running; they will be recovered")
+        self._stop.set()
+
+    def _wait_idle(self, timeout: Optional[float]) -> bool:
+        """Wait until no job runs in this process; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._active:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.2)
+        return True
+
+    def spool_path(self, job_id: str, filename: str) -> str:
+        """Return the on-disk location for a job's workbook."""
+        ext = os.path.splitext(filename)[1].lower() or '.xlsx'
+        return os.path.join(self.spool_dir, f"{job_id}{ext}")
+
+    def spool_dir_for(self, job_id: str) -> str:
+        """Create and return a spool directory for a multi-file job."""
+        path = os.path.join(self.spool_dir, job_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def new_job_id(self) -> str:
+        return str(uuid.uuid4())
+
+    def enqueue(
+        self,
+        job_id: str,
+        filename: str,
+        file_path: str,
+        upload_images: bool = True,
+        content_hash: Optional[str] = None,
+        kind: str = 'upload',
+        params: Optional[Dict] = None
+    ) -> UploadJob:
+        """
+        Persist a new job and hand it to the pool.
+
+        Args:
+            job_id: Identifier returned to the client as upload_id
+            filename: Original upload filename
+            file_path: Spooled workbook location (batch: spool directory)
+            upload_images: Whether to extract embedded images
+            content_hash: SHA-256 of the workbook, used for duplicate detection
+            kind: Job handler to run ('upload', 'batch', 'seasonal_drop' or 'images')
+            params: Handler-specific options stored with the job
+
+        Returns:
+            The persisted job
+        """
+        queued = {'status': 'queued', 'message': 'Waiting for a worker...', 'percentage': 0}
+        session = get_session()
+        try:
+            job = UploadJob(
+                id=job_id,
+                kind=kind,
+                filename=filename,
+                file_path=file_path,
+                upload_images=1 if upload_images else 0,
+                params=params,
+                content_hash=content_hash,
+                status='queued',
+                progress=queued
+            )
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            session.expunge(job)
+        finally:
+            session.close()
+
+        self._publish(job_id, queued, persist=False)
+        self._submit(job_id)
+        return job
+
+    def find_active_by_hash(self, content_hash: str, kind: str = 'upload') -> Optional[UploadJob]:
+        """Return a queued or running job of a kind for the same workbook content, if any."""
+        session = get_session()
+        try:
+            job = session.query(UploadJob).filter(
+                UploadJob.kind == kind,
+                UploadJob.content_hash == content_hash,
+                UploadJob.status.in_(['queued', 'running'])
+            ).first()
+            if job:
+                session.expunge(job)
+            return job
+        finally:
+            session.close()
+
+    def get(self, job_id: str) -> Optional[UploadJob]:
+        """Load a job by id."""
+        session = get_session()
+        try:
+            job = session.query(UploadJob).filter_by(id=job_id).first()
+            if job:
+                session.expunge(job)
+            return job
+        finally:
+            session.close()
+
+    def recover(self):
+        """
+        Pick up jobs no live worker is handling.
+
+        Queued jobs not already in this process's pool are submitted; the
+        atomic claim makes sure only one worker runs each. Running jobs are
+        taken over only when orphaned (see _is_orphaned): they are retried
+        while attempts remain and their workbook is still spooled, otherwise
+        marked failed. Called at startup and from the heartbeat loop.
+        """
+        session = get_session()
+        try:
+            pending = session.query(UploadJob).filter(
+                UploadJob.status.in_(['queued', 'running'])
+            ).order_by(UploadJob.created_at).all()
+
+            now = datetime.utcnow()
+            resubmit = []
+            recovered = 0
+            for job in pending:
+                if job.id in self._submitted:
+                    continue
+                if job.status == 'running' and not self._is_orphaned(job, now):
+                    continue
+                if not os.path.exists(job.file_path):
+                    self._mark_failed(session, job, 'Spooled workbook missing after restart')
+                elif job.status == 'running' and job.attempts >= MAX_ATTEMPTS:
+                    self._mark_failed(session, job, f'Interrupted after {job.attempts} attempts')
+                else:
+                    if job.status == 'running':
+                        job.status = 'queued'
+                        recovered += 1
+                    resubmit.append(job.id)
+            session.commit()
+        finally:
+            session.close()
+
+        for job_id in resubmit:
+            self._submit(job_id)
+        if recovered:
+            print(f"Recovered {recovered} interrupted upload jobs")
+
+    def _is_orphaned(self, job: UploadJob, now: datetime) -> bool:
+        """
+        A running job is orphaned when its worker is gone: this process
+        without the job in its pool (a previous run with the same pid), a dead
+        pid on this host, or a heartbeat older than STALE_AFTER_SECONDS.
+        """
+        if job.worker_id == current_worker_id():
+            return job.id not in self._active
+        host, _, pid = (job.worker_id or '').rpartition(':')
+        if host == socket.gethostname() and pid.isdigit() and not _process_alive(int(pid)):
+            return True
+        return job.heartbeat_at is None or job.heartbeat_at < now - timedelta(seconds=STALE_AFTER_SECONDS)
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            try:
+                self._heartbeat()
+                self.recover()
+            except Exception as e:
+                print(f"Upload job heartbeat failed: {e}")
+
+    def _heartbeat(self):
+        """Refresh heartbeat_at for the jobs running in this process."""
+        active = list(self._active)
+        if not active:
+            return
+        session = get_session()
+        try:
+            session.query(UploadJob).filter(
+                UploadJob.id.in_(active),
+                UploadJob.worker_id == current_worker_id()
+            ).update({'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+
+    def _submit(self, job_id: str):
+        with self._lock:
+            if self._executor is None:
+                # Not started (or shutting down): the job stays queued in the table
+                return
+            self._submitted.add(job_id)
+            self._executor.submit(self._run, job_id)
+
+    def _claim(self, session, job_id: str) -> Optional[UploadJob]:
+        """Atomically move a job from queued to running in this worker."""
+        now = datetime.utcnow()
+        claimed = session.query(UploadJob).filter_by(id=job_id, status='queued').update({
+            'status': 'running',
+            'started_at': now,
+            'heartbeat_at': now,
+            'worker_id': current_worker_id(),
+            'attempts': UploadJob.attempts + 1
+        }, synchronize_session=False)
+        session.commit()
+        if not claimed:
+            return None
+        return session.query(UploadJob).filter_by(id=job_id).first()
+
+    def _run(self, job_id: str):
+        try:
+            self._run_claimed(job_id)
+        finally:
+            self._active.discard(job_id)
+            self._submitted.discard(job_id)
+
+    def _run_claimed(self, job_id: str):
+        session = get_session()
+        try:
+            self._active.add(job_id)
+            job = self._claim(session, job_id)
+            if job is None:
+                return
+
+            try:
+                handler = JOB_HANDLERS[job.kind or 'upload']
+                result = handler(job, lambda data: self._publish(job_id, data))
+            except Exception as e:
+                session.rollback()
+                self._mark_failed(session, job, str(e))
+                session.commit()
+                self._remove_spool(job.file_path)
+                return
+
+            completed = {'status': 'completed', 'message': 'Upload complete!', 'percentage': 100}
+            job.status = 'completed'
+            job.result = result
+            job.progress = completed
+            job.finished_at = datetime.utcnow()
+            session.commit()
+            self._remove_spool(job.file_path)
+
+            self._publish(job_id, {**completed, **result}, persist=False)
+        finally:
+            session.close()
+
+    def _mark_failed(self, session, job: UploadJob, error: str):
+        failed = {'status': 'error', 'message': f'Error: {error}', 'percentage': 0}
+        job.status = 'failed'
+        job.error = error[:1000]
+        job.progress = failed
+        job.finished_at = datetime.utcnow()
+        self._publish(job.id, failed, persist=False)
+
+    def _publish(self, job_id: str, data: Dict, persist: bool = True):
+        """Notify local subscribers and store the event for other workers."""
+        if self.on_progress:
+            self.on_progress(job_id, data)
+        if not persist:
+            return
+        session = get_session()
+        try:
+            session.query(UploadJob).filter_by(id=job_id).update(
+                {'progress': data}, synchronize_session=False
+            )
+            session.commit()
+        except Exception as e:
+            # Progress is best effort; never fail a job over it
+            session.rollback()
+            print(f"Could not store progress for upload {job_id}: {e}")
+        finally:
+            session.close()
+
+    @staticmethod
+    def _remove_spool(file_path: str):
+        if file_path and os.path.isdir(file_path):
+            shutil.rmtree(file_path, ignore_errors=True)
+        elif file_path and os.path.exists(file_path):
+            os.unlink(file_path)
+
+
+job_runner = JobRunner()
@@ -0,0 +1,151 @@
+"""
+Per-image feature arrays for the whole image library, kept in one .npz file.
+
+Each indexed image has a row holding its name, mtime and size next to
+whatever a subclass computes from its pixels (a perceptual hash, a color
+histogram, ...), so a refresh only decodes images that were added or changed
+since the file was written. Subclasses declare their arrays and compute one
+image's values; loading, saving and refreshing are shared.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from image_index import IMAGES_DIR
+from thumbnails import DEFAULT_THUMBNAIL_SIZE, cached_thumbnail
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+class LibraryFeatureIndex:
+    """
+    Feature arrays per library image, persisted and refreshed incrementally.
+
+    Subclasses set FEATURES to {array name: (per-image shape, dtype)} and
+    implement features_of, which returns one value per array, in that order.
+    Each array is available as an attribute of the same name, one row per
+    entry of names. Without an index_path the index lives in memory only.
+    """
+
+    FEATURES: Dict[str, Tuple[Tuple[int, ...], type]] = {}
+    # Key of the refresh statistics counting images decoded by that refresh
+    COMPUTED_STAT = 'computed'
+
+    def __init__(self, images_dir: str = IMAGES_DIR, index_path: Optional[str] = None):
+        self.images_dir = images_dir
+        self.index_path = index_path
+        self.names = np.array([], dtype=str)
+        self.mtimes = np.array([], dtype=np.int64)
+        self.sizes = np.array([], dtype=np.int64)
+        for field, (shape, dtype) in self.FEATURES.items():
+            setattr(self, field, np.zeros((0, *shape), dtype=dtype))
+        self._lock = threading.Lock()
+        self._load()
+
+    def features_of(self, image) -> Tuple:
+        """Compute the values of one decoded PIL image, one per entry of FEATURES."""
+        raise NotImplementedError
+
+    def _changed(self):
+        """Called under the lock after a refresh replaced the arrays."""
+
+    def _load(self):
+        if self.index_path is None:
+            return
+        try:
+            with np.load(self.index_path, allow_pickle=False) as data:
+                if str(data['images_dir']) != os.path.abspath(self.images_dir):
+                    return
+                arrays = {field: data[field] for field in ('names', 'mtimes', 'sizes', *self.FEATURES)}
+        except (FileNotFoundError, KeyError, ValueError):
+            return
+        for field, (shape, _) in self.FEATURES.items():
+            if arrays[field].shape[1:] != shape:
+                # Written by a different version of the features; rebuild from scratch
+                return
+        for field, array in arrays.items():
+            setattr(self, field, array)
+
+    def _save(self):
+        if self.index_path is None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        arrays = {field: getattr(self, field) for field in self.FEATURES}
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, images_dir=np.array(os.path.abspath(self.images_dir)), names=self.names,
+                     mtimes=self.mtimes, sizes=self.sizes, **arrays)
+        os.replace(tmp_path, self.index_path)
+
+    def _compute_file(self, name: str) -> Tuple:
+        from PIL import Image
+
+        # The small thumbnail, when present, is much cheaper to decode than the original
+        in_library = os.path.abspath(self.images_dir) == os.path.abspath(IMAGES_DIR)
+        source = cached_thumbnail(name, DEFAULT_THUMBNAIL_SIZE, 'jpg', self.images_dir) if in_library else None
+        with Image.open(source or os.path.join(self.images_dir, name)) as image:
+            return self.features_of(image)
+
+    def refresh(self) -> Dict:
+        """
+        Bring the index in line with the library, decoding only new or changed files.
+
+        Returns:
+            Dictionary with total, COMPUTED_STAT, removed and failed counts and seconds taken
+        """
+        started = time.perf_counter()
+        current = {}
+        if os.path.isdir(self.images_dir):
+            with os.scandir(self.images_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        st = entry.stat()
+                        current[entry.name] = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            known = {
+                name: i for i, name in enumerate(self.names.tolist())
+                if current.get(name) == (int(self.mtimes[i]), int(self.sizes[i]))
+            }
+            removed = sum(1 for name in self.names.tolist() if name not in current)
+
+            names, mtimes, sizes = [], [], []
+            columns = {field: [] for field in self.FEATURES}
+            computed = failed = 0
+            for name in sorted(current):
+                i = known.get(name)
+                if i is not None:
+                    values = [getattr(self, field)[i] for field in self.FEATURES]
+                else:
+                    try:
+                        values = self._compute_file(name)
+                    except Exception as e:
+                        print(f"✗ Could not index {name}: {e}")
+                        failed += 1
+                        continue
+                    computed += 1
+                names.append(name)
+                mtimes.append(current[name][0])
+                sizes.append(current[name][1])
+                for column, value in zip(columns.values(), values):
+                    column.append(value)
+
+            if computed or removed or len(names) != len(self.names):
+                self.names = np.array(names, dtype=str)
+                self.mtimes = np.array(mtimes, dtype=np.int64)
+                self.sizes = np.array(sizes, dtype=np.int64)
+                for field, (shape, dtype) in self.FEATURES.items():
+                    setattr(self, field, np.array(columns[field], dtype=dtype).reshape(-1, *shape))
+                self._changed()
+                self._save()
+
+        return {
+            'total': len(current) - failed,
+            self.COMPUTED_STAT: computed,
+            'removed': removed,
+            'failed': failed,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
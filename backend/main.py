@@ -1,32 +1,47 @@
 """FastAPI backend for Warehouse Management System."""
 import os
+import shutil
 import tempfile
+import time
 from typing import List, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, text
 import asyncio
 import json
 from typing import Dict
 from queue import Queue
 
-from database import get_db, Item, StyleSummary, InventoryAction, FileUpload, Room, Shelf, Row
+from database import get_db, get_session, Item, StyleSummary, InventoryAction, FileUpload, Room, Shelf, Row
 from schemas import (
     MessageResponse, HealthResponse, StyleResponse, ColorVariant,
-    ActionRequest, ActionResponse, ActionHistoryItem, UploadResponse,
+    ActionRequest, ActionResponse, ActionHistoryItem, UploadResponse, UploadJobResponse, BatchUploadResponse,
     StatsResponse, FileInfo, ItemResponse, PaginatedResponse, parse_width
 )
-from excel_parser import InventoryParser
 from analytics_routes import router as analytics_router
 from seasonal_drop import process_seasonal_drop, export_dropped_items_report
+from job_runner import job_runner, DRAIN_SECONDS as JOB_DRAIN_SECONDS
+from progress import progress_broker, TERMINAL_STATUSES
+from batch_ingest import write_manifest
+from file_formats import SUPPORTED_EXTENSIONS
+from upload_storage import stream_upload_to_disk, check_content_length
+from image_index import image_index
+from item_images import apply_image_urls
+from image_uploads import IMAGE_UPLOAD_EXTENSIONS, MAX_IMAGE_UPLOAD_BYTES, sniff_image_type, item_id_from_filename
+from sprites import sprite_layout, sprite_key, load_row_members, cached_sprite, build_sprite
+from static_assets import CachedStaticFiles, render_page, cache_control_for, etag_matches, not_modified
+from executors import EXECUTORS, ocr_executor, ingest_executor, image_executor, shutdown_executors
+from thumbnails import (
+    THUMBNAIL_SIZES, MEDIA_TYPES, thumbnail_url, thumbnail_variant, negotiate_format, cached_thumbnail, ensure_thumbnail
+)
 # from barcode_scanner import process_camera_frame, decode_barcode_from_image
 from pydantic import BaseModel
 
@@ -51,38 +66,277 @@ app.add_middleware(
 
 # No external storage - using local database only
 
-# Global progress tracking
-upload_progress: Dict[str, Dict] = {}
+# Endpoints that accept file uploads (workbooks and images); oversized bodies are rejected before parsing
+UPLOAD_PATHS = {"/upload-excel", "/upload-excel/batch", "/seasonal-drop", "/items/images", "/images/similar"}
+
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Reject uploads whose Content-Length exceeds MAX_UPLOAD_MB before the body is read."""
+    if request.method == "POST" and request.url.path in UPLOAD_PATHS:
+        try:
+            check_content_length(request.headers.get("content-length"))
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+    return await call_next(request)
 
-def get_image_url_for_item(style: str, color: str) -> Optional[str]:
-    """Generate image URL based on style and color if image file exists."""
-    # Image filenames now include width variants: stylenumber_color.jpg
-    # e.g., "104437_BBK (w).jpg" for wide width
-    image_filename = f"{style}_{color}.jpg"
-    image_path = os.path.join("..", "static", "images", image_filename)
+# Upload jobs publish progress to the broker; SSE subscribers wake on each update
+job_runner.on_progress = progress_broker.publish
 
-    # Check if image file exists
-    if os.path.exists(image_path):
-        return f"/static/images/{image_filename}"
-    return None
+# Jobs running in another worker process are followed through the job table
+PROGRESS_POLL_SECONDS = 1
+PROGRESS_KEEPALIVE_SECONDS = 15
+
+
+@app.on_event("startup")
+async def start_job_runner():
+    """Start the upload worker pool and resume jobs left from a previous run."""
+    job_runner.start()
+
+
+@app.on_event("startup")
+async def warm_up():
+    """Warm this worker's caches before it accepts traffic."""
+    await run_in_threadpool(warm_caches)
+
+
+@app.on_event("shutdown")
+async def stop_job_runner():
+    """Stop taking upload jobs and let running ones finish (up to JOB_DRAIN_SECONDS)."""
+    shutdown_executors()
+    await run_in_threadpool(job_runner.shutdown, True, JOB_DRAIN_SECONDS)
+
+
+def warm_caches():
+    """
+    Open the database pool and pre-read the style index and image library.
+    
+    Runs once per worker process at startup, so the first requests after a
+    deploy don't pay for connecting and cold disk reads.
+    """
+    started = time.perf_counter()
+    session = get_session()
+    try:
+        session.execute(text("SELECT 1"))
+        styles = len(session.query(StyleSummary.style).all())
+        items = session.query(func.count(Item.id)).scalar()
+    finally:
+        session.close()
+    
+    images = image_index.refresh()
+    print(f"Worker {os.getpid()} warmed up in {time.perf_counter() - started:.2f}s "
+          f"({styles} styles, {items} items, {images} images)")
 
 
 @app.get("/ui")
-async def serve_ui():
+def serve_ui(request: Request):
     """Serve the new SMAC web UI."""
-    return FileResponse("../static/index.html")
+    return render_page("../static/index.html", request.headers)
 
 
 @app.get("/")
-async def root():
+def root(request: Request):
     """Serve the new SMAC warehouse management UI."""
-    return FileResponse("../static/index.html")
+    return render_page("../static/index.html", request.headers)
 
 @app.get("/warehouse")
-async def serve_old_warehouse():
+def serve_old_warehouse(request: Request):
     """Serve the old warehouse management UI."""
-    return FileResponse("../static/warehouse.html")
+    return render_page("../static/warehouse.html", request.headers)
+
+
+@app.get("/thumbnails/{size}/{filename}")
+async def get_thumbnail(size: str, filename: str, request: Request):
+    """
+    Serve a library image at a fixed thumbnail size.
+    
+    WebP is returned to clients that accept it and JPEG otherwise. Images
+    without a cached derivative are rendered on first request. URLs carrying
+    the source image's content hash (?v=) are cached as immutable.
+    """
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=404, detail=f"Unknown thumbnail size: {size}")
+    digest = image_index.version(filename) if os.path.basename(filename) == filename else None
+    if digest is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    fmt = negotiate_format(request.headers.get("accept"))
+    headers = {
+        "ETag": f'"{digest}-{size}-{fmt}"',
+        "Cache-Control": cache_control_for(request.url.query, digest),
+        "Vary": "Accept"
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return not_modified(headers)
+    
+    path = cached_thumbnail(filename, size, fmt)
+    if path is None:
+        try:
+            path = await image_executor.run(ensure_thumbnail, filename, size, fmt)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Thumbnail rendering failed: {str(e)}")
+        if path is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+    
+    return FileResponse(path, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+@app.get("/sprites/rows/{row_id}")
+async def get_row_sprite(row_id: int, request: Request):
+    """
+    Serve the sprite sheet of a warehouse row's item thumbnails.
+    
+    The sprite is keyed by the row's contents, so it is rebuilt only after
+    items move in or out or their images change. A ?v= matching the current
+    key (as given in the visual layout) is cached as immutable.
+    """
+    members = await run_in_threadpool(load_row_members, row_id)
+    if not members:
+        raise HTTPException(status_code=404, detail="Row has no item images")
+    
+    key = sprite_key(members)
+    fmt = negotiate_format(request.headers.get("accept"))
+    headers = {
+        "ETag": f'"{key}-{fmt}"',
+        "Cache-Control": cache_control_for(request.url.query, key),
+        "Vary": "Accept"
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return not_modified(headers)
+    
+    path = cached_sprite(row_id, key, fmt)
+    if path is None:
+        try:
+            path = await image_executor.run(build_sprite, row_id, members, key, fmt)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Sprite rendering failed: {str(e)}")
+    
+    return FileResponse(path, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+def _duplicate_report(limit: int, offset: int, max_distance: int) -> Dict:
+    # numpy loads on the first report rather than at API startup
+    from image_hashes import get_hash_index
+    index = get_hash_index()
+    stats = index.refresh()
+    report = index.duplicate_report(limit=limit, offset=offset, max_distance=max_distance)
+    for pair in report['pairs']:
+        for side in ('a', 'b'):
+            filename = pair[f'image_{side}']
+            pair[f'thumbnail_url_{side}'] = thumbnail_url(filename, version=image_index.version(filename))
+    report['index'] = stats
+    return report
+
+
+@app.get("/images/duplicates")
+async def get_duplicate_images(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    max_distance: int = Query(6, ge=0, le=16)
+):
+    """
+    List pairs of library images that look like the same picture under different style/color keys.
+    
+    Args:
+        limit: Maximum number of pairs to return
+        offset: Number of pairs to skip
+        max_distance: Largest perceptual-hash distance (of 64 bits) counted as a match
+        
+    Returns:
+        Paginated pairs, closest first, with the index refresh statistics
+    """
+    try:
+        return await image_executor.run(_duplicate_report, limit, offset, max_distance)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Duplicate detection failed: {str(e)}")
+
+
+def _similar_items(photo_path: str, k: int) -> Dict:
+    # numpy and PIL load on the first query rather than at API startup
+    from PIL import Image
+    from image_similarity import get_similarity_index, color_features, QUERY_CROP
+    
+    started = time.perf_counter()
+    try:
+        with Image.open(photo_path) as photo:
+            features = color_features(photo, crop=QUERY_CROP)
+    except (OSError, SyntaxError):
+        raise HTTPException(status_code=400, detail="Could not read the photo. Send a JPEG, PNG or WebP image.")
+    index = get_similarity_index()
+    stats = index.refresh()
+    # Not every library image belongs to an item; ask for spares
+    matches = index.query(features, k * 2)
+    
+    ids = [os.path.splitext(name)[0] for name, _ in matches]
+    session = get_session()
+    try:
+        items = {item.id: item for item in session.query(Item).filter(Item.id.in_(ids))}
+    finally:
+        session.close()
+    
+    results = []
+    for item_id, (_, score) in zip(ids, matches):
+        item = items.get(item_id)
+        if item is None:
+            continue
+        results.append({
+            "item_id": item.id,
+            "style": item.style,
+            "color": item.color,
+            "score": score,
+            "image_url": item.image_url,
+            "thumbnail_url": item.thumbnail_url
+        })
+        if len(results) == k:
+            break
+    
+    return {
+        "results": results,
+        "images_indexed": stats['total'],
+        "index": stats,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+@app.post("/images/similar")
+async def find_similar_items(
+    file: UploadFile = File(...),
+    k: int = Query(10, ge=1, le=50)
+):
+    """
+    Find items whose product image has colors closest to a photo (e.g. a shoe without a readable tag).
+    
+    Args:
+        file: Photo of the shoe
+        k: Number of candidate items to return
+        
+    Returns:
+        Candidate items, most similar first, each with a 0-1 similarity score
+    """
+    temp_path = None
+    try:
+        # Stream to disk so an oversized or chunked body never sits in memory
+        suffix = os.path.splitext(file.filename or '')[1].lower()
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            temp_path = tmp.name
+        await stream_upload_to_disk(file, temp_path, max_bytes=MAX_IMAGE_UPLOAD_BYTES)
+        if sniff_image_type(temp_path) is None:
+            raise HTTPException(status_code=400, detail="Could not read the photo. Send a JPEG, PNG or WebP image.")
+        
+        return await image_executor.run(_similar_items, temp_path, k)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Similarity search failed: {str(e)}")
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
 
 
 @app.get("/api", response_model=MessageResponse)
@@ -95,7 +349,7 @@ async def api_root():
 
 
 @app.get("/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """Health check endpoint."""
     try:
         # Test database connection
@@ -103,7 +357,8 @@ async def health_check(db: Session = Depends(get_db)):
         db.execute(text("SELECT 1"))
         return {
             "status": "healthy",
-            "database": "connected"
+            "database": "connected",
+            "executors": {name: executor.stats() for name, executor in EXECUTORS.items()}
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -114,32 +369,53 @@ async def get_upload_progress(upload_id: str):
     """
     Server-Sent Events endpoint for real-time upload progress.
     
+    Events are pushed as the job publishes them (rows parsed, images
+    extracted, rows written). Jobs running in another worker process are
+    followed through the shared job table.
+    
     Args:
         upload_id: Unique upload identifier
         
     Returns:
         SSE stream with progress updates
     """
+    def persisted():
+        # Shared job state, for jobs handled by another worker or before a restart
+        job = job_runner.get(upload_id)
+        if job is None:
+            return None
+        if job.status == 'completed':
+            return {'status': 'completed', 'message': 'Upload complete!', 'percentage': 100, **(job.result or {})}
+        if job.status == 'failed':
+            return {'status': 'error', 'message': f'Error: {job.error}', 'percentage': 0}
+        return job.progress
+    
     async def event_generator():
-        try:
+        with progress_broker.subscribe(upload_id) as subscription:
+            last_sent = None
+            idle_seconds = 0
+            progress_data = progress_broker.latest(upload_id)
             while True:
-                if upload_id in upload_progress:
-                    progress_data = upload_progress[upload_id]
-                    
-                    # Send progress update
+                local = progress_broker.latest(upload_id)
+                if progress_data is None and (local is None or local.get('status') == 'queued'):
+                    # Not running in this process (a queued job may be claimed elsewhere)
+                    progress_data = await run_in_threadpool(persisted)
+                if progress_data is None:
+                    progress_data = local or {'status': 'waiting', 'message': 'Initializing...'}
+                
+                if progress_data != last_sent:
                     yield f"data: {json.dumps(progress_data)}\n\n"
-                    
-                    # If complete, send final message and stop
-                    if progress_data.get('status') in ['completed', 'error']:
-                        await asyncio.sleep(1)
-                        break
+                    if progress_data.get('status') in TERMINAL_STATUSES:
+                        return
+                    last_sent = progress_data
+                    idle_seconds = 0
                 else:
-                    # Send initial waiting message
-                    yield f"data: {json.dumps({'status': 'waiting', 'message': 'Initializing...'})}\n\n"
+                    idle_seconds += PROGRESS_POLL_SECONDS
+                    if idle_seconds >= PROGRESS_KEEPALIVE_SECONDS:
+                        yield ": keep-alive\n\n"
+                        idle_seconds = 0
                 
-                await asyncio.sleep(0.5)  # Update every 500ms
-        except asyncio.CancelledError:
-            pass
+                progress_data = await subscription.next(timeout=PROGRESS_POLL_SECONDS)
     
     return StreamingResponse(
         event_generator(),
@@ -151,128 +427,288 @@ async def get_upload_progress(upload_id: str):
     )
 
 
+def _dry_run_report(path: str, content_hash: str, filename: str) -> Dict:
+    from excel_parser import InventoryParser
+    return InventoryParser(path, content_hash).dry_run(filename)
+
+
+def _find_duplicate_upload(content_hash: str) -> Optional[Dict]:
+    """Return the completed upload or active job with this workbook content, if any."""
+    session = get_session()
+    try:
+        previous = session.query(FileUpload).filter_by(
+            content_hash=content_hash, status='completed'
+        ).first()
+        if previous:
+            return {
+                "status": "duplicate",
+                "filename": previous.filename,
+                "items_saved": previous.items_count,
+                "styles_processed": previous.styles_count,
+                "images_uploaded": previous.images_uploaded
+            }
+    finally:
+        session.close()
+    
+    active_job = job_runner.find_active_by_hash(content_hash)
+    if active_job:
+        return {"status": active_job.status, "filename": active_job.filename, "upload_id": active_job.id}
+    return None
+
+
 @app.post("/upload-excel", response_model=UploadResponse)
 async def upload_excel(
     file: UploadFile = File(...),
     upload_images: bool = Query(True, description="Whether to extract and upload images to Supabase"),
-    db: Session = Depends(get_db)
+    force: bool = Query(False, description="Reprocess even if an identical workbook was already ingested"),
+    dry_run: bool = Query(False, description="Only report what the upload would change; nothing is written")
 ):
     """
-    Upload Excel file, parse data, optionally extract/upload images, and save to database.
+    Upload Excel (or CSV/Parquet) file and queue it for background parsing, image extraction and database save.
+    
+    A workbook whose content matches a completed upload returns that upload's
+    result immediately instead of being reprocessed, unless force is set.
+    With dry_run, the file is parsed and diffed in the request and a report
+    is returned without queueing a job or writing to the database.
     
     Args:
         file: Excel file to upload
         upload_images: Whether to extract and upload embedded images to Supabase
-        db: Database session
+        force: Reprocess even if an identical workbook was already ingested
+        dry_run: Only report what the upload would change
         
     Returns:
-        Upload ID for tracking progress
+        Upload ID for tracking progress via /upload-progress/{upload_id} or /upload-jobs/{upload_id}
     """
-    import uuid
-    upload_id = str(uuid.uuid4())
-    upload_progress[upload_id] = {'status': 'processing', 'message': 'Initializing...'}
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Invalid file format. Only .xlsx, .xls, .csv and .parquet files are supported.")
     
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="Invalid file format. Only .xlsx and .xls files are supported.")
-    
-    temp_path = None
+    upload_id = job_runner.new_job_id()
+    spool_path = job_runner.spool_path(upload_id, file.filename)
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            content = await file.read()
-            tmp.write(content)
-            temp_path = tmp.name
-        
-        # Track file upload - check if file already exists
-        file_upload = db.query(FileUpload).filter_by(filename=file.filename).first()
-        if file_upload:
-            # Update existing record
-            file_upload.status = 'processing'
-            file_upload.uploaded_at = datetime.utcnow()
-        else:
-            # Create new record
-            file_upload = FileUpload(
-                filename=file.filename,
-                status='processing'
-            )
-            db.add(file_upload)
-        db.commit()
+        # Spool the workbook so the job survives a restart
+        stored = await stream_upload_to_disk(file, spool_path)
         
-        # Progress callback function
-        def update_progress(stage, current, total):
-            upload_progress[upload_id] = {
-                'status': 'processing',
-                'stage': stage,
-                'current': current,
-                'total': total,
-                'percentage': int((current / total * 100)) if total > 0 else 0,
-                'message': f'{stage}: {current}/{total}'
+        if dry_run:
+            try:
+                report = await ingest_executor.run(_dry_run_report, spool_path, stored['sha256'], file.filename)
+            finally:
+                os.unlink(spool_path)
+            return {
+                "success": True,
+                "upload_id": None,
+                "status": "dry_run",
+                "items_saved": report['rows_accepted'],
+                "styles_processed": report['styles_new'] + report['styles_existing'],
+                "source_file": file.filename,
+                "dry_run_report": report
             }
         
-        # Parse Excel data
-        upload_progress[upload_id] = {'status': 'processing', 'message': 'Parsing Excel file...', 'percentage': 0}
-        parser = InventoryParser(temp_path)
-        
-        # Extract images from Excel file
-        images_uploaded = 0
-        if upload_images:
-            upload_progress[upload_id] = {'status': 'processing', 'message': 'Extracting images...', 'percentage': 50}
-            image_result = parser.extract_images_to_folder("static/images")
-            images_uploaded = image_result.get('extracted', 0)
-        
-        # Save to database
-        upload_progress[upload_id] = {'status': 'processing', 'message': 'Saving to database...', 'percentage': 90}
-        result = parser.save_to_database(file.filename)
-        
-        # Update file upload record
-        file_upload.status = 'completed'
-        file_upload.styles_count = result['styles_processed']
-        file_upload.items_count = result['items_saved']
-        file_upload.images_uploaded = images_uploaded
-        db.commit()
+        if not force:
+            # Database lookups stay off the event loop
+            duplicate = await run_in_threadpool(_find_duplicate_upload, stored['sha256'])
+            if duplicate:
+                os.unlink(spool_path)
+                response = {
+                    "success": True,
+                    "upload_id": duplicate.get("upload_id"),
+                    "status": duplicate["status"],
+                    "items_saved": duplicate.get("items_saved"),
+                    "styles_processed": duplicate.get("styles_processed"),
+                    "images_uploaded": duplicate.get("images_uploaded"),
+                    "source_file": file.filename,
+                    "duplicate_of": duplicate["filename"]
+                }
+                if duplicate["filename"] != file.filename:
+                    # Items keep their original source file; nothing is recorded under the new name
+                    response["message"] = (
+                        f"Identical to {duplicate['filename']}; nothing was ingested as {file.filename}. "
+                        f"Upload with force=true to ingest it under this name."
+                    )
+                return response
         
-        # Mark as completed
-        upload_progress[upload_id] = {
-            'status': 'completed',
-            'message': 'Upload complete!',
-            'percentage': 100,
-            'items_saved': result['items_saved'],
-            'styles_processed': result['styles_processed'],
-            'images_uploaded': images_uploaded
-        }
+        await run_in_threadpool(job_runner.enqueue, upload_id, file.filename, spool_path, upload_images, stored['sha256'])
+    except HTTPException:
+        raise
+    except Exception as e:
+        if os.path.exists(spool_path):
+            os.unlink(spool_path)
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    return {
+        "success": True,
+        "upload_id": upload_id,
+        "status": "queued",
+        "source_file": file.filename
+    }
+
+
+@app.post("/upload-excel/batch", response_model=BatchUploadResponse)
+async def upload_excel_batch(
+    files: List[UploadFile] = File(...),
+    upload_images: bool = Query(True, description="Whether to extract images from each workbook"),
+    force: bool = Query(False, description="Reprocess workbooks identical to a completed upload")
+):
+    """
+    Upload several Excel/CSV/Parquet files (or zip archives of them) as one background job.
+    
+    Workbooks are parsed concurrently across processes, merged into one
+    deduplicated set of items and committed in a single transaction.
+    Per-file progress is reported on /upload-progress/{upload_id}.
+    
+    Args:
+        files: Excel, CSV or Parquet files and/or zip archives containing them
+        upload_images: Whether to extract embedded images
+        force: Reprocess workbooks identical to a completed upload
         
-        return {
-            "success": True,
-            "upload_id": upload_id,
-            "items_saved": result['items_saved'],
-            "styles_processed": result['styles_processed'],
-            "images_uploaded": images_uploaded,
-            "source_file": file.filename
-        }
+    Returns:
+        Upload ID for tracking progress
+    """
+    for f in files:
+        if not f.filename.lower().endswith(SUPPORTED_EXTENSIONS + ('.zip',)):
+            raise HTTPException(status_code=400, detail=f"Invalid file format: {f.filename}. Only .xlsx, .xls, .csv, .parquet and .zip files are supported.")
+    
+    upload_id = job_runner.new_job_id()
+    batch_dir = job_runner.spool_dir_for(upload_id)
+    try:
+        entries = []
+        for index, f in enumerate(files):
+            dest = os.path.join(batch_dir, f"{index}_{os.path.basename(f.filename)}")
+            stored = await stream_upload_to_disk(f, dest)
+            entries.append({'filename': f.filename, 'path': dest, 'sha256': stored['sha256']})
         
+        await run_in_threadpool(write_manifest, batch_dir, entries, force=force)
+        await run_in_threadpool(
+            job_runner.enqueue,
+            upload_id,
+            f"batch of {len(files)} files",
+            batch_dir,
+            upload_images,
+            kind='batch'
+        )
+    except HTTPException:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise
     except Exception as e:
-        db.rollback()
-        upload_progress[upload_id] = {
-            'status': 'error',
-            'message': f'Error: {str(e)}',
-            'percentage': 0
-        }
-        try:
-            if file_upload:
-                file_upload.status = 'failed'
-                db.commit()
-        except:
-            pass
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=f"Batch upload failed: {str(e)}")
     
+    return {
+        "success": True,
+        "upload_id": upload_id,
+        "status": "queued",
+        "files": [f.filename for f in files]
+    }
+
+
+def _existing_item_ids(item_ids: List[str]) -> set:
+    """Return which of the given item ids exist."""
+    session = get_session()
+    try:
+        return {item_id for (item_id,) in session.query(Item.id).filter(Item.id.in_(set(item_ids)))}
     finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+        session.close()
+
+
+@app.post("/items/images", response_model=BatchUploadResponse)
+async def upload_item_images(
+    files: List[UploadFile] = File(...),
+    item_ids: Optional[List[str]] = Form(None, description="Item id for each file, in order; defaults to each file name (100702_BBK.jpg)")
+):
+    """
+    Upload product images for existing items as one background job.
+    
+    Files are streamed to disk and checked to be JPEG, PNG or WebP; the job
+    then writes each into the image library with its thumbnails and updates
+    the item's stored URLs. Follow it on /upload-jobs/{upload_id}.
+    
+    Args:
+        files: Image files
+        item_ids: Item id for each file (optional when files are named after items)
+        
+    Returns:
+        Upload ID for tracking progress
+    """
+    if item_ids and len(item_ids) != len(files):
+        raise HTTPException(status_code=400, detail=f"Got {len(files)} files but {len(item_ids)} item ids")
+    ids = [item_id.strip() for item_id in item_ids] if item_ids else [item_id_from_filename(f.filename) for f in files]
+    
+    for f in files:
+        if not f.filename.lower().endswith(IMAGE_UPLOAD_EXTENSIONS):
+            raise HTTPException(status_code=400, detail=f"Invalid file format: {f.filename}. Only .jpg, .jpeg, .png and .webp images are supported.")
+    
+    # Database lookups stay off the event loop
+    known = await run_in_threadpool(_existing_item_ids, ids)
+    missing = [item_id for item_id in ids if item_id not in known]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Items not found: {', '.join(missing[:20])}")
+    
+    upload_id = job_runner.new_job_id()
+    spool_dir = job_runner.spool_dir_for(upload_id)
+    try:
+        images = []
+        for index, (f, item_id) in enumerate(zip(files, ids)):
+            dest = os.path.join(spool_dir, f"{index}{os.path.splitext(f.filename)[1].lower()}")
+            await stream_upload_to_disk(f, dest, max_bytes=MAX_IMAGE_UPLOAD_BYTES)
+            if sniff_image_type(dest) is None:
+                raise HTTPException(status_code=400, detail=f"{f.filename} is not a JPEG, PNG or WebP image")
+            images.append({'item_id': item_id, 'filename': f.filename, 'path': dest})
+        
+        await run_in_threadpool(
+            job_runner.enqueue,
+            upload_id,
+            f"{len(files)} images",
+            spool_dir,
+            kind='images',
+            params={'images': images}
+        )
+    except HTTPException:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
+    
+    return {
+        "success": True,
+        "upload_id": upload_id,
+        "status": "queued",
+        "files": [f.filename for f in files]
+    }
+
+
+@app.get("/upload-jobs/{upload_id}", response_model=UploadJobResponse)
+def get_upload_job(upload_id: str):
+    """
+    Get the status and result of a background upload job.
+    
+    Args:
+        upload_id: Upload ID returned by /upload-excel
+        
+    Returns:
+        Job status, with upload statistics once completed
+    """
+    job = job_runner.get(upload_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Upload job {upload_id} not found")
+    
+    return UploadJobResponse(
+        upload_id=job.id,
+        kind=job.kind,
+        filename=job.filename,
+        status=job.status,
+        attempts=job.attempts,
+        progress=job.progress,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
 
 
 @app.get("/scan/{style}", response_model=StyleResponse)
-async def scan_style(
+def scan_style(
     style: str,
     user: str = Query("unknown", description="User performing the scan"),
     db: Session = Depends(get_db)
@@ -305,7 +741,8 @@ async def scan_style(
     for item in items:
         colors.append(ColorVariant(
             color=item.color,
-            image_url=item.image_url or get_image_url_for_item(item.style, item.color),
+            image_url=item.image_url,
+            thumbnail_url=item.thumbnail_url,
             width=parse_width(item.color)
         ))
     
@@ -322,7 +759,7 @@ async def scan_style(
 
 
 @app.post("/action", response_model=ActionResponse)
-async def record_action(
+def record_action(
     action_request: ActionRequest,
     db: Session = Depends(get_db)
 ):
@@ -389,7 +826,7 @@ async def record_action(
 
 
 @app.get("/actions/{style}", response_model=List[ActionHistoryItem])
-async def get_style_actions(
+def get_style_actions(
     style: str,
     db: Session = Depends(get_db)
 ):
@@ -428,7 +865,7 @@ async def get_style_actions(
 
 
 @app.get("/actions/{style}/{color}", response_model=List[ActionHistoryItem])
-async def get_color_actions(
+def get_color_actions(
     style: str,
     color: str,
     db: Session = Depends(get_db)
@@ -470,7 +907,7 @@ async def get_color_actions(
 
 
 @app.get("/inventory/pending", response_model=PaginatedResponse)
-async def get_pending_items(
+def get_pending_items(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
@@ -499,7 +936,8 @@ async def get_pending_items(
                 division=item.division,
                 outsole=item.outsole,
                 gender=item.gender,
-                image_url=item.image_url or get_image_url_for_item(item.style, item.color),
+                image_url=item.image_url,
+                thumbnail_url=item.thumbnail_url,
                 source_files=item.source_files,
                 status=item.status,
                 width=parse_width(item.color),
@@ -515,7 +953,7 @@ async def get_pending_items(
 
 
 @app.get("/inventory/by-action/{action}", response_model=PaginatedResponse)
-async def get_items_by_action(
+def get_items_by_action(
     action: str,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
@@ -553,7 +991,8 @@ async def get_items_by_action(
                 division=item.division,
                 outsole=item.outsole,
                 gender=item.gender,
-                image_url=item.image_url or get_image_url_for_item(item.style, item.color),
+                image_url=item.image_url,
+                thumbnail_url=item.thumbnail_url,
                 source_files=item.source_files,
                 status=item.status,
                 width=parse_width(item.color),
@@ -569,7 +1008,7 @@ async def get_items_by_action(
 
 
 @app.get("/inventory/stats", response_model=StatsResponse)
-async def get_inventory_stats(db: Session = Depends(get_db)):
+def get_inventory_stats(db: Session = Depends(get_db)):
     """
     Get comprehensive inventory statistics.
     
@@ -623,7 +1062,7 @@ async def get_inventory_stats(db: Session = Depends(get_db)):
 
 
 @app.get("/inventory/search", response_model=PaginatedResponse)
-async def search_inventory(
+def search_inventory(
     division: Optional[str] = Query(None),
     gender: Optional[str] = Query(None),
     color: Optional[str] = Query(None),
@@ -683,7 +1122,8 @@ async def search_inventory(
                 division=item.division,
                 outsole=item.outsole,
                 gender=item.gender,
-                image_url=item.image_url or get_image_url_for_item(item.style, item.color),
+                image_url=item.image_url,
+                thumbnail_url=item.thumbnail_url,
                 source_files=item.source_files,
                 status=item.status,
                 width=parse_width(item.color),
@@ -699,7 +1139,7 @@ async def search_inventory(
 
 
 @app.get("/inventory/files", response_model=List[FileInfo])
-async def get_uploaded_files(db: Session = Depends(get_db)):
+def get_uploaded_files(db: Session = Depends(get_db)):
     """
     Get list of all uploaded Excel files with statistics.
     
@@ -725,7 +1165,7 @@ async def get_uploaded_files(db: Session = Depends(get_db)):
 
 
 @app.get("/inventory/file/{filename}", response_model=PaginatedResponse)
-async def get_file_items(
+def get_file_items(
     filename: str,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
@@ -762,7 +1202,8 @@ async def get_file_items(
                 division=item.division,
                 outsole=item.outsole,
                 gender=item.gender,
-                image_url=item.image_url or get_image_url_for_item(item.style, item.color),
+                image_url=item.image_url,
+                thumbnail_url=item.thumbnail_url,
                 source_files=item.source_files,
                 status=item.status,
                 width=parse_width(item.color),
@@ -778,7 +1219,7 @@ async def get_file_items(
 
 
 @app.delete("/inventory/file/{filename}")
-async def delete_file(
+def delete_file(
     filename: str,
     db: Session = Depends(get_db)
 ):
@@ -887,7 +1328,7 @@ class RowCreate(BaseModel):
 
 
 @app.post("/locations/rooms")
-async def create_room(room: RoomCreate, db: Session = Depends(get_db)):
+def create_room(room: RoomCreate, db: Session = Depends(get_db)):
     """Create a new room."""
     existing = db.query(Room).filter_by(name=room.name).first()
     if existing:
@@ -900,14 +1341,14 @@ async def create_room(room: RoomCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/locations/rooms")
-async def get_rooms(db: Session = Depends(get_db)):
+def get_rooms(db: Session = Depends(get_db)):
     """Get all rooms."""
     rooms = db.query(Room).all()
     return [{"id": r.id, "name": r.name, "description": r.description, "shelf_count": len(r.shelves)} for r in rooms]
 
 
 @app.delete("/locations/rooms/{room_id}")
-async def delete_room(room_id: int, db: Session = Depends(get_db)):
+def delete_room(room_id: int, db: Session = Depends(get_db)):
     """Delete a room and all its shelves/rows."""
     room = db.query(Room).filter_by(id=room_id).first()
     if not room:
@@ -918,7 +1359,7 @@ async def delete_room(room_id: int, db: Session = Depends(get_db)):
 
 
 @app.post("/locations/shelves")
-async def create_shelf(shelf: ShelfCreate, db: Session = Depends(get_db)):
+def create_shelf(shelf: ShelfCreate, db: Session = Depends(get_db)):
     """Create a new shelf."""
     room = db.query(Room).filter_by(id=shelf.room_id).first()
     if not room:
@@ -931,7 +1372,7 @@ async def create_shelf(shelf: ShelfCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/locations/shelves")
-async def get_shelves(room_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
+def get_shelves(room_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
     """Get all shelves, optionally filtered by room."""
     query = db.query(Shelf)
     if room_id:
@@ -941,7 +1382,7 @@ async def get_shelves(room_id: Optional[int] = Query(None), db: Session = Depend
 
 
 @app.delete("/locations/shelves/{shelf_id}")
-async def delete_shelf(shelf_id: int, db: Session = Depends(get_db)):
+def delete_shelf(shelf_id: int, db: Session = Depends(get_db)):
     """Delete a shelf and all its rows."""
     shelf = db.query(Shelf).filter_by(id=shelf_id).first()
     if not shelf:
@@ -952,7 +1393,7 @@ async def delete_shelf(shelf_id: int, db: Session = Depends(get_db)):
 
 
 @app.post("/locations/rows")
-async def create_row(row: RowCreate, db: Session = Depends(get_db)):
+def create_row(row: RowCreate, db: Session = Depends(get_db)):
     """Create a new row."""
     shelf = db.query(Shelf).filter_by(id=row.shelf_id).first()
     if not shelf:
@@ -965,7 +1406,7 @@ async def create_row(row: RowCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/locations/rows")
-async def get_rows(shelf_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
+def get_rows(shelf_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
     """Get all rows, optionally filtered by shelf."""
     query = db.query(Row)
     if shelf_id:
@@ -975,7 +1416,7 @@ async def get_rows(shelf_id: Optional[int] = Query(None), db: Session = Depends(
 
 
 @app.delete("/locations/rows/{row_id}")
-async def delete_row(row_id: int, db: Session = Depends(get_db)):
+def delete_row(row_id: int, db: Session = Depends(get_db)):
     """Delete a row. Items will be unassigned."""
     row = db.query(Row).filter_by(id=row_id).first()
     if not row:
@@ -988,7 +1429,7 @@ async def delete_row(row_id: int, db: Session = Depends(get_db)):
 
 
 @app.get("/locations/rows/{row_id}/items")
-async def get_row_items(row_id: int, db: Session = Depends(get_db)):
+def get_row_items(row_id: int, db: Session = Depends(get_db)):
     """Get all items in a specific row."""
     row = db.query(Row).filter_by(id=row_id).first()
     if not row:
@@ -1002,7 +1443,7 @@ async def get_row_items(row_id: int, db: Session = Depends(get_db)):
 
 
 @app.get("/warehouse/visual-layout")
-async def get_visual_warehouse_layout(db: Session = Depends(get_db)):
+def get_visual_warehouse_layout(db: Session = Depends(get_db)):
     """Get complete warehouse layout with all items for visual shelf display."""
     rooms = db.query(Room).all()
     
@@ -1024,9 +1465,10 @@ async def get_visual_warehouse_layout(db: Session = Depends(get_db)):
             }
             
             for row in shelf.rows:
+                # One sprite per row; items with an image carry their cell in it
+                sprite, cells = sprite_layout(row.id, row.items)
                 items_data = []
                 for item in row.items:
-                    image_url = get_image_url_for_item(item.style, item.color)
                     items_data.append({
                         "id": item.id,
                         "style": item.style,
@@ -1034,7 +1476,9 @@ async def get_visual_warehouse_layout(db: Session = Depends(get_db)):
                         "division": item.division,
                         "outsole": item.outsole,
                         "gender": item.gender,
-                        "image_url": image_url,
+                        "image_url": item.image_url,
+                        "thumbnail_url": item.thumbnail_url,
+                        "sprite_cell": cells.get(item.id),
                         "status": item.status,
                         "unverified": bool(item.unverified)
                     })
@@ -1043,6 +1487,7 @@ async def get_visual_warehouse_layout(db: Session = Depends(get_db)):
                     "id": row.id,
                     "name": row.name,
                     "description": row.description,
+                    "sprite": sprite,
                     "items": items_data,
                     "item_count": len(items_data)
                 })
@@ -1055,14 +1500,12 @@ async def get_visual_warehouse_layout(db: Session = Depends(get_db)):
 
 
 @app.get("/items/{item_id}/profile")
-async def get_item_profile(item_id: str, db: Session = Depends(get_db)):
+def get_item_profile(item_id: str, db: Session = Depends(get_db)):
     """Get complete profile information for a specific item."""
     item = db.query(Item).filter_by(id=item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    image_url = get_image_url_for_item(item.style, item.color)
-    
     return {
         "id": item.id,
         "style": item.style,
@@ -1070,7 +1513,8 @@ async def get_item_profile(item_id: str, db: Session = Depends(get_db)):
         "division": item.division,
         "outsole": item.outsole,
         "gender": item.gender,
-        "image_url": image_url,
+        "image_url": item.image_url,
+        "thumbnail_url": thumbnail_variant(item.thumbnail_url, 'md'),
         "status": item.status,
         "unverified": bool(item.unverified),
         "source_files": item.source_files,
@@ -1097,7 +1541,7 @@ class BulkStatusUpdate(BaseModel):
 
 
 @app.put("/items/{item_id}/location")
-async def update_item_location(item_id: str, location_update: ItemLocationUpdate, db: Session = Depends(get_db)):
+def update_item_location(item_id: str, location_update: ItemLocationUpdate, db: Session = Depends(get_db)):
     """Assign or unassign an item to/from a warehouse location."""
     item = db.query(Item).filter_by(id=item_id).first()
     
@@ -1116,6 +1560,7 @@ async def update_item_location(item_id: str, location_update: ItemLocationUpdate
                 status="pending",
                 unverified=1
             )
+            apply_image_urls(item)
             db.add(item)
             db.commit()
             db.refresh(item)
@@ -1180,6 +1625,12 @@ async def update_item_location(item_id: str, location_update: ItemLocationUpdate
 #         raise HTTPException(status_code=500, detail=f"Barcode scanning failed: {str(e)}")
 
 
+def _scan_tag_image(image_data: bytes) -> Dict:
+    # OpenCV and Tesseract load on the first scan rather than at API startup
+    from tag_scanner import scan_skechers_tag
+    return scan_skechers_tag(image_data)
+
+
 @app.post("/scan-tag")
 async def scan_tag(file: UploadFile = File(...)):
     """
@@ -1190,17 +1641,19 @@ async def scan_tag(file: UploadFile = File(...)):
         # Read image data
         image_data = await file.read()
         
-        # Scan tag using OCR
-        result = scan_skechers_tag(image_data)
+        # Scan tag using OCR on the OCR pool so other requests keep flowing
+        result = await ocr_executor.run(_scan_tag_image, image_data)
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Tag scanning failed: {str(e)}")
 
 
 @app.get("/items/search")
-async def search_items(
+def search_items(
     style: Optional[str] = Query(None),
     color: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100),
@@ -1227,7 +1680,8 @@ async def search_items(
             "gender": item.gender,
             "status": item.status,
             "unverified": bool(item.unverified),
-            "image_url": item.image_url or get_image_url_for_item(item.style, item.color),
+            "image_url": item.image_url,
+            "thumbnail_url": item.thumbnail_url,
             "location": {
                 "room": item.row.shelf.room.name if item.row else None,
                 "shelf": item.row.shelf.name if item.row else None,
@@ -1242,37 +1696,75 @@ async def search_items(
 async def seasonal_drop_upload(
     file: UploadFile = File(...),
     season_name: str = Query(..., description="Name of the season (e.g., 'Spring 2025')"),
+    background: bool = Query(False, description="Queue as a background job and follow /upload-progress/{upload_id}"),
     db: Session = Depends(get_db)
 ):
     """
     Upload seasonal Excel file and automatically mark all styles NOT in the file as 'dropped'.
     Returns organized report of dropped items with their warehouse locations.
+    
+    With background, the sheet is spooled and processed by the job runner;
+    the report is the job result on /upload-jobs/{upload_id}.
     """
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="Invalid file format. Only .xlsx and .xls files are supported.")
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Invalid file format. Only .xlsx, .xls, .csv and .parquet files are supported.")
+    
+    if background:
+        upload_id = job_runner.new_job_id()
+        spool_path = job_runner.spool_path(upload_id, file.filename)
+        try:
+            stored = await stream_upload_to_disk(file, spool_path)
+            await run_in_threadpool(
+                job_runner.enqueue,
+                upload_id,
+                file.filename,
+                spool_path,
+                upload_images=False,
+                content_hash=stored['sha256'],
+                kind='seasonal_drop',
+                params={'season_name': season_name}
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            if os.path.exists(spool_path):
+                os.unlink(spool_path)
+            raise HTTPException(status_code=500, detail=f"Seasonal drop failed: {str(e)}")
+        
+        return {
+            "success": True,
+            "upload_id": upload_id,
+            "status": "queued",
+            "season_name": season_name
+        }
     
     temp_path = None
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            content = await file.read()
-            tmp.write(content)
+        # Stream uploaded file to a temporary path (the parser picks the reader by extension)
+        suffix = os.path.splitext(file.filename)[1].lower()
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
             temp_path = tmp.name
+        stored = await stream_upload_to_disk(file, temp_path)
         
         # Process seasonal drop
-        result = process_seasonal_drop(temp_path, season_name)
+        result = await ingest_executor.run(
+            process_seasonal_drop, temp_path, season_name, content_hash=stored['sha256']
+        )
         
         return {
             "success": True,
             "season_name": result['season_name'],
             "active_styles_count": result['active_styles_count'],
             "dropped_count": result['dropped_count'],
+            "kept_count": result['kept_count'],
             "dropped_with_location": result['dropped_with_location'],
             "dropped_without_location": result['dropped_without_location'],
             "items_by_location": result['items_by_location'],
             "items_without_location": result['items_without_location']
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Seasonal drop failed: {str(e)}")
     
@@ -1283,7 +1775,7 @@ async def seasonal_drop_upload(
 
 
 @app.get("/dropped-items/report")
-async def get_dropped_items_report(db: Session = Depends(get_db)):
+def get_dropped_items_report(db: Session = Depends(get_db)):
     """
     Get a formatted report of all dropped items organized by warehouse location.
     """
@@ -1334,7 +1826,7 @@ async def get_dropped_items_report(db: Session = Depends(get_db)):
 
 
 @app.put("/inventory/items/{item_id}/status")
-async def update_item_status(item_id: str, status_update: ItemStatusUpdate, db: Session = Depends(get_db)):
+def update_item_status(item_id: str, status_update: ItemStatusUpdate, db: Session = Depends(get_db)):
     """
     Update the status of a single item.
     """
@@ -1366,7 +1858,7 @@ async def update_item_status(item_id: str, status_update: ItemStatusUpdate, db:
 
 
 @app.put("/inventory/items/bulk-status")
-async def bulk_update_status(bulk_update: BulkStatusUpdate, db: Session = Depends(get_db)):
+def bulk_update_status(bulk_update: BulkStatusUpdate, db: Session = Depends(get_db)):
     """
     Bulk update items from one status to another.
     """
@@ -1399,7 +1891,7 @@ async def bulk_update_status(bulk_update: BulkStatusUpdate, db: Session = Depend
 
 
 @app.get("/dropped-items/export")
-async def export_dropped_items(db: Session = Depends(get_db)):
+def export_dropped_items(db: Session = Depends(get_db)):
     """
     Export dropped items report as downloadable text file.
     """
@@ -1488,7 +1980,7 @@ async def export_dropped_items(db: Session = Depends(get_db)):
 
 
 # Mount static files at the end (after all routes are defined)
-app.mount("/static", StaticFiles(directory="../static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="../static"), name="static")
 
 
 if __name__ == "__main__":
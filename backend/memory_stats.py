@@ -0,0 +1,78 @@
+"""Process memory sampling for reporting peak usage of ingestion work."""
+import os
+import sys
+import threading
+import resource
+from typing import Dict, Optional
+
+SAMPLE_INTERVAL = 0.05  # seconds
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Return the current resident set size, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_rss_bytes() -> int:
+    """Return the process-lifetime peak RSS reported by getrusage."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PeakMemorySampler:
+    """
+    Track the peak RSS while a block of work runs.
+
+    Samples /proc in a background thread. Without /proc (macOS) it falls back
+    to the getrusage high-water mark, which covers the whole process lifetime.
+    RSS is per process, so concurrent jobs in the same worker share the figure.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        rss = current_rss_bytes()
+        if rss is None:
+            self.start_bytes = self.peak_bytes = max_rss_bytes()
+            return self
+
+        self.start_bytes = self.peak_bytes = rss
+        self._thread = threading.Thread(target=self._sample, name='memory-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            rss = current_rss_bytes()
+            if rss:
+                self.peak_bytes = max(self.peak_bytes, rss)
+        else:
+            self.peak_bytes = max_rss_bytes()
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss_bytes()
+            if rss and rss > self.peak_bytes:
+                self.peak_bytes = rss
+
+    def report(self) -> Dict:
+        """Return start and peak RSS and their difference, in MB."""
+        mb = 1024 * 1024
+        return {
+            'rss_start_mb': round(self.start_bytes / mb, 1),
+            'rss_peak_mb': round(self.peak_bytes / mb, 1),
+            'rss_growth_mb': round((self.peak_bytes - self.start_bytes) / mb, 1)
+        }
@@ -0,0 +1,99 @@
+"""On-disk cache of parsed workbooks, keyed by workbook content hash."""
+import hashlib
+import os
+import pickle
+from typing import Dict, Optional
+
+CACHE_DIR = os.getenv('PARSE_CACHE_DIR', os.path.join('..', 'cache', 'parsed'))
+MAX_ENTRIES = int(os.getenv('PARSE_CACHE_MAX_ENTRIES', '50'))
+
+# Bump when the normalized form produced by InventoryParser changes
+CACHE_VERSION = 2
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_path(content_hash: str) -> str:
+    return os.path.join(CACHE_DIR, f"{content_hash}.pkl")
+
+
+def load(content_hash: str) -> Optional[Dict]:
+    """
+    Load a cached parse.
+
+    Args:
+        content_hash: SHA-256 of the workbook
+
+    Returns:
+        Dictionary with 'columns' (name -> numpy array, in column order) and
+        'styles_data', or None on a miss or an unreadable/outdated entry
+    """
+    path = _entry_path(content_hash)
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Discarding unreadable parse cache entry {path}: {e}")
+        os.unlink(path)
+        return None
+
+    if entry.get('version') != CACHE_VERSION:
+        return None
+
+    # Touch so pruning keeps recently used entries
+    os.utime(path)
+    return entry
+
+
+def store(content_hash: str, df, styles_data: Dict):
+    """
+    Store the normalized frame (as column arrays) and style groups.
+
+    Args:
+        content_hash: SHA-256 of the workbook
+        df: Normalized DataFrame including base_style and variant columns
+        styles_data: Style groups as built by InventoryParser
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    entry = {
+        'version': CACHE_VERSION,
+        'columns': {col: df[col].to_numpy() for col in df.columns},
+        'styles_data': styles_data
+    }
+
+    path = _entry_path(content_hash)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    _prune()
+
+
+def _prune():
+    """Drop least recently used entries beyond MAX_ENTRIES."""
+    entries = [
+        os.path.join(CACHE_DIR, name)
+        for name in os.listdir(CACHE_DIR)
+        if name.endswith('.pkl')
+    ]
+    if len(entries) <= MAX_ENTRIES:
+        return
+
+    entries.sort(key=os.path.getmtime)
+    for path in entries[:len(entries) - MAX_ENTRIES]:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
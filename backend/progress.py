@@ -0,0 +1,112 @@
+"""In-process pub/sub channel for upload progress, consumed by the SSE endpoint."""
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional, Set
+
+# Finished uploads stay readable this long, then are evicted
+FINISHED_TTL_SECONDS = int(os.getenv('PROGRESS_TTL_SECONDS', '300'))
+
+TERMINAL_STATUSES = ('completed', 'error')
+
+
+class Subscription:
+    """
+    One SSE client waiting on an upload's progress.
+
+    Publishers only set a flag, so a slow client skips intermediate updates
+    and always reads the latest state rather than building up a backlog.
+    """
+
+    def __init__(self, broker: 'ProgressBroker', upload_id: str):
+        self.broker = broker
+        self.upload_id = upload_id
+        self.loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def notify(self):
+        """Wake the subscriber; safe to call from any thread."""
+        self.loop.call_soon_threadsafe(self._event.set)
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Wait for the next update.
+
+        Returns:
+            Latest progress for the upload, or None on timeout
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        return self.broker.latest(self.upload_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.broker.unsubscribe(self)
+        return False
+
+
+class ProgressBroker:
+    """Keeps the latest progress per upload and wakes subscribers on publish."""
+
+    def __init__(self, ttl_seconds: int = FINISHED_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._latest: Dict[str, Dict] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, upload_id: str, data: Dict):
+        """Record progress for an upload and wake its subscribers."""
+        with self._lock:
+            self._latest[upload_id] = data
+            if data.get('status') in TERMINAL_STATUSES:
+                self._finished_at[upload_id] = time.monotonic()
+            subscribers = list(self._subscribers.get(upload_id, ()))
+            self._evict_expired()
+
+        for subscription in subscribers:
+            subscription.notify()
+
+    def latest(self, upload_id: str) -> Optional[Dict]:
+        """Return the most recent progress for an upload, if still held."""
+        with self._lock:
+            return self._latest.get(upload_id)
+
+    def subscribe(self, upload_id: str) -> Subscription:
+        """
+        Register a subscriber for an upload. Must be called on the event loop.
+
+        The subscription is woken immediately if progress already exists, so
+        the first next() returns the current state.
+        """
+        subscription = Subscription(self, upload_id)
+        with self._lock:
+            self._subscribers.setdefault(upload_id, set()).add(subscription)
+            has_progress = upload_id in self._latest
+        if has_progress:
+            subscription._event.set()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.upload_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.upload_id]
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [upload_id for upload_id, at in self._finished_at.items() if at < cutoff]
+        for upload_id in expired:
+            del self._finished_at[upload_id]
+            self._latest.pop(upload_id, None)
+
+
+progress_broker = ProgressBroker()
@@ -25,6 +25,7 @@ class ColorVariant(BaseModel):
     """Color variant with image and width information."""
     color: str = Field(..., description="Color code with optional width suffix (e.g., 'BBK (w)')")
     image_url: Optional[str] = Field(None, description="Supabase public URL for product image")
+    thumbnail_url: Optional[str] = Field(None, description="Small thumbnail URL (WebP or JPEG by Accept header)")
     width: str = Field(..., description="Width type: regular, wide, or extra_wide")
     
     @validator('width', pre=True, always=True)
@@ -53,6 +54,7 @@ class ItemResponse(BaseModel):
     outsole: Optional[str]
     gender: Optional[str]
     image_url: Optional[str]
+    thumbnail_url: Optional[str] = Field(None, description="Small thumbnail URL (WebP or JPEG by Accept header)")
     source_files: List[str] = Field(..., description="Excel files containing this item")
     status: str = Field(default="pending", description="Item status")
     width: str = Field(..., description="Width type parsed from color")
@@ -196,19 +198,81 @@ class ActionHistoryItem(BaseModel):
 class UploadResponse(BaseModel):
     """Response after uploading an Excel file."""
     success: bool
-    items_saved: int
-    styles_processed: int
-    images_uploaded: int
+    upload_id: Optional[str] = Field(None, description="Job id for progress tracking")
+    status: str = Field(default="queued", description="Job status: queued, running, completed, failed")
+    items_saved: Optional[int] = None
+    styles_processed: Optional[int] = None
+    images_uploaded: Optional[int] = None
     source_file: str
+    duplicate_of: Optional[str] = Field(None, description="Filename of the identical workbook already ingested")
+    message: Optional[str] = Field(None, description="Explanation when a duplicate was skipped under a different filename")
+    dry_run_report: Optional[Dict] = Field(None, description="What the upload would change (dry_run only)")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "success": True,
-                "items_saved": 4745,
-                "styles_processed": 1250,
-                "images_uploaded": 3641,
-                "source_file": "wof_09_17_2025.xlsx"
+                "upload_id": "5b0f6c7e-2f1d-4c1e-9a55-0d6f1b2f8e11",
+                "status": "queued",
+                "items_saved": None,
+                "styles_processed": None,
+                "images_uploaded": None,
+                "source_file": "wof_09_17_2025.xlsx",
+                "duplicate_of": None,
+                "dry_run_report": None
+            }
+        }
+
+
+class BatchUploadResponse(BaseModel):
+    """Response after queueing a batch of workbooks."""
+    success: bool
+    upload_id: str = Field(..., description="Job id for progress tracking")
+    status: str = Field(default="queued", description="Job status: queued, running, completed, failed")
+    files: List[str] = Field(..., description="Uploaded files (workbooks or zip archives)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "upload_id": "0c3a3f1e-8d4e-4a8f-b2a5-3f0b1d7c9e21",
+                "status": "queued",
+                "files": ["wof_09_17_2025.xlsx", "wof_10_29_2025.xlsx"]
+            }
+        }
+
+
+class UploadJobResponse(BaseModel):
+    """Status of a background upload job."""
+    upload_id: str
+    kind: Optional[str] = Field(None, description="upload, batch, or seasonal_drop")
+    filename: str
+    status: str = Field(..., description="queued, running, completed, or failed")
+    attempts: int
+    progress: Optional[Dict] = Field(None, description="Latest progress event")
+    result: Optional[Dict] = Field(None, description="Upload statistics once completed")
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "upload_id": "5b0f6c7e-2f1d-4c1e-9a55-0d6f1b2f8e11",
+                "filename": "wof_09_17_2025.xlsx",
+                "status": "completed",
+                "attempts": 1,
+                "result": {
+                    "items_saved": 4745,
+                    "styles_processed": 1250,
+                    "images_uploaded": 3641,
+                    "source_file": "wof_09_17_2025.xlsx"
+                },
+                "error": None,
+                "created_at": "2024-12-20T10:00:00Z",
+                "started_at": "2024-12-20T10:00:01Z",
+                "finished_at": "2024-12-20T10:01:30Z"
             }
         }
 
@@ -288,12 +352,16 @@ class HealthResponse(BaseModel):
     """Health check response."""
     status: str
     database: str
+    executors: Optional[Dict[str, Dict]] = Field(None, description="Running and queued calls per worker pool")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "status": "healthy",
-                "database": "connected"
+                "database": "connected",
+                "executors": {
+                    "ocr": {"workers": 2, "running": 1, "queued": 0, "max_queue": 8}
+                }
             }
         }
 
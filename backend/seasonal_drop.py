@@ -1,25 +1,35 @@
 """Seasonal drop management - mark styles not in seasonal sheet as dropped."""
-from typing import Dict, List
-from excel_parser import InventoryParser
+from typing import Callable, Dict, List, Optional
 from database import get_session, Item
 
 
-def process_seasonal_drop(excel_file_path: str, season_name: str) -> Dict:
+def process_seasonal_drop(
+    excel_file_path: str,
+    season_name: str,
+    content_hash: Optional[str] = None,
+    progress: Optional[Callable[[str, int, int], None]] = None
+) -> Dict:
     """
     Process seasonal drop: mark all styles NOT in the uploaded file as 'dropped'.
     
     Args:
         excel_file_path: Path to seasonal Excel file
         season_name: Name of the season (e.g., "Spring 2025")
+        content_hash: SHA-256 of the file if already known, for the parse cache
+        progress: Called as progress(stage, done, total) for parsing ('parse')
+            and for checking items against the sheet ('drop')
         
     Returns:
         Dictionary with drop statistics and dropped items with locations
     """
+    # pandas/openpyxl load on first use rather than at API startup
+    from excel_parser import InventoryParser
+    
     session = get_session()
     
     try:
         # Parse the seasonal Excel file to get active styles
-        parser = InventoryParser(excel_file_path)
+        parser = InventoryParser(excel_file_path, content_hash=content_hash, progress=progress)
         active_styles = set(parser.get_all_styles())
         
         # Get all items from database
@@ -28,7 +38,10 @@ def process_seasonal_drop(excel_file_path: str, season_name: str) -> Dict:
         dropped_items = []
         kept_items = []
         
-        for item in all_items:
+        for checked, item in enumerate(all_items, 1):
+            if progress:
+                progress('drop', checked, len(all_items))
+            
             # Normalize style to 6 digits for comparison
             item_style = item.style.zfill(6)
             
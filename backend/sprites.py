@@ -0,0 +1,152 @@
+"""
+Per-row sprite sheets for the visual warehouse layout.
+
+A row's sprite holds the small thumbnail of every item in it that has a
+library image, one fixed-size cell per item, so a row renders with one image
+request instead of one per item. The sprite is keyed by its contents (item
+ids and their image hashes): the layout payload carries the key and each
+item's cell, and the sprite is only rebuilt when that key changes. Older
+sprites of the same row are removed when a new one is written.
+"""
+import hashlib
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+from database import Item, get_session
+from image_index import IMAGES_DIR
+from thumbnails import (
+    THUMBNAIL_SIZES, DEFAULT_THUMBNAIL_SIZE, WEBP_QUALITY, JPEG_QUALITY,
+    parse_thumbnail_url, ensure_thumbnail
+)
+
+SPRITES_DIR = os.getenv('SPRITES_DIR', os.path.join(os.path.dirname(IMAGES_DIR), 'sprites'))
+SPRITES_URL_PREFIX = '/sprites/rows'
+SPRITE_CELL = THUMBNAIL_SIZES[DEFAULT_THUMBNAIL_SIZE]
+SPRITE_COLUMNS = int(os.getenv('SPRITE_COLUMNS', '8'))
+SPRITE_BACKGROUND = (255, 255, 255)
+
+# (item id, library file name, image content hash)
+Member = Tuple[str, str, Optional[str]]
+
+
+def sprite_members(items: List[Item]) -> List[Member]:
+    """Return the items that belong on a row's sprite, in cell order."""
+    members = []
+    for item in items:
+        parsed = parse_thumbnail_url(item.thumbnail_url)
+        if parsed:
+            _, filename, version = parsed
+            members.append((item.id, filename, version))
+    return sorted(members)
+
+
+def sprite_key(members: List[Member]) -> str:
+    """Hash of a sprite's contents and geometry; changes whenever it must be rebuilt."""
+    sha = hashlib.sha256(f"{SPRITE_CELL}:{SPRITE_COLUMNS}".encode())
+    for item_id, _, version in members:
+        sha.update(f"\n{item_id}:{version}".encode())
+    return sha.hexdigest()[:16]
+
+
+def sprite_layout(row_id: int, items: List[Item]) -> Tuple[Optional[Dict], Dict[str, Dict]]:
+    """
+    Describe a row's sprite for the layout payload.
+
+    Returns:
+        (sprite, cells): sprite URL and grid size (None when no item has an
+        image), and each member item's cell keyed by item id
+    """
+    members = sprite_members(items)
+    if not members:
+        return None, {}
+
+    columns = min(len(members), SPRITE_COLUMNS)
+    rows = math.ceil(len(members) / columns)
+    cells = {}
+    for index, (item_id, _, _) in enumerate(members):
+        col, row = index % columns, index // columns
+        cells[item_id] = {
+            'x': col * SPRITE_CELL,
+            'y': row * SPRITE_CELL,
+            'col': col,
+            'row': row
+        }
+
+    sprite = {
+        'url': f"{SPRITES_URL_PREFIX}/{row_id}?v={sprite_key(members)}",
+        'cell': SPRITE_CELL,
+        'columns': columns,
+        'rows': rows,
+        'width': columns * SPRITE_CELL,
+        'height': rows * SPRITE_CELL
+    }
+    return sprite, cells
+
+
+def load_row_members(row_id: int) -> List[Member]:
+    """Load the current sprite members of a row from the database."""
+    session = get_session()
+    try:
+        return sprite_members(session.query(Item).filter_by(row_id=row_id).all())
+    finally:
+        session.close()
+
+
+def sprite_path(row_id: int, key: str, fmt: str) -> str:
+    return os.path.join(SPRITES_DIR, f"row{row_id}_{key}.{fmt}")
+
+
+def cached_sprite(row_id: int, key: str, fmt: str) -> Optional[str]:
+    """Return the sprite file for this content key if it was already built."""
+    path = sprite_path(row_id, key, fmt)
+    return path if os.path.exists(path) else None
+
+
+def build_sprite(row_id: int, members: List[Member], key: str, fmt: str) -> str:
+    """
+    Compose a row's sprite from the items' small thumbnails and cache it.
+
+    Cells whose image has gone missing are left blank. Sprites of this row
+    with a different key are deleted.
+
+    Returns:
+        Path to the sprite
+    """
+    from PIL import Image
+
+    path = sprite_path(row_id, key, fmt)
+    if os.path.exists(path):
+        return path
+
+    columns = min(len(members), SPRITE_COLUMNS)
+    rows = math.ceil(len(members) / columns)
+    sheet = Image.new('RGB', (columns * SPRITE_CELL, rows * SPRITE_CELL), SPRITE_BACKGROUND)
+
+    for index, (_, filename, _) in enumerate(members):
+        thumb_path = ensure_thumbnail(filename, DEFAULT_THUMBNAIL_SIZE, 'jpg')
+        if thumb_path is None:
+            continue
+        with Image.open(thumb_path) as thumb:
+            thumb = thumb.convert('RGB')
+            # Centre each thumbnail in its square cell
+            x = (index % columns) * SPRITE_CELL + (SPRITE_CELL - thumb.width) // 2
+            y = (index // columns) * SPRITE_CELL + (SPRITE_CELL - thumb.height) // 2
+            sheet.paste(thumb, (x, y))
+
+    os.makedirs(SPRITES_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if fmt == 'webp':
+        sheet.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        sheet.save(tmp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+
+    prefix, current = f"row{row_id}_", os.path.basename(path)
+    for name in os.listdir(SPRITES_DIR):
+        if name.startswith(prefix) and not name.endswith('.tmp') and name.rsplit('.', 1)[0] != current.rsplit('.', 1)[0]:
+            try:
+                os.unlink(os.path.join(SPRITES_DIR, name))
+            except FileNotFoundError:
+                pass
+    return path
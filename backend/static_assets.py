@@ -0,0 +1,268 @@
+"""
+Content-addressed static files: hashed URLs, immutable caching, 304s and
+precompressed text assets.
+
+Every served file gets a strong ETag from a hash of its bytes. A request
+whose ?v= matches that hash is for exactly this content, so it is cached as
+immutable; anything else must revalidate, which costs a 304 when unchanged.
+Text assets are sent precompressed (brotli when the optional `brotli`
+package is installed, gzip otherwise); compressed variants are stored in
+ASSET_CACHE_DIR under the content hash, so they never go stale.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join('..', 'static')
+STATIC_URL_PREFIX = '/static'
+ASSET_CACHE_DIR = os.getenv('ASSET_CACHE_DIR', os.path.join('..', 'cache', 'assets'))
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+COMPRESSIBLE_EXTENSIONS = {'.js', '.css', '.html', '.svg', '.json', '.txt'}
+# Below this the compressed variant saves less than the headers cost
+MIN_COMPRESS_BYTES = 1024
+DIGEST_LENGTH = 16
+
+_digests: Dict[str, Tuple[int, int, str]] = {}
+_digests_lock = threading.Lock()
+
+# href/src attributes pointing into the static mount, with any existing ?v=
+ASSET_REFERENCE = re.compile(r'((?:href|src)=")' + STATIC_URL_PREFIX + r'/([^"?#]+)(\?v=[^"#]*)?(")')
+
+
+def file_digest(path: str, stat_result: Optional[os.stat_result] = None) -> str:
+    """
+    Return a hash of a file's bytes, recomputed only when its mtime or size changes.
+
+    Args:
+        path: File to hash
+        stat_result: Result of os.stat(path) if the caller already has it
+
+    Returns:
+        Hex digest, DIGEST_LENGTH characters
+    """
+    if stat_result is None:
+        stat_result = os.stat(path)
+    key = (stat_result.st_mtime_ns, stat_result.st_size)
+
+    with _digests_lock:
+        cached = _digests.get(path)
+    if cached and cached[:2] == key:
+        return cached[2]
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(block)
+    digest = sha.hexdigest()[:DIGEST_LENGTH]
+
+    with _digests_lock:
+        _digests[path] = (key[0], key[1], digest)
+    return digest
+
+
+def versioned_url(url: str, digest: str) -> str:
+    """Append the content hash to a URL as ?v=."""
+    return f"{url}?v={digest}"
+
+
+def asset_url(name: str, static_dir: str = STATIC_DIR) -> str:
+    """Return the content-hashed URL of a file in the static directory."""
+    url = f"{STATIC_URL_PREFIX}/{name}"
+    try:
+        return versioned_url(url, file_digest(os.path.join(static_dir, name)))
+    except FileNotFoundError:
+        return url
+
+
+def is_current_version(query_string: str, digest: str) -> bool:
+    """Return True if a request's ?v= names exactly this content."""
+    return parse_qs(query_string).get('v', [None])[0] == digest
+
+
+def cache_control_for(query_string: str, digest: str) -> str:
+    """Immutable for a matching content hash, revalidate otherwise."""
+    if is_current_version(query_string, digest):
+        return IMMUTABLE_CACHE_CONTROL
+    return REVALIDATE_CACHE_CONTROL
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if an If-None-Match header covers this ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag in tags
+
+
+def accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best precompressed encoding the client accepts."""
+    if not accept_encoding:
+        return None
+    offered = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                pass
+        offered[name.strip().lower()] = quality
+
+    candidates = ('br', 'gzip') if brotli is not None else ('gzip',)
+    for encoding in candidates:
+        if offered.get(encoding, offered.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(path: str, size: int) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS and size >= MIN_COMPRESS_BYTES
+
+
+def precompressed_path(path: str, digest: str, encoding: str) -> str:
+    """
+    Return the compressed variant of a file, writing it on first use.
+
+    Variants are named by content hash, so a changed file gets a new variant
+    and an existing one is always current.
+    """
+    suffix = 'br' if encoding == 'br' else 'gz'
+    ext = os.path.splitext(path)[1]
+    variant = os.path.join(ASSET_CACHE_DIR, f"{digest}{ext}.{suffix}")
+    if os.path.exists(variant):
+        return variant
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=11)
+    else:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{variant}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(compressed)
+    os.replace(tmp_path, variant)
+    return variant
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """Return a 304 carrying the validators and caching headers of the full response."""
+    kept = {k: v for k, v in headers.items() if k.lower() in ('etag', 'cache-control', 'vary', 'content-location', 'expires')}
+    return Response(status_code=304, headers=kept)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with content-hash ETags, immutable versioned URLs and precompressed text."""
+
+    def lookup_path(self, path: str):
+        # Runs in a worker thread: hash and compress here, off the event loop
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result and stat.S_ISREG(stat_result.st_mode):
+            digest = file_digest(full_path, stat_result)
+            if is_compressible(full_path, stat_result.st_size):
+                for encoding in ('br', 'gzip') if brotli is not None else ('gzip',):
+                    precompressed_path(full_path, digest, encoding)
+        return full_path, stat_result
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        digest = file_digest(full_path, stat_result)
+        query_string = scope.get('query_string', b'').decode('latin-1')
+
+        headers = {'Cache-Control': cache_control_for(query_string, digest)}
+        send_path, send_stat = full_path, stat_result
+        etag = f'"{digest}"'
+
+        if is_compressible(full_path, stat_result.st_size):
+            headers['Vary'] = 'Accept-Encoding'
+            encoding = accepted_encoding(request_headers.get('accept-encoding'))
+            # Byte ranges refer to the identity file; a range of the compressed
+            # variant under Content-Encoding can't be decoded by the client
+            if encoding and 'range' not in request_headers:
+                send_path = precompressed_path(full_path, digest, encoding)
+                send_stat = os.stat(send_path)
+                headers['Content-Encoding'] = encoding
+                # Each encoding is a different representation, so a different strong ETag
+                etag = f'"{digest}-{encoding}"'
+
+        headers['ETag'] = etag
+        if etag_matches(request_headers.get('if-none-match'), etag):
+            return not_modified(headers)
+
+        return FileResponse(
+            send_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=mimetypes.guess_type(full_path)[0] or 'application/octet-stream',
+            stat_result=send_stat
+        )
+
+
+def render_page(path: str, request_headers: Headers) -> Response:
+    """
+    Serve an HTML page with its /static references rewritten to hashed URLs.
+
+    The page itself must revalidate on every load (it is what carries the
+    new asset hashes), but an unchanged page costs only a 304.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    def versioned(match):
+        return f"{match.group(1)}{asset_url(match.group(2))}{match.group(4)}"
+
+    body = ASSET_REFERENCE.sub(versioned, html).encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()[:DIGEST_LENGTH]
+    headers = {'Cache-Control': REVALIDATE_CACHE_CONTROL, 'Vary': 'Accept-Encoding'}
+
+    encoding = accepted_encoding(request_headers.get('accept-encoding'))
+    headers['ETag'] = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    if etag_matches(request_headers.get('if-none-match'), headers['ETag']):
+        return not_modified(headers)
+
+    if encoding:
+        body = _compressed_page(digest, body, encoding)
+        headers['Content-Encoding'] = encoding
+    return Response(body, media_type='text/html', headers=headers)
+
+
+_pages: Dict[Tuple[str, str], bytes] = {}
+
+
+def _compressed_page(digest: str, body: bytes, encoding: str) -> bytes:
+    # Keyed by content hash; only the current version of each page is worth keeping
+    key = (digest, encoding)
+    compressed = _pages.get(key)
+    if compressed is None:
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=11)
+        else:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(_pages) > 32:
+            _pages.clear()
+        _pages[key] = compressed
+    return compressed
@@ -0,0 +1,202 @@
+"""
+Fixed-size thumbnail derivatives of library images, in WebP and JPEG.
+
+Derivatives live under THUMBS_DIR/<size>/<name>.<fmt>, next to the image
+library. Extraction writes them from the image it already has decoded;
+images that predate this are rendered on first request. A derivative older
+than its source image is treated as stale and rendered again.
+
+PIL is imported on first use so importing this module stays cheap.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from image_index import IMAGES_DIR
+
+# Longest edge in pixels for each named size
+THUMBNAIL_SIZES = {
+    'sm': 160,  # list and grid cells
+    'md': 400,  # item profile and detail panels
+    'lg': 800,  # zoomed preview
+}
+DEFAULT_THUMBNAIL_SIZE = 'sm'
+
+# Preferred format first; JPEG is the fallback for clients without WebP
+THUMBNAIL_FORMATS = ('webp', 'jpg')
+MEDIA_TYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+WEBP_QUALITY = int(os.getenv('THUMBNAIL_WEBP_QUALITY', '80'))
+JPEG_QUALITY = int(os.getenv('THUMBNAIL_JPEG_QUALITY', '82'))
+
+THUMBS_DIR = os.getenv('THUMBS_DIR', os.path.join(os.path.dirname(IMAGES_DIR), 'thumbs'))
+THUMBS_URL_PREFIX = '/thumbnails'
+
+
+def thumbs_dir_for(images_dir: str) -> str:
+    """Return the derivative directory for an image directory (its sibling 'thumbs')."""
+    if os.path.abspath(images_dir) == os.path.abspath(IMAGES_DIR):
+        return THUMBS_DIR
+    return os.path.join(os.path.dirname(os.path.abspath(images_dir)), 'thumbs')
+
+
+def thumbnail_path(filename: str, size: str, fmt: str, thumbs_dir: str = THUMBS_DIR) -> str:
+    """Return where the derivative of a library file is stored."""
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(thumbs_dir, size, f"{stem}.{fmt}")
+
+
+def thumbnail_url(filename: str, size: str = DEFAULT_THUMBNAIL_SIZE, version: Optional[str] = None) -> str:
+    """Return the URL that serves a library file at the given size, tagged with the source's content hash."""
+    url = f"{THUMBS_URL_PREFIX}/{size}/{filename}"
+    return f"{url}?v={version}" if version else url
+
+
+def thumbnail_variant(url: Optional[str], size: str) -> Optional[str]:
+    """Return the same thumbnail URL at another size (None stays None)."""
+    prefix = f"{THUMBS_URL_PREFIX}/{DEFAULT_THUMBNAIL_SIZE}/"
+    if not url or not url.startswith(prefix):
+        return url
+    return f"{THUMBS_URL_PREFIX}/{size}/{url[len(prefix):]}"
+
+
+def parse_thumbnail_url(url: Optional[str]) -> Optional[Tuple[str, str, Optional[str]]]:
+    """Split a thumbnail URL into (size, filename, version); None if it is not one."""
+    prefix = f"{THUMBS_URL_PREFIX}/"
+    if not url or not url.startswith(prefix):
+        return None
+    path, _, query = url[len(prefix):].partition('?')
+    size, _, filename = path.partition('/')
+    version = query[2:] if query.startswith('v=') else None
+    return size, filename, version
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Pick WebP when the client's Accept header allows it, else JPEG."""
+    if accept and 'image/webp' in accept:
+        return 'webp'
+    return 'jpg'
+
+
+def _save(image, path: str, fmt: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write beside the target and rename, so readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if fmt == 'webp':
+        image.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        image.save(tmp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+
+
+def write_thumbnails(image, filename: str, thumbs_dir: str = THUMBS_DIR) -> List[str]:
+    """
+    Write every size and format of one image.
+
+    Args:
+        image: Decoded PIL image (not modified)
+        filename: Library file name the derivatives belong to
+        thumbs_dir: Derivative root directory
+
+    Returns:
+        Paths written
+    """
+    from PIL import Image
+
+    current = image if image.mode == 'RGB' else image.convert('RGB')
+    written = []
+    # Largest first, each step resampling the previous one instead of the original
+    for size, edge in sorted(THUMBNAIL_SIZES.items(), key=lambda kv: kv[1], reverse=True):
+        current = current.copy()
+        current.thumbnail((edge, edge), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in THUMBNAIL_FORMATS:
+            path = thumbnail_path(filename, size, fmt, thumbs_dir)
+            _save(current, path, fmt)
+            written.append(path)
+    return written
+
+
+def _is_fresh(path: str, source_mtime: float) -> bool:
+    try:
+        return os.stat(path).st_mtime >= source_mtime
+    except FileNotFoundError:
+        return False
+
+
+def cached_thumbnail(filename: str, size: str, fmt: str,
+                     images_dir: str = IMAGES_DIR, thumbs_dir: str = THUMBS_DIR) -> Optional[str]:
+    """Return the derivative path if it exists and is not older than its source."""
+    try:
+        source_mtime = os.stat(os.path.join(images_dir, filename)).st_mtime
+    except FileNotFoundError:
+        return None
+    path = thumbnail_path(filename, size, fmt, thumbs_dir)
+    return path if _is_fresh(path, source_mtime) else None
+
+
+def ensure_thumbnail(filename: str, size: str, fmt: str,
+                     images_dir: str = IMAGES_DIR, thumbs_dir: str = THUMBS_DIR) -> Optional[str]:
+    """
+    Return the derivative path, rendering all sizes of the image if it is missing or stale.
+
+    Returns:
+        Path to the derivative, or None if the source image does not exist
+    """
+    path = cached_thumbnail(filename, size, fmt, images_dir, thumbs_dir)
+    if path:
+        return path
+
+    source = os.path.join(images_dir, filename)
+    if not os.path.isfile(source):
+        return None
+
+    from PIL import Image
+    with Image.open(source) as image:
+        image.load()
+        write_thumbnails(image, filename, thumbs_dir)
+    return thumbnail_path(filename, size, fmt, thumbs_dir)
+
+
+def generate_missing(images_dir: str = IMAGES_DIR, thumbs_dir: str = THUMBS_DIR) -> Dict:
+    """
+    Render derivatives for every library image that lacks fresh ones.
+
+    Returns:
+        Dictionary with generated, current and failed counts
+    """
+    generated = current = failed = 0
+    if not os.path.isdir(images_dir):
+        return {'generated': 0, 'current': 0, 'failed': 0}
+
+    with os.scandir(images_dir) as entries:
+        names = sorted(e.name for e in entries if e.is_file() and e.name.lower().endswith(('.jpg', '.jpeg', '.png')))
+
+    for name in names:
+        fresh = all(
+            cached_thumbnail(name, size, fmt, images_dir, thumbs_dir)
+            for size in THUMBNAIL_SIZES for fmt in THUMBNAIL_FORMATS
+        )
+        if fresh:
+            current += 1
+            continue
+        try:
+            from PIL import Image
+            with Image.open(os.path.join(images_dir, name)) as image:
+                image.load()
+                write_thumbnails(image, name, thumbs_dir)
+            generated += 1
+        except Exception as e:
+            print(f"✗ Could not render thumbnails for {name}: {e}")
+            failed += 1
+
+    return {'generated': generated, 'current': current, 'failed': failed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Render missing or stale thumbnails for the image library.')
+    parser.add_argument('--images-dir', default=IMAGES_DIR)
+    args = parser.parse_args()
+
+    stats = generate_missing(args.images_dir, thumbs_dir_for(args.images_dir))
+    print(f"Generated {stats['generated']}, already current {stats['current']}, failed {stats['failed']}")
@@ -0,0 +1,77 @@
+"""Stream uploaded files to disk in fixed-size chunks."""
+import hashlib
+import os
+from typing import Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))  # 1 MB
+MAX_UPLOAD_MB = int(os.getenv('MAX_UPLOAD_MB', '500'))
+MAX_UPLOAD_BYTES = MAX_UPLOAD_MB * 1024 * 1024
+
+
+def check_content_length(content_length: Optional[str], max_bytes: int = MAX_UPLOAD_BYTES):
+    """
+    Reject a request up front when its declared body size is over the limit.
+
+    Args:
+        content_length: Raw Content-Length header value (may be None)
+        max_bytes: Maximum accepted size in bytes
+
+    Raises:
+        HTTPException: 413 if the declared size exceeds max_bytes
+    """
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload too large. Maximum size is {max_bytes // (1024 * 1024)} MB."
+        )
+
+
+async def stream_upload_to_disk(
+    file: UploadFile,
+    dest_path: str,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> Dict:
+    """
+    Copy an uploaded file to disk chunk by chunk, hashing it on the way.
+
+    Memory use is bounded by chunk_size regardless of the upload size. The
+    partial file is removed if the upload exceeds max_bytes or fails.
+
+    Args:
+        file: Incoming upload
+        dest_path: Where to write the file
+        max_bytes: Maximum accepted size in bytes
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Dictionary with path, sha256 hex digest and size in bytes
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(dest_path, 'wb') as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Upload too large. Maximum size is {max_bytes // (1024 * 1024)} MB."
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.unlink(dest_path)
+        raise
+
+    return {
+        'path': dest_path,
+        'sha256': digest.hexdigest(),
+        'size': size
+    }
@@ -1,25 +1,134 @@
 #!/usr/bin/env python3
-"""Startup script for SMAC Warehouse Management System."""
+"""
+Startup script for SMAC Warehouse Management System.
+
+Usage:
+    python run.py                      # development: one process, auto-reload
+    python run.py --prod               # production: multiple workers, no reload
+    python run.py --prod --workers 4
+
+Production mode uses gunicorn with uvicorn workers and a preloaded app when
+gunicorn is installed, otherwise uvicorn's own process manager. Each worker
+warms its caches before serving and drains running uploads on shutdown.
+"""
+import argparse
 import uvicorn
 import sys
 import os
 
-# Add the project root to the Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(PROJECT_DIR, "backend")
+
+# The backend uses flat imports and paths relative to backend/ (../static)
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_WORKERS = int(os.getenv("WEB_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+DEFAULT_PORT = int(os.getenv("PORT", "8000"))
+
+
+def prepare_database():
+    """Create or migrate tables once, before any worker starts."""
+    from database import ensure_schema
+    engine = ensure_schema()
+    # Workers open their own pools; don't hand inherited connections to forked children
+    engine.dispose()
+
+
+def serve_gunicorn(host: str, port: int, workers: int, drain_seconds: int):
+    """Run under gunicorn with uvicorn workers and the app preloaded in the master."""
+    from gunicorn.app.base import BaseApplication
+
+    class WarehouseApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+            return app
+
+    WarehouseApplication({
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        # Long enough for the shutdown handler to drain running uploads
+        "graceful_timeout": drain_seconds + 10,
+        "timeout": 120,
+        "keepalive": 5,
+        "loglevel": "info",
+    }).run()
+
+
+def serve_uvicorn(host: str, port: int, workers: int, drain_seconds: int):
+    """Run uvicorn's multi-process server (each worker imports the app itself)."""
+    uvicorn.run(
+        "main:app",
+        app_dir=BACKEND_DIR,
+        host=host,
+        port=port,
+        workers=workers,
+        reload=False,
+        timeout_graceful_shutdown=drain_seconds + 10,
+        log_level="info"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start the SMAC warehouse server.")
+    parser.add_argument("--prod", action="store_true", help="Production mode: multiple workers, no reload")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Worker processes in production mode (default: WEB_CONCURRENCY or CPU count, max 4)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
 
-if __name__ == "__main__":
     print("=" * 60)
     print("🚀 Starting SMAC Warehouse Management System")
     print("=" * 60)
-    print("\n📦 Backend API: http://localhost:8000")
-    print("🌐 New SMAC UI: http://localhost:8000")
-    print("🏚️  Old Warehouse UI: http://localhost:8000/warehouse")
+    print(f"\n📦 Backend API: http://localhost:{args.port}")
+    print(f"🌐 New SMAC UI: http://localhost:{args.port}")
+    print(f"🏚️  Old Warehouse UI: http://localhost:{args.port}/warehouse")
+
+    if not args.prod:
+        print("\n🔧 Development mode (auto-reload, single process)")
+        print("\n" + "=" * 60 + "\n")
+        uvicorn.run(
+            "main:app",
+            app_dir=BACKEND_DIR,
+            host=args.host,
+            port=args.port,
+            reload=True,
+            reload_dirs=[BACKEND_DIR],
+            log_level="info"
+        )
+        return
+
+    prepare_database()
+    # Matches job_runner.DRAIN_SECONDS without importing the app into the launcher
+    drain_seconds = int(os.getenv("JOB_DRAIN_SECONDS", "120"))
+
+    try:
+        import gunicorn  # noqa: F401
+        has_gunicorn = True
+    except ImportError:
+        has_gunicorn = False
+
+    server = "gunicorn + uvicorn workers, preloaded" if has_gunicorn else "uvicorn workers"
+    print(f"\n🏭 Production mode: {args.workers} workers ({server})")
     print("\n" + "=" * 60 + "\n")
-    
-    uvicorn.run(
-        "backend.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+
+    if has_gunicorn:
+        serve_gunicorn(args.host, args.port, args.workers, drain_seconds)
+    else:
+        serve_uvicorn(args.host, args.port, args.workers, drain_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,7 @@ cd "$PROJECT_DIR"
 start_server() {
     echo "[$(date)] Starting warehouse server..."
     source venv/bin/activate
-    uvicorn backend.main:app --host 0.0.0.0 --port 8000 > "$LOG_DIR/warehouse.log" 2> "$LOG_DIR/warehouse.error.log" &
+    python run.py --prod > "$LOG_DIR/warehouse.log" 2> "$LOG_DIR/warehouse.error.log" &
     echo $! > "$PID_FILE"
     echo "[$(date)] Server started with PID: $(cat $PID_FILE)"
 }
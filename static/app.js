@@ -67,13 +67,43 @@ async function uploadExcel() {
         showAlert('upload-alert', 'Uploading and parsing...', 'info');
         const response = await fetch(`${API_BASE}/upload-excel?upload_images=true`, { method: 'POST', body: formData });
         const result = await response.json();
-        if (response.ok) {
-            showAlert('upload-alert', `Success! Processed ${result.styles_processed} styles, ${result.items_saved} items`, 'success');
-            loadUploadedFiles(); fileInput.value = '';
+        if (response.ok && result.status === 'duplicate') {
+            fileInput.value = '';
+            showAlert('upload-alert', result.message || `Already processed as ${result.duplicate_of}: ${result.styles_processed} styles, ${result.items_saved} items`, 'info');
+        } else if (response.ok) {
+            fileInput.value = '';
+            watchUploadProgress(result.upload_id);
         } else showAlert('upload-alert', `Error: ${result.detail}`, 'error');
     } catch (error) { showAlert('upload-alert', `Error: ${error.message}`, 'error'); }
 }
 
+function watchUploadProgress(uploadId) {
+    watchJobProgress(uploadId, 'upload-alert', (progress) => {
+        showAlert('upload-alert', `Success! Processed ${progress.styles_processed} styles, ${progress.items_saved} items`, 'success');
+        loadUploadedFiles();
+    }, loadUploadedFiles);
+}
+
+function watchJobProgress(uploadId, alertId, onComplete, onError) {
+    const alertDiv = document.getElementById(alertId);
+    const source = new EventSource(`${API_BASE}/upload-progress/${uploadId}`);
+    source.onmessage = (event) => {
+        const progress = JSON.parse(event.data);
+        if (progress.status === 'completed') {
+            source.close();
+            onComplete(progress);
+        } else if (progress.status === 'error') {
+            source.close();
+            showAlert(alertId, progress.message, 'error');
+            if (onError) onError(progress);
+        } else {
+            const percent = progress.percentage != null ? ` (${progress.percentage}%)` : '';
+            alertDiv.innerHTML = `<div class="alert alert-info">${progress.message || 'Processing...'}${percent}</div>`;
+        }
+    };
+    source.onerror = () => source.close();
+}
+
 async function loadUploadedFiles() {
     try {
         const response = await fetch(`${API_BASE}/inventory/files`);
@@ -233,7 +263,7 @@ async function searchItems() {
         }
         resultsDiv.innerHTML = `<h4 style="margin: 24px 0 16px; font-weight: 600;">Found ${items.length} item(s)</h4><div class="items-grid">${items.map(item => `
             <div class="item-card" onclick="showItemProfile('${item.style}', '${item.color}')">
-                ${item.image_url ? `<img src="${item.image_url}" class="item-image">` : '<div class="item-image" style="display: flex; align-items: center; justify-content: center; color: #999;">No Image</div>'}
+                ${item.image_url ? `<img src="${item.thumbnail_url || item.image_url}" loading="lazy" class="item-image">` : '<div class="item-image" style="display: flex; align-items: center; justify-content: center; color: #999;">No Image</div>'}
                 <div class="item-style">${item.style}</div><div class="item-color">${item.color}</div>
                 <span class="badge badge-${item.status === 'placed' ? 'success' : 'info'}">${item.status}</span>
             </div>
@@ -254,6 +284,13 @@ function closeItemProfile() {
 
 async function loadInventory() { }
 async function loadStats() { }
+// Background style that shows one cell of a row's sprite sheet, scaled to the element
+function spriteCellStyle(sprite, cell) {
+    const x = sprite.columns > 1 ? cell.col / (sprite.columns - 1) * 100 : 0;
+    const y = sprite.rows > 1 ? cell.row / (sprite.rows - 1) * 100 : 0;
+    return `background-image: url('${sprite.url}'); background-size: ${sprite.columns * 100}% ${sprite.rows * 100}%; background-position: ${x}% ${y}%;`;
+}
+
 async function loadVisualShelves() { }
 async function uploadSeasonalSheet() { }
 async function viewDroppedReport() { }
@@ -367,7 +404,7 @@ async function loadInventory() {
         }
         listDiv.innerHTML = `<div class="items-grid">${items.map(item => `
             <div class="item-card" onclick="showItemProfile('${item.style}', '${item.color}')">
-                ${item.image_url ? `<img src="${item.image_url}" class="item-image">` : '<div class="item-image" style="display: flex; align-items: center; justify-content: center; color: #999;">No Image</div>'}
+                ${item.image_url ? `<img src="${item.thumbnail_url || item.image_url}" loading="lazy" class="item-image">` : '<div class="item-image" style="display: flex; align-items: center; justify-content: center; color: #999;">No Image</div>'}
                 <div class="item-style">${item.style}</div>
                 <div class="item-color">${item.color}</div>
                 <span class="badge badge-${item.status === 'placed' ? 'success' : 'info'}">${item.status}</span>
@@ -492,7 +529,7 @@ async function loadVisualShelves() {
                             if (items.length > 0) {
                                 html += `<div class="items-grid">${items.map(item => `
                                     <div class="item-card" onclick="showItemProfile('${item.id}')">
-                                        ${item.image_url ? `<img src="${item.image_url}" class="item-image" alt="${item.style}" onerror="this.style.display='none'">` : '<div class="item-image" style="display: flex; align-items: center; justify-content: center; color: #999;">No Image</div>'}
+                                        ${row.sprite && item.sprite_cell ? `<div class="item-image item-sprite" role="img" aria-label="${item.style}" style="${spriteCellStyle(row.sprite, item.sprite_cell)}"></div>` : item.image_url ? `<img src="${item.thumbnail_url || item.image_url}" loading="lazy" class="item-image" alt="${item.style}" onerror="this.style.display='none'">` : '<div class="item-image" style="display: flex; align-items: center; justify-content: center; color: #999;">No Image</div>'}
                                         <div class="item-style">${item.style}</div>
                                         <div class="item-color">${item.color}</div>
                                         <div class="item-division">${item.division || 'N/A'}</div>
@@ -610,14 +647,16 @@ async function uploadSeasonalSheet() {
     if (!seasonName || !file) { showAlert('seasonal-alert', 'Please enter season name and select a file', 'error'); return; }
     const formData = new FormData();
     formData.append('file', file);
-    formData.append('season_name', seasonName);
     try {
-        showAlert('seasonal-alert', 'Processing seasonal drop...', 'info');
-        const response = await fetch(`${API_BASE}/seasonal-drop`, { method: 'POST', body: formData });
+        showAlert('seasonal-alert', 'Uploading seasonal sheet...', 'info');
+        const params = new URLSearchParams({ season_name: seasonName, background: 'true' });
+        const response = await fetch(`${API_BASE}/seasonal-drop?${params}`, { method: 'POST', body: formData });
         const result = await response.json();
         if (response.ok) {
-            showAlert('seasonal-alert', `Success! Dropped ${result.dropped_count} items, kept ${result.kept_count} items`, 'success');
             fileInput.value = '';
+            watchJobProgress(result.upload_id, 'seasonal-alert', (progress) => {
+                showAlert('seasonal-alert', `Success! Dropped ${progress.dropped_count} items, kept ${progress.kept_count} items`, 'success');
+            });
         } else showAlert('seasonal-alert', `Error: ${result.detail}`, 'error');
     } catch (error) { showAlert('seasonal-alert', `Error: ${error.message}`, 'error'); }
 }